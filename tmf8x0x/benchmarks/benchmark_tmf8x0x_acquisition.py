@@ -0,0 +1,87 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Scaling of the multi-adapter acquisition with the number of adapters
+- Every adapter is an emulated bus with its own I2C transaction latency, the sensors on it measure fast enough to saturate the bus
+- The AcquisitionCoordinator reads all adapters in parallel and merges the results
+- Reports aggregate results per second, the speed-up against one adapter, missed results and backpressure time
+
+Example:
+    python benchmark_tmf8x0x_acquisition.py --adapters 1 2 4 8 --sensors 2 --seconds 2
+'''
+
+import __init__
+import argparse
+import sys
+import time
+
+from tmf8x0x.tmf8x0x_acquisition import AcquisitionCoordinator
+from tmf8x0x.tmf8x0x_bus import Tmf8x0xBus
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+
+def runAdapters(adapters:int, sensors:int, latency:float, period_ms:int, kilo_iters:int, seconds:float, budget:int)->dict:
+    """Acquire from a number of emulated adapters for some time.
+
+    Returns:
+        dict: results per second, missed results, backpressure time and worker errors
+    """
+    buses = []
+    for _ in range(adapters):
+        bus = Tmf8x0xBus(Tmf8806Emulator(num_devices=sensors, bus_latency=latency), enable_pins=Tmf8806Emulator.ENABLE_PINS[:sensors])
+        bus.open()
+        bus.bringUp()
+        buses.append(bus)
+    config = buses[0].sensors[0].app.getDefaultConfiguration()
+    config.data.repetitionPeriodMs = period_ms
+    config.data.kIters = kilo_iters
+    received = 0
+    try:
+        coordinator = AcquisitionCoordinator(buses, budget=budget)
+        with coordinator.start(config):
+            start = time.perf_counter()
+            end = start + seconds
+            while time.perf_counter() < end:
+                if coordinator.get(timeout=max(0.0, end - time.perf_counter())) is not None:
+                    received += 1
+            wall = time.perf_counter() - start
+        statistics = coordinator.getStatistics()
+    finally:
+        for bus in buses:
+            bus.close()
+    return { "adapters": adapters, "resultsPerSecond": received / wall,
+             "deviceDrops": sum(adapter["deviceDrops"] for adapter in statistics["adapters"]),
+             "blockedSeconds": sum(adapter["blockedSeconds"] for adapter in statistics["adapters"]),
+             "errors": sum(adapter["errors"] for adapter in statistics["adapters"]) }
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Measure how the multi-adapter acquisition scales with the number of emulated adapters.")
+    parser.add_argument("--adapters", type=int, nargs="+", default=[1, 2, 4, 8], help="numbers of adapters to test (default 1 2 4 8)")
+    parser.add_argument("--sensors", type=int, default=2, help="sensors per adapter (default 2)")
+    parser.add_argument("--latency-us", type=float, default=500.0, help="host time of one I2C transaction in microseconds (default 500, USB adapter)")
+    parser.add_argument("--period-ms", type=int, default=2, help="measurement period of every sensor (default 2)")
+    parser.add_argument("--kilo-iters", type=int, default=50, help="integration length of the measurements (default 50)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of every run (default 2)")
+    parser.add_argument("--budget", type=int, default=1024, help="queue budget of the coordinator (default 1024)")
+    args = parser.parse_args(argv)
+
+    header = "{:>8s} {:>10s} {:>8s} {:>10s} {:>10s} {:>6s}".format("adapters", "results/s", "speedup", "missed", "blocked s", "errors")
+    print(header)
+    print("-" * len(header))
+    single = None
+    failed = False
+    for adapters in args.adapters:
+        report = runAdapters(adapters, args.sensors, args.latency_us * 1e-6, args.period_ms, args.kilo_iters, args.seconds, args.budget)
+        if single is None:
+            single = report["resultsPerSecond"] / adapters
+        failed = failed or report["errors"] > 0
+        print("{:8d} {:10.1f} {:8.2f} {:10d} {:10.3f} {:6d}".format(adapters, report["resultsPerSecond"],
+              report["resultsPerSecond"] / single if single else 0.0, report["deviceDrops"], report["blockedSeconds"], report["errors"]))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Host-side benchmark of the TMF8x0x driver
+- Runs the driver against the TMF8806 emulator (no EVM needed), every I2C transaction takes a fixed bus latency
+- Measures boot time, patch download, measurement start, result and histogram readout, factory calibration
+- Reports I2C transactions, bytes moved, host CPU time and wall time per operation
+- Saves the report as JSON, and compares it with the JSON report of another driver version
+
+Example:
+    python benchmark_tmf8x0x_app.py --latency-us 100 --repeat 20 --output report.json
+    python benchmark_tmf8x0x_app.py --baseline report.json
+'''
+
+import __init__
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_firmware import FirmwareImageCache
+
+PATCH_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "zeromq", "fw_patch", "mainapp_PATCH_Maxwell.hex"))
+
+class OperationResult:
+    """Accumulated cost of all calls of one operation."""
+
+    def __init__(self, name:str):
+        self.name = name
+        self.calls:int = 0
+        self.failures:int = 0
+        self.transactions:int = 0
+        self.gpioReads:int = 0
+        self.bytesWritten:int = 0
+        self.bytesRead:int = 0
+        self.cpuSeconds:float = 0.0
+        self.wallSeconds:float = 0.0
+        self.minWallSeconds:float = None
+        self.maxWallSeconds:float = 0.0
+
+    def add(self, ok:bool, before:dict, after:dict, cpu:float, wall:float):
+        self.calls += 1
+        self.failures += 0 if ok else 1
+        self.transactions += after["transactions"] - before["transactions"]
+        self.gpioReads += after["gpioReads"] - before["gpioReads"]
+        self.bytesWritten += after["bytesWritten"] - before["bytesWritten"]
+        self.bytesRead += after["bytesRead"] - before["bytesRead"]
+        self.cpuSeconds += cpu
+        self.wallSeconds += wall
+        self.minWallSeconds = wall if self.minWallSeconds is None else min(self.minWallSeconds, wall)
+        self.maxWallSeconds = max(self.maxWallSeconds, wall)
+
+    def toDict(self)->dict:
+        calls = max(1, self.calls)
+        return { "calls": self.calls, "failures": self.failures,
+                 "transactionsPerCall": self.transactions / calls, "gpioReadsPerCall": self.gpioReads / calls,
+                 "bytesWrittenPerCall": self.bytesWritten / calls, "bytesReadPerCall": self.bytesRead / calls,
+                 "cpuSecondsPerCall": self.cpuSeconds / calls, "wallSecondsPerCall": self.wallSeconds / calls,
+                 "minWallSeconds": self.minWallSeconds, "maxWallSeconds": self.maxWallSeconds,
+                 "callsPerSecond": self.calls / self.wallSeconds if self.wallSeconds > 0 else 0.0 }
+
+class Tmf8x0xBenchmark:
+    """Runs the driver operations against an emulated device and collects their cost."""
+
+    OPERATIONS = [ "boot", "download", "measure", "result", "histograms", "factory_calibration" ]
+
+    def __init__(self, latency:float=100e-6, time_scale:float=1.0, repeat:int=10, kilo_iters:int=900, hex_file:str=PATCH_FILE):
+        """Create the benchmark.
+
+        Args:
+            latency (float, optional): Host seconds every I2C transaction takes. Defaults to 100e-6.
+            time_scale (float, optional): Device seconds per host second of the emulator. Defaults to 1.0.
+            repeat (int, optional): Number of calls per operation. Defaults to 10.
+            kilo_iters (int, optional): Integration length of the measurements. Defaults to 900.
+            hex_file (str, optional): Patch file for the download benchmark. Defaults to the patch of this repository.
+        """
+        self.latency = latency
+        self.time_scale = time_scale
+        self.repeat = repeat
+        self.kilo_iters = kilo_iters
+        self.hex_file = hex_file
+        self.com = Tmf8806Emulator(time_scale=time_scale, bus_latency=latency)
+        self.tof = Tmf8x0xApp(ic_com=self.com, exception_level=Tmf8x0xDevice.ExceptionLevel.OFF, firmware_cache=FirmwareImageCache())
+        self.results:Dict[str,OperationResult] = {}
+
+    def _configuration(self, period_ms:int):
+        config = self.tof.getDefaultConfiguration()
+        config.data.kIters = self.kilo_iters
+        config.data.repetitionPeriodMs = period_ms
+        return config
+
+    def _time(self, name:str, operation:Callable[[],bool]):
+        """Run and account one call of an operation."""
+        result = self.results.setdefault(name, OperationResult(name))
+        before = self.com.getStatistics()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        ok = operation()
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        result.add(bool(ok), before, self.com.getStatistics(), cpu, wall)
+
+    def _restart(self):
+        self.tof.disable()
+        self.tof.enable()
+        self.tof.startRomApp()
+
+    def runBoot(self):
+        for _ in range(self.repeat):
+            self.tof.disable()
+            self._time("boot", lambda: self.tof.enableAndStart() == self.tof.Status.OK)
+
+    def runDownload(self):
+        for _ in range(self.repeat):
+            self.tof.disable()
+            self.tof.enable()
+            self._time("download", lambda: self.tof.downloadHexFile(self.hex_file) == self.tof.Status.OK)
+
+    def runMeasure(self):
+        self._restart()
+        config = self._configuration(period_ms=100)
+        for _ in range(self.repeat):
+            self._time("measure", lambda: self.tof.measure(config) == self.tof.Status.OK)
+            self.tof.stop()
+
+    def runResult(self):
+        self._restart()
+        self.tof.measure(self._configuration(period_ms=1))
+        for _ in range(self.repeat):
+            self._time("result", lambda: self.tof.readResultFrameInt() is not None)
+        self.tof.stop()
+
+    def runHistograms(self):
+        self._restart()
+        self.tof.configureHistogramDumping(ec=True, prox=True, distance=True, distance_puc=True, summed=True)
+        self.tof.measure(self._configuration(period_ms=1))
+        for _ in range(self.repeat):
+            self._time("histograms", lambda: self.tof.readHistogramsAndResult()[0] == self.tof.Status.OK)
+        self.tof.stop()
+        self.tof.configureHistogramDumping()
+
+    def runFactoryCalibration(self):
+        self._restart()
+        for _ in range(self.repeat):
+            self._time("factory_calibration", lambda: self.tof.factoryCalibration(kilo_iters=self.kilo_iters) == self.tof.Status.OK)
+
+    def run(self, operations:list=None)->dict:
+        """Run the benchmark.
+
+        Args:
+            operations (list, optional): Names of the operations to run, see OPERATIONS. Defaults to all.
+
+        Returns:
+            dict: the report
+        """
+        runners = { "boot": self.runBoot, "download": self.runDownload, "measure": self.runMeasure, "result": self.runResult,
+                    "histograms": self.runHistograms, "factory_calibration": self.runFactoryCalibration }
+        self.results = {}
+        self.tof.open()
+        try:
+            for name in operations if operations else self.OPERATIONS:
+                runners[name]()
+        finally:
+            self.tof.disable()
+            self.tof.close()
+        return self.report()
+
+    def report(self)->dict:
+        """The report of the last run.
+
+        Returns:
+            dict: driver version, host, settings and the cost of every operation
+        """
+        return { "driverVersion": Tmf8x0xApp.VERSION,
+                 "python": platform.python_version(),
+                 "platform": platform.platform(),
+                 "settings": { "latencySeconds": self.latency, "timeScale": self.time_scale, "repeat": self.repeat, "kiloIters": self.kilo_iters },
+                 "operations": { name: result.toDict() for name, result in self.results.items() } }
+
+def printReport(report:dict, baseline:dict=None):
+    """Print a report as table, optionally with the relative change of the wall time against a baseline report."""
+    print("driver {} python {} latency {:.0f}us".format(report["driverVersion"], report["python"], report["settings"]["latencySeconds"] * 1e6))
+    header = "{:20s} {:>8s} {:>8s} {:>10s} {:>10s} {:>10s} {:>10s} {:>9s}".format("operation", "calls/s", "i2c", "written", "read", "cpu ms", "wall ms", "vs base")
+    print(header)
+    print("-" * len(header))
+    for name, op in report["operations"].items():
+        change = ""
+        if baseline and name in baseline.get("operations", {}):
+            base = baseline["operations"][name]["wallSecondsPerCall"]
+            if base > 0:
+                change = "{:+.1f}%".format((op["wallSecondsPerCall"] / base - 1.0) * 100)
+        print("{:20s} {:8.1f} {:8.1f} {:10.1f} {:10.1f} {:10.3f} {:10.3f} {:>9s}".format(name, op["callsPerSecond"], op["transactionsPerCall"],
+              op["bytesWrittenPerCall"], op["bytesReadPerCall"], op["cpuSecondsPerCall"] * 1e3, op["wallSecondsPerCall"] * 1e3, change))
+        if op["failures"]:
+            print("{:20s} {} of {} calls failed".format("", op["failures"], op["calls"]))
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Benchmark the host side of the TMF8x0x driver against the TMF8806 emulator.")
+    parser.add_argument("--latency-us", type=float, default=100.0, help="host time of one I2C transaction in microseconds (default 100)")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="device seconds per host second of the emulator (default 1)")
+    parser.add_argument("--repeat", type=int, default=10, help="calls per operation (default 10)")
+    parser.add_argument("--kilo-iters", type=int, default=900, help="integration length of the measurements (default 900)")
+    parser.add_argument("--operations", nargs="+", choices=Tmf8x0xBenchmark.OPERATIONS, help="operations to run (default all)")
+    parser.add_argument("--output", help="save the report as JSON to this file")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+    args = parser.parse_args(argv)
+
+    benchmark = Tmf8x0xBenchmark(latency=args.latency_us * 1e-6, time_scale=args.time_scale, repeat=args.repeat, kilo_iters=args.kilo_iters)
+    report = benchmark.run(args.operations)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    printReport(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    failed = any(op["failures"] for op in report["operations"].values())
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
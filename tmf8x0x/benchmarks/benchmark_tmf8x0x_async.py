@@ -0,0 +1,147 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Benchmark of the asyncio front-end against the blocking API with N sensors
+- Every sensor is an emulated TMF8806 on its own adapter, every I2C transaction takes a fixed bus latency
+- sync:    one thread reads the sensors one after the other with readResultFrameInt
+- threads: one thread per sensor with readResultFrameInt
+- async:   one event loop, one task per sensor with AsyncTmf8x0xApp.readResultFrameInt
+- Reports results per second, host CPU time per result, and the result frames the host missed
+
+Example:
+    python benchmark_tmf8x0x_async.py --sensors 1 2 4 8 --period-ms 10 --results 50
+'''
+
+import __init__
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from typing import List
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_async import AsyncTmf8x0xApp
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+
+class AsyncBenchmark:
+    """Reads a number of results from N emulated sensors with the blocking and the asyncio API."""
+
+    MODES = [ "sync", "threads", "async" ]
+
+    def __init__(self, sensors:int, latency:float=100e-6, period_ms:int=10, results:int=50, time_scale:float=1.0):
+        """Create the sensors.
+
+        Args:
+            sensors (int): Number of sensors.
+            latency (float, optional): Host seconds every I2C transaction takes. Defaults to 100e-6.
+            period_ms (int, optional): Measurement period of every sensor. Defaults to 10.
+            results (int, optional): Results to read from every sensor. Defaults to 50.
+            time_scale (float, optional): Device seconds per host second of the emulators. Defaults to 1.0.
+        """
+        self.results = results
+        self.period_ms = period_ms
+        self.coms = [ Tmf8806Emulator(time_scale=time_scale, bus_latency=latency) for _ in range(sensors) ]
+        self.apps = [ Tmf8x0xApp(ic_com=com, exception_level=Tmf8x0xDevice.ExceptionLevel.OFF) for com in self.coms ]
+
+    def _config(self, app:Tmf8x0xApp):
+        config = app.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = self.period_ms
+        return config
+
+    def _start(self):
+        for app in self.apps:
+            app.open()
+            app.enableAndStart()
+            app.measure(self._config(app))
+
+    def _stop(self):
+        for app in self.apps:
+            app.stop()
+            app.disable()
+            app.close()
+
+    def _readSync(self)->List[list]:
+        frames = [ [] for _ in self.apps ]
+        for _ in range(self.results):
+            for app, received in zip(self.apps, frames):
+                received.append(app.readResultFrameInt())
+        return frames
+
+    def _readThreads(self)->List[list]:
+        frames = [ [] for _ in self.apps ]
+        def read(app:Tmf8x0xApp, received:list):
+            for _ in range(self.results):
+                received.append(app.readResultFrameInt())
+        threads = [ threading.Thread(target=read, args=(app, received)) for app, received in zip(self.apps, frames) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return frames
+
+    def _readAsync(self)->List[list]:
+        async def read(tof:AsyncTmf8x0xApp)->list:
+            return [ await tof.readResultFrameInt() for _ in range(self.results) ]
+        async def readAll():
+            return await asyncio.gather(*[ read(AsyncTmf8x0xApp(app)) for app in self.apps ])
+        return list(asyncio.run(readAll()))
+
+    def run(self, mode:str)->dict:
+        """Measure one mode.
+
+        Args:
+            mode (str): one of MODES
+
+        Returns:
+            dict: results per second, CPU time per result, missed and failed results
+        """
+        readers = { "sync": self._readSync, "threads": self._readThreads, "async": self._readAsync }
+        self._start()
+        try:
+            cpu = time.process_time()
+            wall = time.perf_counter()
+            frames = readers[mode]()
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+        finally:
+            self._stop()
+        received = sum(1 for sensor in frames for frame in sensor if frame is not None)
+        missed = 0
+        for sensor in frames:
+            numbers = [ frame.resultNum for frame in sensor if frame is not None ]
+            missed += sum((b - a - 1) & 0xff for a, b in zip(numbers, numbers[1:]))
+        return { "sensors": len(self.apps), "mode": mode, "results": received, "failed": len(self.apps) * self.results - received,
+                 "missed": missed, "resultsPerSecond": received / wall if wall > 0 else 0.0,
+                 "cpuMsPerResult": cpu * 1e3 / max(1, received), "wallSeconds": wall }
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Compare the asyncio front-end with the blocking API for N emulated sensors.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1, 2, 4, 8], help="numbers of sensors to test (default 1 2 4 8)")
+    parser.add_argument("--latency-us", type=float, default=100.0, help="host time of one I2C transaction in microseconds (default 100)")
+    parser.add_argument("--period-ms", type=int, default=10, help="measurement period of every sensor (default 10)")
+    parser.add_argument("--results", type=int, default=50, help="results to read per sensor (default 50)")
+    parser.add_argument("--modes", nargs="+", choices=AsyncBenchmark.MODES, default=AsyncBenchmark.MODES, help="modes to run (default all)")
+    args = parser.parse_args(argv)
+
+    header = "{:>8s} {:>8s} {:>10s} {:>10s} {:>8s} {:>8s}".format("sensors", "mode", "results/s", "cpu ms", "missed", "failed")
+    print(header)
+    print("-" * len(header))
+    failed = False
+    for sensors in args.sensors:
+        for mode in args.modes:
+            benchmark = AsyncBenchmark(sensors, latency=args.latency_us * 1e-6, period_ms=args.period_ms, results=args.results)
+            report = benchmark.run(mode)
+            failed = failed or report["failed"] > 0
+            print("{:8d} {:>8s} {:10.1f} {:10.3f} {:8d} {:8d}".format(sensors, mode, report["resultsPerSecond"], report["cpuMsPerResult"],
+                  report["missed"], report["failed"]))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Benchmark of the multi-sensor bus manager
+- N emulated TMF8806 share one adapter, every I2C transaction takes a fixed bus latency
+- The sensors measure with different periods (the first one fastest)
+- round-robin: readResultFrameInt on one sensor after the other, as an application would do without the manager
+- scheduled:   Tmf8x0xBus.read, which polls a sensor only when its next result is due
+- Reports aggregate and per-sensor results per second, missed results and the bus utilization
+
+Example:
+    python benchmark_tmf8x0x_bus.py --sensors 4 --periods-ms 10 20 40 80 --seconds 2
+'''
+
+import __init__
+import argparse
+import sys
+import time
+from typing import List
+
+from tmf8x0x.tmf8x0x_bus import Tmf8x0xBus
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_instrument import instrumentTag
+
+def _configs(bus:Tmf8x0xBus, periods_ms:List[int], kilo_iters:int)->list:
+    configs = []
+    for sensor, period in zip(bus.sensors, periods_ms):
+        config = sensor.app.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = period
+        config.data.kIters = kilo_iters
+        configs.append(config)
+    return configs
+
+def runRoundRobin(bus:Tmf8x0xBus, seconds:float):
+    """Read one result of every sensor in turn with the blocking readResultFrameInt."""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        for sensor in bus.sensors:
+            with instrumentTag(bus.com, sensor.name):
+                result = sensor.app.readResultFrameInt()
+            if result is not None and result.resultNum != sensor.lastResultNum:
+                if sensor.lastResultNum is not None:
+                    sensor.statistics.deviceDrops += (result.resultNum - sensor.lastResultNum - 1) & 0xff
+                sensor.lastResultNum = result.resultNum
+                sensor.statistics.results += 1
+
+def runScheduled(bus:Tmf8x0xBus, seconds:float):
+    """Read the results of all sensors with the bus manager."""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        bus.read(timeout=max(0.0, end - time.monotonic()))
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Compare round-robin readout with the bus manager for N emulated sensors on one adapter.")
+    parser.add_argument("--sensors", type=int, default=4, help="number of sensors (default 4)")
+    parser.add_argument("--periods-ms", type=int, nargs="+", default=[10, 20, 40, 80], help="measurement period per sensor (default 10 20 40 80)")
+    parser.add_argument("--kilo-iters", type=int, default=250, help="integration length of the measurements (default 250)")
+    parser.add_argument("--latency-us", type=float, default=100.0, help="host time of one I2C transaction in microseconds (default 100)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of every run (default 2)")
+    args = parser.parse_args(argv)
+    periods = (args.periods_ms * args.sensors)[:args.sensors]
+
+    print("{} sensors, periods {} ms, latency {:.0f}us".format(args.sensors, periods, args.latency_us))
+    header = "{:>12s} {:>10s} {:>8s} {:>8s}   {}".format("mode", "results/s", "missed", "bus %", "results/s per sensor")
+    print(header)
+    print("-" * len(header))
+    for mode, runner in (("round-robin", runRoundRobin), ("scheduled", runScheduled)):
+        com = Tmf8806Emulator(num_devices=args.sensors, bus_latency=args.latency_us * 1e-6)
+        bus = Tmf8x0xBus(com, enable_pins=Tmf8806Emulator.ENABLE_PINS[:args.sensors])
+        bus.open()
+        try:
+            bus.bringUp()
+            bus.start(configs=_configs(bus, periods, args.kilo_iters))
+            runner(bus, args.seconds)
+            bus.stop()
+            statistics = bus.getStatistics()
+        finally:
+            bus.close()
+        missed = 0
+        for sensor in bus.sensors:
+            missed += statistics["sensors"][sensor.name]["deviceDrops"]
+        perSensor = " ".join("{:7.1f}".format(stats["resultsPerSecond"]) for stats in statistics["sensors"].values())
+        print("{:>12s} {:10.1f} {:8d} {:8.1f}   {}".format(mode, statistics["resultsPerSecond"], missed, statistics["busUtilization"] * 100, perSensor))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Read throughput of measurement CSV files, csv module row by row against the bulk loader
+- Writes synthetic captures with HistogramsAndResult.toCSV: EC, proximity, distance and summed histograms, #RES, #OBJ, #TMP
+- csv: csv.reader with int() per value, rows grouped by tag, as the analysis scripts do
+- loadCSV: whole file, iterCSV: small chunks, loadDirectory: all files in a process pool
+- Reports MB/s of file size per variant
+
+Example:
+    python benchmark_tmf8x0x_csv.py --frames 2000 --files 4
+'''
+
+import __init__
+import argparse
+import csv
+import ctypes
+import os
+import sys
+import tempfile
+import time
+import numpy
+
+from tmf8x0x.tmf8x0x_app import HistogramsAndResult
+from tmf8x0x.tmf8x0x_csv import iterCSV, loadCSV, loadDirectory
+
+def writeCapture(file_name:str, frames:int, seed:int):
+    """Write a synthetic capture."""
+    rng = numpy.random.default_rng(seed)
+    hr = HistogramsAndResult()
+    with open(file_name, "w", encoding="UTF8", newline="") as f:
+        f.write("sep=;\n")
+        writer = csv.writer(f, delimiter=";")
+        for frame in range(frames):
+            hr.histogramsEc = rng.integers(0, 1 << 16, size=(5, 256))
+            hr.histogramsProx = rng.integers(0, 1 << 16, size=(5, 256))
+            hr.histogramsDist = rng.integers(0, 1 << 16, size=(5, 256))
+            hr.histogramSum = rng.integers(0, 1 << 18, size=256)
+            ctypes.memmove(ctypes.addressof(hr.result), rng.integers(0, 256, size=ctypes.sizeof(hr.result), dtype=numpy.uint8).tobytes(),
+                           ctypes.sizeof(hr.result))
+            hr.result.resultNum = frame & 0xff
+            hr.toCSV(writer, timestamp=1e9 + frame)
+
+def readWithCsvModule(file_name:str)->dict:
+    """The row by row reader the loader replaces."""
+    rows = {}
+    with open(file_name, "r", encoding="UTF8", newline="") as f:
+        for row in csv.reader(f, delimiter=";"):
+            if row and row[0].startswith("#"):
+                rows.setdefault(row[0], []).append([ int(value) for value in row[1:] ])
+    return rows
+
+def timed(read, files:list)->float:
+    begin = time.perf_counter()
+    read(files)
+    return time.perf_counter() - begin
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Compare the read throughput of the csv module and the bulk CSV loader.")
+    parser.add_argument("--frames", type=int, default=2000, help="frames per file (default 2000)")
+    parser.add_argument("--files", type=int, default=4, help="number of files (default 4)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes of loadDirectory (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="characters per chunk of iterCSV (default 1 MiB)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = [ os.path.join(directory, f"capture{i}.csv") for i in range(args.files) ]
+        for seed, file_name in enumerate(files):
+            writeCapture(file_name, args.frames, seed)
+        megabytes = sum(os.path.getsize(file_name) for file_name in files) / 1e6
+        frames = sum(len(loadCSV(file_name)) for file_name in files)
+        if frames != args.frames * args.files:
+            print(f"loader found {frames} frames, expected {args.frames * args.files}")
+            return 1
+
+        variants = { "csv": lambda files: [ readWithCsvModule(file_name) for file_name in files ],
+                     "loadCSV": lambda files: [ loadCSV(file_name) for file_name in files ],
+                     "iterCSV": lambda files: [ list(iterCSV(file_name, chunk_size=args.chunk_size)) for file_name in files ],
+                     "loadDirectory": lambda files: loadDirectory(directory, processes=args.processes) }
+        print(f"{args.files} files, {megabytes:.1f} MB, {frames} frames")
+        header = "{:>14s} {:>10s} {:>10s}".format("variant", "seconds", "MB/s")
+        print(header)
+        print("-" * len(header))
+        for name, read in variants.items():
+            seconds = timed(read, files)
+            print("{:>14s} {:10.2f} {:10.1f}".format(name, seconds, megabytes / seconds))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Patch download through the bootloader of the TMF8806 emulator, swept over the RAM write chunk size and the I2C bus latency
+- Every combination downloads the patch several times in a row, the poll delay is learned from download to download
+- The last download is reported: time, throughput, frames, status polls, polls that missed the acknowledge,
+  smallest acknowledge time and the learned poll delay
+- A download with downloadPollDelay=0 (poll right away) is the reference
+
+Example:
+    python benchmark_tmf8x0x_download.py --chunk-sizes 16 32 64 128 --bus-latencies-us 0 100 500
+'''
+
+import __init__
+import argparse
+import os
+import sys
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_firmware import FirmwareImageCache
+
+PATCH_FILE = os.path.join(os.path.dirname(__file__), "..", "zeromq", "fw_patch", "mainapp_PATCH_Maxwell.hex")
+
+def download(chunk_size:int, bus_latency:float, downloads:int, poll_delay:float=None)->dict:
+    """Download the patch downloads times with one application object, returns the statistics of the last download."""
+    tof = Tmf8x0xApp(ic_com=Tmf8806Emulator(bus_latency=bus_latency), firmware_cache=FirmwareImageCache())
+    tof.downloadChunkSize = chunk_size
+    tof.downloadPollDelay = poll_delay
+    tof.open()
+    tof.enable()
+    try:
+        for _ in range(downloads):
+            if tof.downloadHexFile(PATCH_FILE) != tof.Status.OK:
+                return None
+        return tof.lastDownloadStatistics.toDict()
+    finally:
+        tof.disable()
+        tof.close()
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Sweep the patch download over chunk size and bus latency.")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[16, 32, 64, 128], help="RAM write chunk sizes (default 16 32 64 128)")
+    parser.add_argument("--bus-latencies-us", type=float, nargs="+", default=[0, 100, 500],
+                        help="I2C transaction latencies in microseconds (default 0 100 500)")
+    parser.add_argument("--downloads", type=int, default=3, help="downloads per combination, the last one is reported (default 3)")
+    args = parser.parse_args(argv)
+
+    header = "{:>6s} {:>8s} {:>8s} {:>9s} {:>9s} {:>7s} {:>6s} {:>7s} {:>8s} {:>8s}".format(
+        "chunk", "bus us", "variant", "ms", "kB/s", "frames", "polls", "misses", "ack us", "delay us")
+    print(header)
+    print("-" * len(header))
+    for chunk_size in args.chunk_sizes:
+        for latency_us in args.bus_latencies_us:
+            for variant, poll_delay in ( ("learned", None), ("no delay", 0.0) ):
+                stats = download(chunk_size, latency_us * 1e-6, args.downloads, poll_delay)
+                if stats is None:
+                    print("{:6d} {:8.0f} {:>8s} download failed".format(chunk_size, latency_us, variant))
+                    return 1
+                print("{:6d} {:8.0f} {:>8s} {:9.2f} {:9.1f} {:7d} {:6d} {:7d} {:8.1f} {:8.1f}".format(
+                    chunk_size, latency_us, variant, stats["seconds"] * 1e3, stats["bytesPerSecond"] / 1e3, stats["frames"],
+                    stats["polls"], stats["misses"], (stats["minAckSeconds"] or 0.0) * 1e6, stats["learnedPollDelay"] * 1e6))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+''' Host overhead of the measurement start in a wake cycle, measure() against a PreparedMeasurement
+- Runs the hibernate example loop against the TMF8806 emulator: start with calibration and state data, read the result
+- Only the start call is timed, the emulated device runs fast so that the host side dominates
+- Reports host CPU time and allocated bytes per start for both variants
+
+Example:
+    python benchmark_tmf8x0x_prepared.py --cycles 2000
+'''
+
+import __init__
+import argparse
+import sys
+import time
+import tracemalloc
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.auto.tmf8806_regs import tmf8806StateData
+
+def runCycles(tof:Tmf8x0xApp, start, cycles:int, trace:bool)->dict:
+    """Start and read a result per cycle, start(stateData) is timed.
+
+    Returns:
+        dict: CPU microseconds and allocated bytes per start, failed starts
+    """
+    stateData = None
+    cpu = 0.0
+    allocated = 0
+    failed = 0
+    for _ in range(cycles):
+        if trace:
+            tracemalloc.start()
+        begin = time.process_time()
+        status = start(stateData)
+        cpu += time.process_time() - begin
+        if trace:
+            allocated += tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        failed += 0 if status == tof.Status.OK else 1
+        result = tof.readResultFrameInt()
+        stateData = tmf8806StateData.from_buffer_copy(bytes(result.stateData))
+    return { "cpuUsPerStart": cpu * 1e6 / cycles, "bytesPerStart": allocated / cycles, "failed": failed }
+
+def main(argv:list=None)->int:
+    parser = argparse.ArgumentParser(description="Compare the host overhead of measure() and measurePrepared() in a wake cycle.")
+    parser.add_argument("--cycles", type=int, default=2000, help="wake cycles per variant (default 2000)")
+    parser.add_argument("--kilo-iters", type=int, default=10, help="integration length of the measurements (default 10)")
+    args = parser.parse_args(argv)
+
+    tof = Tmf8x0xApp(ic_com=Tmf8806Emulator(time_scale=100.0))
+    tof.open()
+    tof.enableAndStart()
+    tof.factoryCalibration()
+    calibration = tof.readFactoryCalibration()
+    config = tof.getDefaultConfiguration()
+    config.data.repetitionPeriodMs = 0
+    config.data.kIters = args.kilo_iters
+    prepared = tof.prepareMeasurement(config, calibration)
+    variants = { "measure": lambda state: tof.measure(config, calibration, state),
+                 "prepared": lambda state: tof.measurePrepared(prepared, state) }
+
+    header = "{:>10s} {:>12s} {:>16s} {:>8s}".format("variant", "cpu us/start", "peak bytes/start", "failed")
+    print(header)
+    print("-" * len(header))
+    failed = False
+    try:
+        for name, start in variants.items():
+            report = runCycles(tof, start, args.cycles, trace=False)
+            report["bytesPerStart"] = runCycles(tof, start, max(1, args.cycles // 10), trace=True)["bytesPerStart"]
+            failed = failed or report["failed"] > 0
+            print("{:>10s} {:12.1f} {:16.0f} {:8d}".format(name, report["cpuUsPerStart"], report["bytesPerStart"], report["failed"]))
+    finally:
+        tof.disable()
+        tof.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
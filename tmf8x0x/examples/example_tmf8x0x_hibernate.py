@@ -31,7 +31,6 @@ from pprint import pprint
 
 from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
 from aos_com.register_io import ctypes2Dict
-from tmf8x0x.auto.tmf8806_regs import tmf8806StateData
 
 if USE_EVM:
     from aos_com.evm_ftdi import EvmFtdi as Ftdi
@@ -73,17 +72,22 @@ if __name__ == "__main__":
 
     print("Start Measurements")
     stateData = None # In the first run, the state data is empty
+    prepared = tof.prepareMeasurement(config=configuration, calibration=calibration) # encode the command once for all wake cycles
     for _ in range(NUMBER_OF_RESULTS):
-        tof.enableAndStart()
-        tof.measure(config=configuration,calibration=calibration, stateData=stateData)
-        resultFrame = tof.readResultFrameInt()
-        tof.disable()
+        # enable (polling for readiness), start the app, measure with calibration + state data, read the result, disable
+        status, resultFrame, stateData = tof.warmWakeMeasure(prepared, stateData=stateData)
+        if status != tof.Status.OK:
+            print("Wake cycle failed")
+            continue
         time.sleep(0.1) # Hibernate 100ms
-        stateData = tmf8806StateData.from_buffer(resultFrame.stateData)
         print("[{:03d}]: {:05d}mm, {:02d}snr, {:02d}°C, state={}".format( resultFrame.resultNum, resultFrame.distPeak, 
                                                                          resultFrame.reliability, resultFrame.temperature, 
                                                                          ctypes2Dict(stateData) ))
         
 
+    print("Wake cycle time per phase [us]:")
+    for phase, timing in tof.getWakeStatistics().items():
+        print("{:>10s}: mean={:8.1f} p99={:6d}".format(phase, timing["meanUs"], timing["p99Us"]))
+
     tof.close()    
     print("End")
@@ -17,13 +17,22 @@
 
 USE_EVM:bool=True
 
+# record the histograms and results to a CSV file (written by a background thread)
+SAVE_CSV:bool=False
+
 import __init__
 if USE_EVM:
     from aos_com.evm_ftdi import EvmFtdi as Ftdi
 else:
     from aos_com.ft2232_ftdi import Ft2232Ftdi as Ftdi
 from tmf8x0x.tmf8x0x_app import Tmf8x0xApp,HistogramsAndResult
+from tmf8x0x.tmf8x0x_writer import FrameWriter
 from matplotlib import pyplot as plt
+import os
+import time
+
+t = time.localtime()
+MEASUREMENT_DATA_FILE = os.path.dirname(__file__) + f"\\..\\csv_files\\tmf8x0x_histograms-{t.tm_year}-{t.tm_mon:02}-{t.tm_mday:02}-{t.tm_hour:02}_{t.tm_min:02}_{t.tm_sec:02}.csv"
 
 if __name__ == "__main__":
     tof = Tmf8x0xApp(Ftdi(log=False))
@@ -85,26 +94,30 @@ if __name__ == "__main__":
     config.data.kIters=900
     calib = None
     tof.measure(config= config, calibration= calib)
+    writer = FrameWriter(MEASUREMENT_DATA_FILE, max_bytes=100 << 20) if SAVE_CSV else None
+    hr = None
     while not stop_measuring:
-        # read all available histograms and one result frame
-        _, hr = tof.readHistogramsAndResult()
+        # read all available histograms and one result frame, the buffers of hr are reused
+        _, hr = tof.readHistogramsAndResult(hr=hr)
+        if writer:
+            writer.put(hr)
         info.set_text("[{:3d}] {:4d}mm, {:2d}snr, {:2d}°C".format(hr.result.resultNum, hr.result.distPeak, hr.result.reliability, hr.result.temperature))
-        if hr.histogramsProx:
+        if len(hr.histogramsProx):
             for i, hist in enumerate(hr.histogramsProx):
                 lines["prox"][i].set_ydata(hist)
                 if i == 1:
                     axes["prox"].set_ylim(0, round(max(hist)*1.1, 1000)) # Scale with the reference channel
-        if hr.histogramsDist:
+        if len(hr.histogramsDist):
             for i, hist in enumerate(hr.histogramsDist):
                 lines["dist"][i].set_ydata(hist)
                 if i == 1:
                     axes["dist"].set_ylim(0, round(max(hist)*1.1, 1000)) # Scale with the reference channel
-        if hr.histogramsDistPuc:
+        if len(hr.histogramsDistPuc):
             for i, hist in enumerate(hr.histogramsDistPuc):
                 lines["dist_puc"][i].set_ydata(hist[:254])
                 if i == 1: 
                     axes["dist_puc"].set_ylim(0, round(max(hist)*1.1, 1000)) # Scale with the reference channel
-        if hr.histogramsEc:
+        if len(hr.histogramsEc):
             for i, hist in enumerate(hr.histogramsEc):
                 lines["ec"][i].set_ydata(hist[:254])
                 if i == 1: 
@@ -116,4 +129,7 @@ if __name__ == "__main__":
     tof.stop()
     tof.disable()
     tof.close()
+    if writer:
+        writer.close()
+        print("Wrote {} frames to {}, dropped {}".format(writer.statistics.written, writer.files, writer.statistics.dropped))
     print("End")
@@ -20,15 +20,18 @@ USE_EVM:bool=True
 # disable verbose logging 
 LOG:bool=False
 
+# number of histogram sets and result frames to record
+FRAMES:int=1
+
 import __init__
 if USE_EVM:
     from aos_com.evm_ftdi import EvmFtdi as Ftdi
 else:
     from aos_com.ft2232_ftdi import Ft2232Ftdi as Ftdi
 from tmf8x0x.tmf8x0x_app import Tmf8x0xApp,HistogramsAndResult
+from tmf8x0x.tmf8x0x_writer import FrameWriter, OutputFormat
 import time
 import os
-import csv
 
 t = time.localtime()
 MEASUREMENT_DATA_FILE = os.path.dirname(__file__) + f"\\..\\csv_files\\tmf8x0x_measure-{t.tm_year}-{t.tm_mon:02}-{t.tm_mday:02}-{t.tm_hour:02}_{t.tm_min:02}_{t.tm_sec:02}.csv"
@@ -50,9 +53,8 @@ if __name__ == "__main__":
 
     print("[app_id, major, minor, patch] are: " , [f'0x{i:02x}' for i in tof.getAppId()])
 
-    f = open( MEASUREMENT_DATA_FILE, 'w', encoding='UTF8', newline='' )
-    writer = csv.writer(f,delimiter=';')
-    f.write( "sep=;\n" )
+    # the CSV file is written by a background thread, a slow disk does not delay the readout
+    writer = FrameWriter(MEASUREMENT_DATA_FILE, output_format=OutputFormat.CSV_BYTES)
 
     print( "Configure sensor" )
     # warning: EC histograms and optical histograms only come when this is the initial measurement!
@@ -61,15 +63,20 @@ if __name__ == "__main__":
     print( "Start measurements" )
     tof.measure(tof.getDefaultConfiguration())
 
-    # read all available histograms and one result frame
-    _, hr = tof.readHistogramsAndResult()
-    
-    # print histograms and result to the CSV file
-    hr.toCSVBytes(writer)
+    hr = None
+    for _ in range(FRAMES):
+        # read all available histograms and one result frame, the buffers of hr are reused
+        _, hr = tof.readHistogramsAndResult(hr=hr)
+
+        # queue histograms and result for the CSV file
+        writer.put(hr)
 
     print( "Stop measurements" )
     tof.stop()
     tof.disable()
     tof.close()
-    f.close()  
+    writer.close()
+    statistics = writer.getStatistics()
+    print( "Wrote {} frames, dropped {}, max queue depth {}, write latency p99 {}us".format(
+        statistics["written"], statistics["dropped"], statistics["maxQueueDepth"], statistics["writeLatency"]["p99Us"]))
     print("End")
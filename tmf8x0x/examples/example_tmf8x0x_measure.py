@@ -10,8 +10,8 @@
 - Open the communication
 - Enable the device
 - Start a measurement 
-- Measure in an endless loop
-- #Stop a measurement
+- Stream a number of results
+- Stop the measurement
 - #Disable+close the device
 '''
 
@@ -20,6 +20,7 @@ LOG:bool     = False
 
 NUMBER_OF_RESULTS=10
 
+import itertools
 import __init__
 from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
 from aos_com.register_io import ctypes2Dict
@@ -62,16 +63,13 @@ if __name__ == "__main__":
     calibration = tof.readFactoryCalibration()
     
     print("Start Measurements")
-    tof.measure(config=configuration,calibration=calibration)
-    
-    print("Results")
-    for _ in range(0,NUMBER_OF_RESULTS):
-        resultFrame = tof.readResultFrameInt(timeout=9999999)
-        state = tmf8806StateData.from_buffer(resultFrame.stateData)
-        print("[{:3d}] {:4d}mm, {:2d}snr, {:2d}C".format(resultFrame.resultNum, resultFrame.distPeak, resultFrame.reliability, resultFrame.temperature))
-        print(ctypes2Dict(state))
-
-    tof.stop()
+    with tof.stream(config=configuration,calibration=calibration) as results:
+        print("Results")
+        for resultFrame in itertools.islice(results, NUMBER_OF_RESULTS):
+            state = tmf8806StateData.from_buffer(resultFrame.stateData)
+            print("[{:3d}] {:4d}mm, {:2d}snr, {:2d}C".format(resultFrame.resultNum, resultFrame.distPeak, resultFrame.reliability, resultFrame.temperature))
+            print(ctypes2Dict(state))
+    print("Missed results: {}".format(results.statistics.deviceDrops))
 
     tof.disable()
     tof.close()    
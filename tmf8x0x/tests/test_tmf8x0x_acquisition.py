@@ -0,0 +1,93 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import time
+import __init__
+
+from tmf8x0x.tmf8x0x_acquisition import AcquisitionCoordinator
+from tmf8x0x.tmf8x0x_async import executorFor
+from tmf8x0x.tmf8x0x_bus import Tmf8x0xBus
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_stream import OverflowPolicy
+
+class TestAcquisitionCoordinator:
+    buses: list
+
+    def setup_method(self, method):
+        self.buses = []
+        for _ in range(3):
+            com = Tmf8806Emulator(num_devices=2, time_scale=5.0)
+            bus = Tmf8x0xBus(com, enable_pins=Tmf8806Emulator.ENABLE_PINS[:2])
+            bus.open()
+            assert bus.bringUp() == bus.sensors[0].app.Status.OK
+            self.buses.append(bus)
+
+    def teardown_method(self, method):
+        for bus in self.buses:
+            bus.close()
+
+    def _config(self, period_ms:int):
+        config = self.buses[0].sensors[0].app.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = period_ms
+        return config
+
+    def test_merged_in_time_order(self):
+        items = []
+        with AcquisitionCoordinator(self.buses).start(self._config(20)) as results:
+            for item in results:
+                items.append(item)
+                if len(items) == 60:
+                    break
+        timestamps = [ item.timestamp for item in items ]
+        assert timestamps == sorted(timestamps)
+        assert { item.adapter for item in items } == { 0, 1, 2 }
+        assert { (item.adapter, item.sensor) for item in items } == { (a, s) for a in range(3) for s in ("sensor0", "sensor1") }
+        statistics = results.getStatistics()
+        for adapter in statistics["adapters"]:
+            assert adapter["errors"] == 0
+            assert adapter["results"] > 0
+            assert not adapter["running"]
+
+    def test_executor_free(self):
+        with AcquisitionCoordinator(self.buses).start(self._config(20)) as results:
+            assert results.get(timeout=1.0) is not None
+            future = executorFor(self.buses[0].com).submit(lambda: "done")
+            assert future.result(timeout=1.0) == "done"            # the worker does not occupy the adapter executor
+
+    def test_backpressure(self):
+        with AcquisitionCoordinator(self.buses, budget=4, policy=OverflowPolicy.BLOCK).start(self._config(5)) as results:
+            time.sleep(0.1)                              # ~20 results per sensor at time scale 5
+            assert len(results) <= 4 + len(self.buses)
+            items = [ results.get(timeout=1.0) for _ in range(12) ]   # the workers continue, the missed results show up
+        statistics = results.getStatistics()
+        assert all(item is not None for item in items)
+        assert sum(adapter["blockedSeconds"] for adapter in statistics["adapters"]) > 0
+        assert sum(adapter["deviceDrops"] for adapter in statistics["adapters"]) > 0
+        assert sum(adapter["queueDrops"] for adapter in statistics["adapters"]) == 0
+
+    def test_drop_oldest(self):
+        with AcquisitionCoordinator(self.buses, budget=4, policy=OverflowPolicy.DROP_OLDEST).start(self._config(5)) as results:
+            time.sleep(0.1)
+            assert len(results) <= 4
+        statistics = results.getStatistics()
+        assert sum(adapter["queueDrops"] for adapter in statistics["adapters"]) > 0
+
+    def test_failing_adapter(self):
+        def broken(timeout:float=1.0):
+            raise IOError("adapter unplugged")
+        self.buses[1].read = broken
+        items = []
+        with AcquisitionCoordinator(self.buses).start(self._config(20)) as results:
+            for item in results:
+                items.append(item)
+                if len(items) == 20:
+                    break
+        statistics = results.getStatistics()
+        assert statistics["adapters"][1]["errors"] == 1
+        assert "unplugged" in statistics["adapters"][1]["lastError"]
+        assert { item.adapter for item in items } == { 0, 2 }
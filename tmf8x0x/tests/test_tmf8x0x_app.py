@@ -16,6 +16,7 @@ from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
 from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
 from aos_com.register_io import ctypes2Dict
 from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_poll import Poller
 from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd,tmf8806FactoryCalibData, TMF880X_APP_VERSION_MAJOR, TMF880X_APP_VERSION_MINOR, TMF880X_APP_VERSION_PATCH
 from pprint import pprint
 from aos_com.register_io import ctypes2Dict
@@ -320,9 +321,9 @@ class TestTmf8x0xApplication:
         assert status == self.tof.Status.OK
         assert self.tof.stop() == self.tof.Status.OK, "Could not stop measurement"        
         refHistogram1 = hr1.histogramsDist[0][0:127] # check channel 0
-        refPeakPosition1 = refHistogram1.index(max(refHistogram1))
+        refPeakPosition1 = int(refHistogram1.argmax())
         refHistogram2 = hr2.histogramsDist[0][0:127] # check channel 0
-        refPeakPosition2 = refHistogram2.index(max(refHistogram2))
+        refPeakPosition2 = int(refHistogram2.argmax())
         assert refPeakPosition1 > refPeakPosition2
     
     # iterate over SPAD dead time
@@ -870,6 +871,39 @@ class TestTmf8x0xApplication:
         assert reg[0] == self.tof.TMF8X0X_COM_APP_ID__bootloader
         assert self.tof.Status.OK == self.tof.startRamApp()
 
+    def test_ram_crc(self):
+        """Check the assumed bl_cmd_crc_ram framing of readRamCrc against the device: the RAM CRC of a downloaded patch
+           must be the CRC-32 of the hex file segments."""
+        if not self.tof.hex_file:
+            pytest.skip("The RAM CRC is only checked with a patch file")
+        self.tof.disable()
+        assert self.tof.Status.OK == self.tof.enable()
+        assert self.tof.Status.OK == self.tof.downloadHexFile(self.tof.hex_file)
+        image = self.tof.firmwareCache.load(self.tof.hex_file, self.tof.downloadChunkSize, self.tof._buildDownloadFrames)
+        for (address, data), expected in zip(image.segments, image.crcs):
+            assert self.tof.readRamCrc(address, len(data)) == (self.tof.Status.OK, expected)
+        assert self.tof.Status.OK == self.tof.startRamApp()
+
+    def test_command_latency(self):
+        """Measure the command completion times with a poller that does not wait, and check that
+           Tmf8x0xApp.COMMAND_EXPECTED_LATENCY does not delay any of them."""
+        poller = self.tof.poller
+        self.tof.poller = Poller(min_interval=0.00005, backoff=1.0)
+        try:
+            self.tof.disable()
+            for _ in range(10):
+                assert self.tof.Status.OK == self.tof.enableAndStart()
+                assert self.tof.Status.OK == self.tof.readSerialNumber()[0]
+                assert self.tof.Status.OK == self.tof.measure(self.tof.getDefaultConfiguration())
+                assert self.tof.Status.OK == self.tof.stop()
+                self.tof.disable()
+            self.tof.enableAndStart()
+            measured = self.tof.poller.measuredLatencies()
+        finally:
+            self.tof.poller = poller
+        pprint({ key: "{:.0f} us".format(seconds * 1e6) for key, seconds in measured.items() })
+        for key, seconds in measured.items():
+            assert Tmf8x0xApp.COMMAND_EXPECTED_LATENCY.get(key, 0.0) <= seconds, "expected latency of {} too high".format(key)
 
 if __name__ == "__main__":
     # Call pytest here, so we can call it directly.
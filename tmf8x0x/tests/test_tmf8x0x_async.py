@@ -0,0 +1,115 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import asyncio
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_async import AsyncTmf8x0xApp, executorFor
+
+class TestAsyncTmf8x0xApp:
+    com: Tmf8806Emulator
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator(time_scale=5.0)
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _config(self, period_ms:int):
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = period_ms
+        return config
+
+    def test_executor_per_adapter(self):
+        other = Tmf8806Emulator()
+        assert executorFor(self.com) is executorFor(self.com)
+        assert executorFor(self.com) is not executorFor(other)
+        self.tof.enableInstrumentation()
+        assert AsyncTmf8x0xApp(self.tof).executor is executorFor(self.com)
+
+    def test_results(self):
+        tof = AsyncTmf8x0xApp(self.tof)
+        async def run():
+            assert await tof.enableAndStart() == self.tof.Status.OK
+            assert await tof.measure(self._config(10), timeout=0.5) == self.tof.Status.OK
+            results = [ await tof.readResultFrameInt() for _ in range(3) ]
+            assert await tof.stop() == self.tof.Status.OK
+            return results
+        results = asyncio.run(run())
+        assert all(result is not None for result in results)
+        assert [ (result.resultNum - results[0].resultNum) & 0xff for result in results ] == [0, 1, 2]
+        assert results[-1].distPeak == self.com.devices[0].targetDistanceMm
+
+    def test_loop_runs_while_waiting(self):
+        tof = AsyncTmf8x0xApp(self.tof)
+        ticks = []
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.001)
+        async def run():
+            await tof.enableAndStart()
+            await tof.measure(self._config(100))
+            task = asyncio.create_task(ticker())
+            result = await tof.readResultFrameInt()
+            task.cancel()
+            await tof.stop()
+            return result
+        assert asyncio.run(run()) is not None
+        assert len(ticks) > 2
+
+    def test_histograms_and_calibration(self):
+        tof = AsyncTmf8x0xApp(self.tof)
+        async def run():
+            await tof.enableAndStart()
+            assert await tof.factoryCalibration(kilo_iters=1000) == self.tof.Status.OK
+            await tof.run(self.tof.configureHistogramDumping, distance=True)
+            await tof.measure(self._config(10))
+            status, hr = await tof.readHistogramsAndResult()
+            await tof.stop()
+            return status, hr
+        status, hr = asyncio.run(run())
+        assert status == self.tof.Status.OK
+        assert hr.result is not None
+        assert len(hr.histogramsDist) == 5
+
+    def test_timeout(self):
+        self.tof._exception_level = self.tof.ExceptionLevel.OFF
+        tof = AsyncTmf8x0xApp(self.tof)
+        async def run():
+            await tof.enableAndStart()
+            return await tof.readResultFrameInt(timeout=0.01)
+        assert asyncio.run(run()) is None
+        assert self.tof.getAndResetErrors()
+
+    def test_sensors_in_parallel(self):
+        others = [ Tmf8806Emulator(time_scale=5.0) for _ in range(2) ]
+        apps = [ self.tof ] + [ Tmf8x0xApp(ic_com=com) for com in others ]
+        for app in apps[1:]:
+            app.open()
+        async def sensor(tof:AsyncTmf8x0xApp):
+            await tof.enableAndStart()
+            await tof.measure(self._config(10))
+            results = [ await tof.readResultFrameInt() for _ in range(3) ]
+            await tof.stop()
+            return results
+        async def run():
+            return await asyncio.gather(*[ sensor(AsyncTmf8x0xApp(app)) for app in apps ])
+        try:
+            for results in asyncio.run(run()):
+                assert all(result is not None for result in results)
+        finally:
+            for app in apps[1:]:
+                app.disable()
+                app.close()
@@ -0,0 +1,111 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_batch import WriteCombiningIcCom
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_instrument import IcComProxy
+
+class RecordingProxy(IcComProxy):
+    """Keeps every write sent to the wrapped IcCom."""
+
+    def __init__(self, com):
+        super().__init__(com)
+        self.writes = []
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        self.writes.append(bytes(tx))
+        return self.com.i2cTx(devaddr, tx)
+
+class FailingProxy(IcComProxy):
+    """Fails every write to one register."""
+
+    def __init__(self, com, register:int):
+        super().__init__(com)
+        self.register = register
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        if tx[0] == self.register:
+            return self.I2C_OK + 1
+        return self.com.i2cTx(devaddr, tx)
+
+class TestTmf8x0xBatch:
+    com: Tmf8806Emulator
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator()
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def test_clear_and_enable_int(self):
+        device = self.com.devices[0]
+        device.intStatus = 0x03
+        before = self.com.getStatistics()["transactions"]
+        self.tof.clearAndEnableInt(0x03)
+        assert self.com.getStatistics()["transactions"] - before == 1
+        assert device.intStatus == 0
+        assert device.intEnable == 0x03
+        assert self.tof.com is self.com
+
+    def test_combining_and_order(self):
+        recorder = RecordingProxy(self.com)
+        self.tof.com = recorder
+        with self.tof.batchWrites() as batch:
+            self.tof.clearIntStatus(0x01)
+            with self.tof.batchWrites() as inner:       # nested batches join the outer one
+                assert inner is batch
+                self.tof.enableInt(0x01)
+            self.tof.com.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x20, 0x01, 0x02])    # not contiguous
+            assert recorder.writes == []
+            enabled = self.tof.readIntEnable()       # a read sends the queued writes first
+            assert recorder.writes == [ bytes([0xE1, 0x01, 0x01]), bytes([0x20, 0x01, 0x02]) ]
+            self.tof.clearIntStatus(0x01)
+        assert enabled == 0x01
+        assert recorder.writes[-1] == bytes([0xE1, 0x01])
+        assert isinstance(batch, WriteCombiningIcCom) and batch.queued == 4 and batch.sent == 3
+        assert self.tof.com is recorder
+
+    def test_max_length(self):
+        batch = WriteCombiningIcCom(self.com, max_length=3)
+        batch.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x06, 0x01])
+        batch.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x07, 0x02])
+        batch.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x08, 0x03])
+        assert batch.flush() == batch.I2C_OK
+        assert batch.sent == 2
+
+    def test_flush_error(self):
+        self.tof.com = FailingProxy(self.com, 0x20)
+        with pytest.raises(RuntimeError, match="0x20"):
+            with self.tof.batchWrites() as batch:
+                assert self.tof.com.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x20, 0x01]) == batch.I2C_OK    # queued, not sent yet
+        with pytest.raises(RuntimeError, match="0x20"):
+            with self.tof.batchWrites():
+                self.tof.com.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x20, 0x01])
+                self.tof.readIntEnable()            # sent before the read
+        assert len(self.tof.getAndResetErrors()) == 2
+
+        self.tof._exception_level = self.tof.ExceptionLevel.OFF
+        with self.tof.batchWrites() as batch:
+            self.tof.com.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x20, 0x01])
+            assert batch.flush() != batch.I2C_OK
+        assert self.tof.getAndResetErrors() == [ "TMF8x0x.batchWrites: queued write to register 0x20 failed (1)" ]
+        self.tof.com = self.com
+
+        batch = WriteCombiningIcCom(FailingProxy(self.com, 0x20))    # without a device the error is only recorded
+        batch.i2cTx(self.tof.I2C_SLAVE_ADDR, [0x20, 0x01])
+        batch.i2cRx(self.tof.I2C_SLAVE_ADDR, 1)
+        assert self.tof.getAndResetErrors() == [ "TMF8x0x.batchWrites: queued write to register 0x20 failed (1)" ]
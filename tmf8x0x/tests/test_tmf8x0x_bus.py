@@ -0,0 +1,70 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_bus import Tmf8x0xBus
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+
+class TestTmf8x0xBus:
+    com: Tmf8806Emulator
+    bus: Tmf8x0xBus
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator(num_devices=3, time_scale=5.0)
+        self.bus = Tmf8x0xBus(self.com, enable_pins=Tmf8806Emulator.ENABLE_PINS[:3])
+        self.bus.open()
+
+    def teardown_method(self, method):
+        self.bus.close()
+
+    def test_instance_address(self):
+        first = Tmf8x0xApp(ic_com=self.com, i2c_address=0x50)
+        second = Tmf8x0xApp(ic_com=self.com)
+        assert first.I2C_SLAVE_ADDR == 0x50
+        assert second.I2C_SLAVE_ADDR == Tmf8x0xApp.I2C_SLAVE_ADDR
+        first.disable()
+        assert first.I2C_SLAVE_ADDR == Tmf8x0xApp.I2C_SLAVE_ADDR     # power down resets the address
+
+    def test_bring_up(self):
+        assert self.bus.bringUp() == Tmf8x0xApp.Status.OK
+        assert [ device.i2c_address for device in self.com.devices ] == [ 0x42, 0x43, 0x44 ]
+        assert [ sensor.app.I2C_SLAVE_ADDR for sensor in self.bus.sensors ] == [ 0x42, 0x43, 0x44 ]
+        serials = [ tuple(sensor.app.readSerialNumber()[1]) for sensor in self.bus.sensors ]
+        assert len(set(serials)) == 3
+        assert Tmf8x0xApp.I2C_SLAVE_ADDR == 0x41
+
+    def test_default_address_last(self):
+        self.bus = Tmf8x0xBus(self.com, enable_pins=Tmf8806Emulator.ENABLE_PINS[:2], addresses=[0x41, 0x30])
+        assert self.bus.bringUp() == Tmf8x0xApp.Status.OK
+        assert [ device.i2c_address for device in self.com.devices[:2] ] == [ 0x41, 0x30 ]
+
+    def test_invalid_addresses(self):
+        with pytest.raises(ValueError):
+            Tmf8x0xBus(self.com, enable_pins=Tmf8806Emulator.ENABLE_PINS[:2], addresses=[0x42, 0x42])
+
+    def test_fair_interleaving(self):
+        assert self.bus.bringUp() == Tmf8x0xApp.Status.OK
+        config = self.bus.sensors[0].app.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 50
+        assert self.bus.start(config) == Tmf8x0xApp.Status.OK
+        order = []
+        for _ in range(30):
+            sensor, result = self.bus.read()
+            assert result is not None
+            order.append(sensor.name)
+        self.bus.stop()
+        statistics = self.bus.getStatistics()
+        for sensor in self.bus.sensors:
+            assert 9 <= order.count(sensor.name) <= 11
+            assert statistics["sensors"][sensor.name]["deviceDrops"] == 0
+            assert statistics["sensors"][sensor.name]["busSeconds"] > 0
+        assert statistics["results"] == 30
+        assert 0 < statistics["busUtilization"] < 1
@@ -0,0 +1,121 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import csv
+import os
+import numpy
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_results import ResultRingBuffer, decodeResultFrames
+from tmf8x0x.tmf8x0x_csv import iterCSV, loadCSV, loadDirectory
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), "..", "csv_files", "tmf8x0x_measure-2023-07-04-15_00_09.csv")
+
+def assertSameCapture(a, b):
+    assert len(a) == len(b)
+    assert a.tags == b.tags
+    for tag in a.histograms:
+        assert numpy.array_equal(a.histograms[tag], b.histograms[tag])
+        assert numpy.array_equal(a.channels[tag], b.channels[tag])
+    for tag in a.frames:
+        assert numpy.array_equal(a.frames[tag], b.frames[tag])
+    assert numpy.array_equal(a.results, b.results)
+    assert numpy.array_equal(a.objects, b.objects)
+    assert numpy.array_equal(a.temperatures, b.temperatures)
+
+class TestCsvLoader:
+    FRAMES = 8
+
+    def setup_method(self, method):
+        self.tof = Tmf8x0xApp(ic_com=Tmf8806Emulator(time_scale=5.0))
+        self.tof.open()
+        self.tof.enableAndStart()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _capture(self, path:str)->list:
+        self.tof.configureHistogramDumping(distance=True, summed=True)
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 20
+        self.tof.measure(config)
+        frames = []
+        with open(path, "w", encoding="UTF8", newline="") as f:
+            f.write("sep=;\n")
+            writer = csv.writer(f, delimiter=";")
+            for i in range(self.FRAMES):
+                status, hr = self.tof.readHistogramsAndResult()
+                assert status == self.tof.Status.OK
+                hr.toCSV(writer, timestamp=1000.0 + i)
+                frames.append(hr.copy())
+        self.tof.stop()
+        return frames
+
+    def test_load(self, tmp_path):
+        path = str(tmp_path / "capture.csv")
+        frames = self._capture(path)
+        capture = loadCSV(path)
+        assert len(capture) == self.FRAMES
+        assert capture.tags == [ "TG", "SUM", "RES", "OBJ", "TMP" ]
+        dist = capture.stack("TG")
+        for frame, hr in enumerate(frames):
+            assert numpy.array_equal(dist[frame], hr.histogramsDist)
+            assert numpy.array_equal(capture.histogram("SUM", frame)[0], hr.histogramSum)
+            assert bytes(capture.resultBytes[frame]) == bytes(hr.result)
+        assert capture.channels["TG"].tolist() == list(range(len(frames[0].histogramsDist))) * self.FRAMES
+        assert capture.frames["RES"].tolist() == list(range(self.FRAMES))
+        assert capture.results["resultNum"].tolist() == [ hr.result.resultNum for hr in frames ]
+        assert capture.results["distPeak"].tolist() == [ hr.result.distPeak for hr in frames ]
+        assert capture.objects["timestamp"].tolist() == [ 1000000 + 1000 * i for i in range(self.FRAMES) ]
+        assert capture.temperatures.tolist() == [ hr.result.temperature for hr in frames ]
+        assert capture.histogram("TG", self.FRAMES).shape[0] == 0
+
+    def test_chunks_and_directory(self, tmp_path):
+        self._capture(str(tmp_path / "a.csv"))
+        self._capture(str(tmp_path / "b.csv"))
+        whole = loadCSV(str(tmp_path / "a.csv"))
+        chunks = list(iterCSV(str(tmp_path / "a.csv"), chunk_size=1000))
+        assert len(chunks) > 2 * self.FRAMES
+        assert sum(chunk.size for chunk in chunks) == whole.size
+        assertSameCapture(loadCSV(str(tmp_path / "a.csv"), chunk_size=1000), whole)
+        captures = loadDirectory(str(tmp_path), processes=2)
+        assert [ os.path.basename(name) for name in captures ] == [ "a.csv", "b.csv" ]
+        assertSameCapture(captures[str(tmp_path / "a.csv")], whole)
+        for name, capture in loadDirectory(str(tmp_path), processes=1).items():
+            assertSameCapture(captures[name], capture)
+
+    def test_evm_file(self):
+        capture = loadCSV(SAMPLE_FILE)
+        assert len(capture) == 2
+        assert capture.stack("CI").shape == (2, 5, 256)
+        assert capture.frames["CI"].tolist() == [ 0 ] * 5
+        assert capture.frames["PT"].tolist() == [ 0 ] * 5 + [ 1 ] * 5
+        assert capture.resultBytes.shape == (2, 32)
+        assert capture.results["resultNum"].tolist() == [ 0, 1 ]
+
+    def test_frames_without_results_and_errors(self, tmp_path):
+        path = str(tmp_path / "hist.csv")
+        with open(path, "w") as f:
+            f.write("#TG0,1,2\n#TG1,3,4\n#TG0,5,6\n#TG1,7,8,,\n\n")
+        capture = loadCSV(path, delimiter=",")
+        assert capture.stack("TG").tolist() == [ [ [ 1, 2 ], [ 3, 4 ] ], [ [ 5, 6 ], [ 7, 8 ] ] ]
+        with open(path, "w") as f:
+            f.write("sep=;\n#TG0;1;2\n#TG1;3;x\n")
+        with pytest.raises(ValueError):
+            loadCSV(path)
+
+    def test_decode_result_frames(self):
+        raw = numpy.random.default_rng(4).integers(0, 256, size=(6, 30), dtype=numpy.uint8)
+        ring = ResultRingBuffer(8)
+        for frame in raw:
+            ring.push(bytes(frame))
+        assert numpy.array_equal(decodeResultFrames(raw), ring.toArray())
@@ -0,0 +1,114 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import os
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_firmware import FirmwareImageCache
+
+PATCH_FILE = os.path.join(os.path.dirname(__file__), "..", "zeromq", "fw_patch", "mainapp_PATCH_Maxwell.hex")
+
+class TestRamCrcSkip:
+    """downloadHexFile(skip_if_loaded=True) against the emulator with a retained patch and a faulty CRC command."""
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator(time_scale=5.0)
+        self.device = self.com.devices[0]
+        self.device.ram_retention = True
+        self.tof = Tmf8x0xApp(ic_com=self.com, firmware_cache=FirmwareImageCache())
+        self.tof.open()
+        self.tof.enable()
+        assert self.tof.Status.OK == self.tof.downloadHexFile(PATCH_FILE)
+        self.tof.disable()
+        self.tof.enable()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _download(self)->int:
+        """Download with skip_if_loaded, returns the number of frames sent."""
+        self.tof.lastDownloadStatistics = None
+        assert self.tof.Status.OK == self.tof.downloadHexFile(PATCH_FILE, skip_if_loaded=True)
+        assert self.tof.getAndResetErrors() == []
+        return 0 if self.tof.lastDownloadSkipped else self.tof.lastDownloadStatistics.frames
+
+    def test_retained_patch_is_skipped(self):
+        assert self._download() == 0
+
+    def test_wrong_crc(self):
+        image = self.tof.firmwareCache.load(PATCH_FILE, self.tof.downloadChunkSize, self.tof._buildDownloadFrames)
+        address, _ = image.segments[0]
+        self.device.ram[(address & 0xffff) + 10] ^= 0xff      # the address command has 16 bits
+        assert self._download() == 24
+        assert self._download() == 0                        # the download repaired the RAM
+
+    def test_error_status(self):
+        self.device.blFaults[Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram] = self.device.BL_STATUS_UNKNOWN_COMMAND
+        assert self._download() == 24
+
+    def test_timeout(self):
+        self.device.blFaults[Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram] = None
+        assert self._download() == 24
+        assert self.tof.Status.OK == self.tof.startRamApp()
+
+    def test_verify_reports_errors(self):
+        self.device.blFaults[Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram] = self.device.BL_STATUS_UNKNOWN_COMMAND
+        with pytest.raises(RuntimeError):
+            self.tof.downloadHexFile(PATCH_FILE, verify=True)
+
+class TestDownloadStatistics:
+    """Acknowledge times and the learned poll delay of downloads against the emulator in real time."""
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator()
+        self.tof = Tmf8x0xApp(ic_com=self.com, firmware_cache=FirmwareImageCache())
+        self.tof.open()
+        self.tof.enable()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _download(self):
+        assert self.tof.Status.OK == self.tof.downloadHexFile(PATCH_FILE)
+        return self.tof.lastDownloadStatistics
+
+    def test_ack_times_and_learning(self):
+        image = self.tof.firmwareCache.load(PATCH_FILE, self.tof.downloadChunkSize, self.tof._buildDownloadFrames)
+        stats = self._download()
+        assert stats.frames == 24
+        assert stats.bytes == sum(len(data) for _, data in image.segments)
+        assert stats.polls >= stats.frames + stats.misses
+        assert stats.pollDelay == 0.0
+        assert stats.minAckSeconds >= 0.9 * self.com.timing.bl_command    # until the read completed (the emulator has its own clock)
+        assert stats.maxAckSeconds >= stats.minAckSeconds
+        assert stats.toDict()["learnedPollDelay"] == stats.learnedPollDelay
+        assert self._download().pollDelay == stats.learnedPollDelay
+
+        self.com.timing.bl_command = 0.002                          # the bootloader slows down: the delay grows
+        stats = self._download()
+        assert stats.minAckSeconds >= 0.0018
+        assert stats.misses > 0
+        assert stats.learnedPollDelay > 0.001
+
+        self.com.timing.bl_command = 0.00005                        # and shrinks again
+        self._download()
+        assert self._download().learnedPollDelay < 0.001
+
+    def test_fixed_poll_delay(self):
+        self._download()
+        learned = self.tof._learnedPollDelay
+        self.tof.downloadPollDelay = 0.0
+        stats = self._download()
+        assert stats.pollDelay == stats.learnedPollDelay == 0.0
+        assert stats.misses > stats.frames // 2                     # an immediate poll misses most RAM write acknowledges
+        assert self.tof._learnedPollDelay == learned
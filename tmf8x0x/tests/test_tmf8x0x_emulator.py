@@ -0,0 +1,178 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import os
+import numpy
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_firmware import FirmwareImageCache
+from tmf8x0x.tmf8x0x_wait import IntPinWaitStrategy
+from tmf8x0x.auto.tmf8806_regs import TMF880X_APP_VERSION_MAJOR, TMF880X_APP_VERSION_MINOR
+
+PATCH_FILE = os.path.join(os.path.dirname(__file__), "..", "zeromq", "fw_patch", "mainapp_PATCH_Maxwell.hex")
+
+class TestTmf8x0xEmulator:
+    """Driver tests that run against the register-level emulator, no EVM needed."""
+    com: Tmf8806Emulator
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator()
+        self.tof = Tmf8x0xApp(ic_com=self.com, firmware_cache=FirmwareImageCache())
+        assert self.com.I2C_OK == self.tof.open()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def test_rom_app_start(self):
+        assert self.tof.Status.OK == self.tof.enableAndStart()
+        app_id = self.tof.getAppId()
+        assert app_id[0] == self.tof.TMF8X0X_COM_APP_ID__application
+        assert app_id[1] == TMF880X_APP_VERSION_MAJOR
+        assert app_id[2] == TMF880X_APP_VERSION_MINOR
+
+    def test_patch_download(self):
+        self.com.devices[0].ram_retention = True
+        self.tof.hex_file = PATCH_FILE
+        assert self.tof.Status.OK == self.tof.enableAndStart()
+        assert self.tof.getAppId()[3] == 1      # the RAM application reports a patch level
+        assert self.tof.lastDownloadStatistics.frames == 24
+        self.tof.disable()
+        self.tof.enable()
+        assert self.tof.Status.OK == self.tof.downloadHexFile(PATCH_FILE, skip_if_loaded=True, verify=True)
+        assert self.tof.lastDownloadSkipped
+
+    def test_measurement(self):
+        self.tof.enableAndStart()
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 10
+        assert self.tof.Status.OK == self.tof.measure(config)
+        numbers = []
+        for _ in range(3):
+            result = self.tof.readResultFrameInt()
+            assert result.distPeak == self.com.devices[0].targetDistanceMm
+            assert result.sysClock & 1
+            numbers.append(result.resultNum)
+        assert numbers == [1, 2, 3]
+        assert self.tof.Status.OK == self.tof.stop()
+
+    def test_int_pin_wait_strategy(self):
+        self.tof.enableAndStart()
+        self.tof.setWaitStrategy(IntPinWaitStrategy())
+        assert self.tof.Status.OK == self.tof.measure(self.tof.getDefaultConfiguration())
+        assert self.tof.readResultFrameInt() is not None
+        assert self.com.getStatistics()["gpioReads"] > 0
+        self.tof.stop()
+        assert not self.tof.isIntPinPulledLow()
+
+    def test_histogram_retrieval(self):
+        self.tof.enableAndStart()
+        assert self.tof.Status.OK == self.tof.configureHistogramDumping(ec=True, prox=True, distance=True, distance_puc=True, summed=True)
+        assert self.tof.Status.OK == self.tof.measure(self.tof.getDefaultConfiguration())
+        status, hr = self.tof.readHistogramsAndResult()
+        assert status == self.tof.Status.OK
+        assert len(hr.histogramsEc) == 5
+        assert len(hr.histogramsProx) == 5
+        assert len(hr.histogramsDist) == 5
+        assert len(hr.histogramsDistPuc) == 4
+        assert len(hr.histogramSum) == self.tof.TMF8X0X_APP_HISTOGRAM_BINS
+        assert hr.result.resultNum == 1
+        self.tof.stop()
+
+    def test_histogram_buffer_reuse(self):
+        self.tof.enableAndStart()
+        self.tof.configureHistogramDumping(distance=True, summed=True)
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 20
+        self.tof.measure(config)
+        status, hr = self.tof.readHistogramsAndResult()
+        assert status == self.tof.Status.OK
+        assert hr.histogramsDist.dtype == numpy.uint32 and hr.histogramsDist.shape == (5, self.tof.TMF8X0X_APP_HISTOGRAM_BINS)
+        assert len(hr.histogramsEc) == 0 and len(hr.histogramsDistPuc) == 0
+        kept = hr.copy().freeze()
+        view = hr.histogramsDist
+        status, again = self.tof.readHistogramsAndResult(hr=hr)
+        assert again is hr and again.histogramsDist.base is view.base          # same block, no new allocation
+        assert again.result.resultNum == kept.result.resultNum + 1
+        assert kept.frozen and not kept.histogramsDist.flags.writeable
+        assert kept.nbytes == 6 * self.tof.TMF8X0X_APP_HISTOGRAM_BINS * 4
+        with pytest.raises(ValueError):
+            self.tof.readHistogramsAndResult(hr=kept)
+        self.tof.stop()
+        hr.histogramsDist = [ [1, 2], [3, 4] ]
+        assert hr.histogramsDist.tolist() == [ [1, 2], [3, 4] ]
+        hr.histogramSum = []
+        assert len(hr.histogramSum) == 0
+
+    def test_thresholds(self):
+        self.tof.enableAndStart()
+        assert self.tof.Status.OK == self.tof.setThresholds(persistence=2, low_threshold=100, high_threshold=1000)
+        assert (2, 100, 1000) == self.tof.getThresholds()
+        self.tof.setThresholds(persistence=0, low_threshold=0, high_threshold=100)
+        assert self.tof.Status.OK == self.tof.measure(self.tof.getDefaultConfiguration())
+        self.tof._exception_level = Tmf8x0xDevice.ExceptionLevel.OFF
+        assert self.tof.readResultFrameInt(timeout=0.3) is None        # the object is out of range
+        assert self.tof.getAndResetErrors()
+
+    def test_factory_calibration(self):
+        self.tof.enableAndStart()
+        assert self.tof.Status.OK == self.tof.factoryCalibration(kilo_iters=4000)
+        calibration = self.tof.readFactoryCalibration()
+        assert calibration.id == 2
+        assert self.tof.Status.OK == self.tof.setFactoryCalibration(calibration)
+        assert self.tof.Status.OK == self.tof.measure(self.tof.getDefaultConfiguration(), calibration=calibration)
+        assert self.tof.readResultFrameInt().xtalk > 0
+
+    def test_read_serial_number(self):
+        self.tof.enableAndStart()
+        status, serial_number = self.tof.readSerialNumber()
+        assert status == self.tof.Status.OK
+        assert serial_number == self.com.devices[0].serial_number
+
+    def test_i2c_address_change(self):
+        self.tof.enableAndStart()
+        default_address = self.tof.I2C_SLAVE_ADDR
+        assert self.tof.Status.OK == self.tof.changeI2Caddress(address=default_address+1, mask=0x3, value=0x3)
+        assert self.com.devices[0].i2c_address == default_address+1
+        assert self.tof.Status.OK == self.tof.changeI2Caddress(address=default_address)
+        self.tof.setGPIO(gpio0=4)       # GPIO0 low
+        assert self.com.gpioGet(Tmf8806Emulator.GPIO_PINS[0]) == 0
+        self.tof._exception_level = Tmf8x0xDevice.ExceptionLevel.OFF
+        assert self.tof.Status.APP_ERROR == self.tof.changeI2Caddress(address=default_address+1, mask=0x1, value=0x1, timeout=0.05)
+        assert self.com.devices[0].i2c_address == default_address
+
+    def test_time_scale(self):
+        self.com = Tmf8806Emulator(time_scale=10.0)
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 200
+        self.tof.measure(config)
+        first = self.tof.readResultFrameInt(timeout=0.1)
+        second = self.tof.readResultFrameInt(timeout=0.1)      # 20ms host time
+        assert second.resultNum == first.resultNum + 1
+        assert abs((second.sysClock - first.sysClock) / self.com.devices[0].SYS_CLOCK_HZ - 0.2) < 0.001
+
+    def test_two_devices(self):
+        self.com = Tmf8806Emulator(num_devices=2)
+        first = Tmf8x0xApp(ic_com=self.com)
+        first.open()
+        assert first.Status.OK == first.enableAndStart()
+        first.changeI2Caddress(address=0x42)
+        self.com.gpioSet(Tmf8806Emulator.ENABLE_PINS[1], Tmf8806Emulator.ENABLE_PINS[1])
+        second = Tmf8x0xApp(ic_com=self.com)
+        assert second.Status.OK == second.pon1()
+        assert second.Status.OK == second.startRomApp()
+        assert first.readSerialNumber()[1] != second.readSerialNumber()[1]
+        self.tof = first
@@ -0,0 +1,89 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import os
+import shutil
+import __init__
+
+from tmf8x0x.tmf8x0x_firmware import FirmwareImage, FirmwareImageCache
+
+PATCH_FILE = os.path.join(os.path.dirname(__file__), "..", "zeromq", "fw_patch", "mainapp_PATCH_Maxwell.hex")
+
+class TestFirmwareImageCache:
+    CHUNK_SIZE = 128
+
+    def setup_method(self, method):
+        self.builds = 0
+
+    def _build(self, segments:list, chunk_size:int)->list:
+        self.builds += 1
+        return [ data[i:i + chunk_size] for _, data in segments for i in range(0, len(data), chunk_size) ]
+
+    def _copy(self, tmp_path)->str:
+        hex_file = str(tmp_path / "patch.hex")
+        shutil.copyfile(PATCH_FILE, hex_file)
+        return hex_file
+
+    def test_hit(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        cache = FirmwareImageCache(cache_dir=cache_dir)
+        image = cache.load(PATCH_FILE, self.CHUNK_SIZE, self._build)
+        assert cache.load(PATCH_FILE, self.CHUNK_SIZE, self._build) is image
+        assert (cache.hits, cache.misses, self.builds) == (1, 1, 1)
+        assert os.listdir(cache_dir) == [ "{}_{}.tmfimg".format(image.digest, self.CHUNK_SIZE) ]
+
+        from_disk = FirmwareImageCache(cache_dir=cache_dir).load(PATCH_FILE, self.CHUNK_SIZE, self._build)
+        assert self.builds == 1
+        assert from_disk.segments == image.segments and from_disk.frames == image.frames
+
+    def test_mtime_change(self, tmp_path):
+        hex_file = self._copy(tmp_path)
+        cache = FirmwareImageCache()
+        image = cache.load(hex_file, self.CHUNK_SIZE, self._build)
+        stat = os.stat(hex_file)
+        os.utime(hex_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.load(hex_file, self.CHUNK_SIZE, self._build) is image     # same content: hashed again, not parsed
+        assert self.builds == 1
+
+        with open(hex_file, "r") as f:
+            lines = f.readlines()
+        with open(hex_file, "w") as f:
+            f.writelines(lines[:1] + lines[2:])                                 # one data record less
+        os.utime(hex_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        changed = cache.load(hex_file, self.CHUNK_SIZE, self._build)
+        assert changed.digest != image.digest and changed.size < image.size
+        assert self.builds == 2
+
+    def test_corrupt_file(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        image = FirmwareImageCache(cache_dir=cache_dir).load(PATCH_FILE, self.CHUNK_SIZE, self._build)
+        blob = image.toBytes()
+        assert FirmwareImage.fromBytes(image.digest, blob).frames == image.frames
+        assert FirmwareImage.fromBytes(image.digest, blob[:-1]) is None
+        assert FirmwareImage.fromBytes(image.digest, blob[:len(blob) // 2]) is None
+        assert FirmwareImage.fromBytes(image.digest, blob + b"\0") is None
+
+        path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        with open(path, "wb") as f:
+            f.write(blob[:len(blob) // 2])
+        rebuilt = FirmwareImageCache(cache_dir=cache_dir).load(PATCH_FILE, self.CHUNK_SIZE, self._build)
+        assert self.builds == 2
+        assert rebuilt.frames == image.frames
+        with open(path, "rb") as f:
+            assert f.read() == blob                                             # replaced by a valid image
+        assert os.listdir(cache_dir) == [ os.path.basename(path) ]              # no temporary file left
+
+    def test_write_error(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        with open(cache_dir, "w") as f:
+            f.write("not a directory")
+        cache = FirmwareImageCache(cache_dir=cache_dir)
+        image = cache.load(PATCH_FILE, self.CHUNK_SIZE, self._build)
+        assert image.size > 0
+        assert cache.writeErrors == 1
+        assert cache.load(PATCH_FILE, self.CHUNK_SIZE, self._build) is image
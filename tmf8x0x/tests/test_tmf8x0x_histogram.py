@@ -0,0 +1,176 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import numpy
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp, Histogram
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+
+def knownHistogram(kind:int, tdc:int)->numpy.ndarray:
+    """Every bin a different value with both bytes set, so a misplaced quarter or swapped byte order shows up."""
+    return (numpy.arange(Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_BINS) * 257 + tdc * 4099 + kind).astype(Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_DTYPE)
+
+class TestHistogramDecode:
+    """readHistogramsUnscaled against the emulator publishing known quarter payloads."""
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator(time_scale=5.0)
+        self.com.devices[0]._histogram = knownHistogram
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+        self.tof.configureHistogramDumping(distance=True)
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 20
+        self.tof.measure(config)
+
+    def teardown_method(self, method):
+        self.tof.stop()
+        self.tof.disable()
+        self.tof.close()
+
+    def _read(self, buffer:numpy.ndarray=None)->list:
+        assert self.tof.waitStrategy.waitForInterrupt(self.tof, self.tof.TMF8X0X_APP_INTERRUPT_DIAG, 1.0, clear=False)
+        status, histograms = self.tof.readHistogramsUnscaled(buffer=buffer)
+        assert status == self.tof.Status.OK
+        assert self.tof.waitStrategy.waitForInterrupt(self.tof, self.tof.TMF8X0X_APP_INTERRUPT_RESULTS, 1.0)
+        self.tof.com.i2cTxRx(self.tof.I2C_SLAVE_ADDR, [ self.tof.TMF8X0X_APP_COM_STATE ], self.tof.TMF8X0X_APP_RESULT_SIZE)
+        return histograms
+
+    def test_decode(self):
+        histograms = self._read()
+        assert len(histograms) == self.tof.TMF8X0X_APP_HISTOGRAM_TDCS
+        for tdc, histogram in enumerate(histograms):
+            assert histogram.type == Histogram.HISTOGRAM_DISTANCE
+            assert histogram.data.dtype == numpy.uint16
+            assert numpy.array_equal(histogram.data, knownHistogram(Histogram.HISTOGRAM_DISTANCE, tdc))
+        assert histograms[1].bins == histograms[1].data.tolist()                           # compatibility view
+        histograms[1].bins[0] += 1
+        assert histograms[1].bins[0] == histograms[1].data[0]                              # a copy, read-only
+
+    def test_buffer(self):
+        first = self._read()
+        assert all(histogram.data.base is self.tof._histogramBuffer for histogram in first)  # preallocated, no allocation per call
+        kept = [ histogram.data.copy() for histogram in first ]
+        first[0].data[0] = 1
+        second = self._read()
+        assert second[0].data[0] == knownHistogram(Histogram.HISTOGRAM_DISTANCE, 0)[0]
+        assert first[0].data is not second[0].data and first[0].data[0] == second[0].data[0]  # the next readout overwrites
+        assert all(numpy.array_equal(a.data, b) for a, b in zip(second[1:], kept[1:]))
+
+        buffer = numpy.zeros((self.tof.TMF8X0X_APP_HISTOGRAM_TDCS, self.tof.TMF8X0X_APP_HISTOGRAM_BINS), dtype=numpy.uint16)
+        third = self._read(buffer)
+        assert all(histogram.data.base is buffer for histogram in third)                   # rows of the caller's buffer
+        assert numpy.array_equal(buffer[4], knownHistogram(Histogram.HISTOGRAM_DISTANCE, 4))
+        assert numpy.array_equal(second[4].data, kept[4])                                  # the default buffer is untouched
+
+class StaleQuarters:
+    """Publishes every histogram quarter after the first one only on the delay-th register read after it was due,
+       the reads before that see the previous quarter (a stale TID), like a host that polls faster than the device."""
+
+    def __init__(self, device, delay:int):
+        self.device = device
+        self.delay = delay
+        self.pending = 0
+        self._read = device.read
+        self._nextQuarter = device._nextQuarter
+        device.read = self.read
+        device._nextQuarter = self.nextQuarter
+
+    def nextQuarter(self):
+        if self.device.histogramQuarter == -1:
+            self.pending = 0
+            self._nextQuarter()                 # the first quarter comes with the read_histogram command
+        elif not self.pending:
+            self.pending = self.delay
+
+    def read(self, register:int, size:int, now:float)->bytearray:
+        if self.device.histogramQuarter is None:
+            self.pending = 0                    # the set is done (continue command), nothing left to publish
+        elif self.pending:
+            self.pending -= 1
+            if not self.pending:
+                self._nextQuarter()
+        return self._read(register, size, now)
+
+class TestSingleHistogramRead:
+    """Transactions of _readSingleHistogram: header mismatch, short read and the summed histogram early return."""
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator(time_scale=5.0)
+        self.device = self.com.devices[0]
+        self.device._histogram = knownHistogram
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+
+    def teardown_method(self, method):
+        self.tof.stop()
+        self.tof.disable()
+        self.tof.close()
+
+    def _read(self, **dump)->list:
+        self.tof.configureHistogramDumping(**dump)
+        self.tof.measure(self.tof.getDefaultConfiguration())
+        assert self.tof.waitStrategy.waitForInterrupt(self.tof, self.tof.TMF8X0X_APP_INTERRUPT_DIAG, 1.0, clear=False)
+        status, histograms = self.tof.readHistogramsUnscaled()
+        assert status == self.tof.Status.OK
+        return histograms
+
+    def test_in_time(self):
+        histograms = self._read(distance=True)
+        quarters = self.tof.TMF8X0X_APP_HISTOGRAM_TDCS * self.tof.TMF8X0X_APP_HISTOGRAM_QUARTERS
+        assert self.tof.histogramReadTransactions == quarters                 # header and payload in one read
+        assert numpy.array_equal(histograms[2].data, knownHistogram(Histogram.HISTOGRAM_DISTANCE, 2))
+
+    def test_stale_tid(self):
+        StaleQuarters(self.device, delay=3)
+        histograms = self._read(distance=True)
+        quarters = self.tof.TMF8X0X_APP_HISTOGRAM_TDCS * self.tof.TMF8X0X_APP_HISTOGRAM_QUARTERS
+        # per late quarter: stale full read, stale header, matching header (short read), full read
+        assert self.tof.histogramReadTransactions == 1 + 4 * (quarters - 1)
+        for tdc, histogram in enumerate(histograms):
+            assert numpy.array_equal(histogram.data, knownHistogram(Histogram.HISTOGRAM_DISTANCE, tdc))
+
+    def test_summed(self):
+        StaleQuarters(self.device, delay=2)
+        histograms = self._read(summed=True)
+        assert histograms[0].type == Histogram.HISTOGRAM_SUM and histograms[1:] == [ None ] * 4
+        # quarter 0 in one read, quarter 1: stale full read, matching header (short read), full read, then no more quarters
+        assert self.tof.histogramReadTransactions == 1 + 3
+        bins = self.tof.TMF8X0X_APP_HISTOGRAM_BINS // 2
+        assert numpy.array_equal(histograms[0].data[:bins], knownHistogram(Histogram.HISTOGRAM_DISTANCE, 0)[:bins])
+        assert not histograms[0].data[bins:].any()
+
+    def _dropReads(self, drops:int=None):
+        """Empty reads instead of the first drops quarter reads (all if None), e.g. a replay mismatch without exception."""
+        frame_size = self.tof.TMF8X0X_APP_RESULT_HEADER_SIZE + self.tof.TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE
+        read = self.com.i2cTxRx
+        dropped = []
+        def dropping(devaddr:int, tx:list, rx_size:int)->bytearray:
+            if tx[0] == self.tof.TMF8X0X_APP_COM_STATE and rx_size == frame_size and (drops is None or len(dropped) < drops):
+                dropped.append(rx_size)
+                return bytearray()
+            return read(devaddr, tx, rx_size)
+        self.com.i2cTxRx = dropping
+
+    def test_short_read(self):
+        self._dropReads(2)
+        histograms = self._read(distance=True)
+        assert numpy.array_equal(histograms[0].data, knownHistogram(Histogram.HISTOGRAM_DISTANCE, 0))
+        quarters = self.tof.TMF8X0X_APP_HISTOGRAM_TDCS * self.tof.TMF8X0X_APP_HISTOGRAM_QUARTERS
+        assert self.tof.histogramReadTransactions == quarters + 2         # the empty reads are polled again
+
+    def test_short_read_timeout(self):
+        self._dropReads()
+        self.tof.configureHistogramDumping(distance=True)
+        self.tof.measure(self.tof.getDefaultConfiguration())
+        assert self.tof.waitStrategy.waitForInterrupt(self.tof, self.tof.TMF8X0X_APP_INTERRUPT_DIAG, 1.0, clear=False)
+        status, _ = self.tof.readHistogramsUnscaled(timeout=0.05)
+        assert status == self.tof.Status.TIMEOUT_ERROR                    # an error status, not an IndexError
@@ -0,0 +1,66 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_instrument import InstrumentedIcCom
+
+class TestTmf8x0xInstrumentation:
+    com: Tmf8806Emulator
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator()
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def test_disabled_by_default(self):
+        self.tof.enableAndStart()
+        assert self.tof.com is self.com
+        assert self.tof.getInstrumentationSnapshot() == {}
+
+    def test_transactions_per_api(self):
+        self.tof.enableInstrumentation()
+        assert isinstance(self.tof.com, InstrumentedIcCom)
+        self.tof.enableAndStart()
+        self.tof.configureHistogramDumping(distance=True)
+        self.tof.measure(self.tof.getDefaultConfiguration())
+        self.tof.readHistogramsAndResult()
+        self.tof.stop()
+        snapshot = self.tof.getInstrumentationSnapshot()
+        quarters = snapshot["readHistogramsAndResult/readHistogramsUnscaled/histogram_quarter"]
+        assert quarters["transactions"] >= 20
+        assert quarters["bytesRead"] >= 20 * self.tof.TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE
+        assert quarters["latency"]["count"] == quarters["transactions"]
+        assert snapshot["measure"]["transactions"] > 0
+        assert snapshot["stop/clearIntStatus"]["transactions"] == 1
+        total = sum(stats["transactions"] for stats in snapshot.values())
+        assert total == self.com.getStatistics()["transactions"]
+
+        self.tof.resetInstrumentation()
+        assert self.tof.getInstrumentationSnapshot() == {}
+        self.tof.disableInstrumentation()
+        assert self.tof.com is self.com
+
+    def test_fused_command_done(self):
+        self.tof.enableAndStart()
+        self.tof.enableInstrumentation()
+        transactions = {}
+        for fused in (False, True):
+            self.tof.fuseStatusCheck = fused
+            self.tof.resetInstrumentation()
+            assert self.tof.setGPIO(gpio0=4) == self.tof.Status.OK
+            snapshot = self.tof.getInstrumentationSnapshot()
+            transactions[fused] = snapshot["setGPIO/commandDone"]["transactions"]
+        assert transactions[True] == transactions[False] - 1
@@ -0,0 +1,130 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import time
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_poll import LatencyHistogram, Poller
+
+READ_TIME = 0.00005
+"""Time one poll (an I2C read) takes on the fake clock."""
+
+class FakeClock:
+    """Replaces time.monotonic and time.sleep, so the poll schedule is exact."""
+
+    def __init__(self, monkeypatch):
+        self.now = 0.0
+        self.sleeps = []
+        monkeypatch.setattr(time, "monotonic", lambda: self.now)
+        monkeypatch.setattr(time, "sleep", self.sleep)
+
+    def sleep(self, seconds:float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def condition(self, done_after:int):
+        """A poll that takes READ_TIME and succeeds on call done_after (never if None)."""
+        self.polls = 0
+        def poll():
+            self.now += READ_TIME
+            self.polls += 1
+            return done_after is not None and self.polls >= done_after
+        return poll
+
+class TestPoller:
+
+    def test_backoff(self, monkeypatch):
+        clock = FakeClock(monkeypatch)
+        poller = Poller({ "stop": 0.001 }, min_interval=0.0001, max_interval=0.0005, backoff=2.0)
+        assert poller.poll("stop", clock.condition(7), timeout=1.0)
+        assert clock.sleeps[0] == pytest.approx(0.001 - READ_TIME)        # the first poll is immediate, then the expected latency
+        assert clock.sleeps[1:] == pytest.approx([ 0.0001, 0.0002, 0.0004, 0.0005, 0.0005 ])
+        stats = poller.getStatistics()["stop"]
+        assert (stats["calls"], stats["polls"], stats["maxPolls"], stats["timeouts"]) == (1, 7, 7, 0)
+        assert stats["latency"]["count"] == 1
+        assert stats["latency"]["maxUs"] == pytest.approx(clock.now * 1e6, abs=1)
+
+        clock.sleeps = []
+        assert poller.poll("unknown", clock.condition(3), timeout=1.0)   # no expected latency: back off right away
+        assert clock.sleeps == pytest.approx([ 0.0001, 0.0002 ])
+
+    def test_done_on_first_poll(self, monkeypatch):
+        clock = FakeClock(monkeypatch)
+        poller = Poller({ "measure": 0.0005 })
+        assert poller.poll("measure", clock.condition(1), timeout=1.0)
+        assert clock.sleeps == []
+        assert poller.statistics["measure"].polls == 1
+
+    def test_timeout(self, monkeypatch):
+        clock = FakeClock(monkeypatch)
+        poller = Poller({ "measure": 0.002 }, min_interval=0.0001, max_interval=0.005)
+        assert poller.poll("measure", clock.condition(None), timeout=0.01) is None
+        assert clock.now == pytest.approx(0.01, abs=2 * READ_TIME)         # no sleep beyond the deadline
+        assert all(seconds <= 0.005 for seconds in clock.sleeps)
+        stats = poller.statistics["measure"]
+        assert (stats.calls, stats.timeouts, stats.latency.count) == (1, 1, 0)
+        assert stats.polls == clock.polls
+
+        assert poller.poll("measure", clock.condition(None), timeout=0.0) is None   # evaluated at least once
+        assert clock.polls == 1
+        assert stats.timeouts == 2
+
+    def test_measured_latencies(self, monkeypatch):
+        clock = FakeClock(monkeypatch)
+        poller = Poller(min_interval=0.0001, backoff=1.0)
+        for done_after in ( 3, 5, 4 ):
+            poller.poll("stop", clock.condition(done_after), timeout=1.0)
+        poller.poll("measure", clock.condition(None), timeout=0.001)
+        measured = poller.measuredLatencies()
+        assert list(measured) == [ "stop" ]                                 # timeouts are not a latency
+        assert measured["stop"] == pytest.approx(3 * READ_TIME + 2 * 0.0001, rel=0.07)
+        poller.resetStatistics()
+        assert poller.getStatistics() == {}
+
+class TestLatencyHistogram:
+
+    def test_buckets(self):
+        histogram = LatencyHistogram()
+        for value in list(range(0, 40)) + [ 100, 1000, 12345, 10**6, 10**8 ]:
+            index = histogram._index(value)
+            low = histogram._lowestValue(index)
+            assert low <= value
+            assert value - low <= max(1, value / 8)                           # 4 sub-bucket bits: 8 buckets per power of two
+            assert histogram._lowestValue(index + 1) > value                 # value lies in its bucket
+        assert histogram._index(15) < histogram._index(16) == histogram._index(17) < histogram._index(18)
+
+    def test_record_and_percentiles(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) == 0 and histogram.toDict()["meanUs"] == 0.0
+        for us in range(1, 1001):
+            histogram.record(us * 1e-6)
+        summary = histogram.toDict()
+        assert (summary["count"], summary["minUs"], summary["maxUs"]) == (1000, 1, 1000)
+        assert summary["meanUs"] == pytest.approx(500.5)
+        assert summary["p50Us"] == pytest.approx(500, rel=1 / 8)
+        assert summary["p90Us"] == pytest.approx(900, rel=1 / 8)
+        assert summary["p99Us"] == pytest.approx(990, rel=1 / 8)
+        assert histogram.percentile(0) == 1 and histogram.percentile(100) <= 1000
+        assert sum(summary["buckets"].values()) == 1000
+        histogram.record(-1.0)
+        assert histogram.minUs == 0                                           # clamped, a clock step cannot go negative
+
+    def test_merge(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for us in ( 10, 20, 30 ):
+            a.record(us * 1e-6)
+        for us in ( 5, 2000 ):
+            b.record(us * 1e-6)
+        a.merge(b)
+        assert (a.count, a.minUs, a.maxUs, a.totalUs) == (5, 5, 2000, 2065)
+        empty = LatencyHistogram()
+        empty.merge(a)
+        assert empty.toDict() == a.toDict()
+        a.reset()
+        assert a.count == 0 and a.toDict()["buckets"] == {}
@@ -0,0 +1,67 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp, PreparedMeasurement
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_instrument import IcComProxy
+from tmf8x0x.auto.tmf8806_regs import tmf8806StateData
+
+class WriteLog(IcComProxy):
+    """Keeps every write sent to the wrapped IcCom."""
+
+    def __init__(self, com):
+        super().__init__(com)
+        self.writes = []
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        self.writes.append(bytes(tx))
+        return self.com.i2cTx(devaddr, tx)
+
+class TestPreparedMeasurement:
+    com: WriteLog
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = WriteLog(Tmf8806Emulator(time_scale=5.0))
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+        self.tof.factoryCalibration()
+        self.calibration = self.tof.readFactoryCalibration()
+        self.config = self.tof.getDefaultConfiguration()
+        self.config.data.repetitionPeriodMs = 0
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _writes(self, start)->list:
+        self.com.writes = []
+        assert start() == self.tof.Status.OK
+        result = self.tof.readResultFrameInt()
+        return self.com.writes, result
+
+    def test_same_frames_as_measure(self):
+        for calibration in (None, self.calibration):
+            prepared = self.tof.prepareMeasurement(self.config, calibration)
+            assert isinstance(prepared, PreparedMeasurement)
+            state = None
+            for _ in range(3):
+                expected, result = self._writes(lambda: self.tof.measure(self.config, calibration, state))
+                writes, _ = self._writes(lambda: self.tof.measurePrepared(prepared, state))
+                assert writes == expected
+                state = tmf8806StateData.from_buffer_copy(bytes(result.stateData))
+
+    def test_config_copied(self):
+        prepared = self.tof.prepareMeasurement(self.config, self.calibration)
+        self.config.data.kIters = 1
+        _, measure_frame = prepared.frames()
+        assert measure_frame != bytes([self.tof.TMF8X0X_APP_CMD_DATA_9]) + bytes(self.config)
+        assert self.config.data.data.factoryCal == 0
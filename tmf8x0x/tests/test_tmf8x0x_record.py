@@ -0,0 +1,82 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import io
+import time
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_record import LogRecord, RecordingIcCom, ReplayIcCom, readLog
+
+def session(tof:Tmf8x0xApp)->list:
+    """A short session: start, two results, one histogram set, stop."""
+    tof.open()
+    tof.enableAndStart()
+    config = tof.getDefaultConfiguration()
+    config.data.repetitionPeriodMs = 20
+    tof.measure(config)
+    results = [ bytes(tof.readResultFrameInt()) for _ in range(2) ]
+    tof.stop()
+    tof.configureHistogramDumping(distance=True)
+    tof.measure(config)
+    status, hr = tof.readHistogramsAndResult()
+    tof.stop()
+    tof.disable()
+    tof.close()
+    return results + [ bytes(hr.result), hr.histogramsDist.tolist() ]
+
+class TestRecordReplay:
+
+    def _record(self):
+        log = io.BytesIO()
+        com = RecordingIcCom(Tmf8806Emulator(time_scale=5.0), log)
+        recorded = session(Tmf8x0xApp(ic_com=com))
+        com.closeLog()
+        log.seek(0)
+        return log, recorded, com.records
+
+    def test_log_records(self):
+        log, _, count = self._record()
+        records = list(readLog(log))
+        assert len(records) == count
+        assert records[0].kind == LogRecord.I2C_OPEN
+        assert records[-1].kind == LogRecord.I2C_CLOSE
+        assert all(a.time <= b.time for a, b in zip(records, records[1:]))
+        assert any(record.kind == LogRecord.I2C_TXRX and len(record.response) > Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE
+                   for record in records)
+
+    def test_replay(self):
+        log, recorded, _ = self._record()
+        com = ReplayIcCom(log)
+        assert session(Tmf8x0xApp(ic_com=com)) == recorded
+        assert com.finished
+        assert com.errors == []
+
+    def test_replay_realtime(self):
+        log, recorded, _ = self._record()
+        records = list(readLog(log))
+        log.seek(0)
+        start = time.perf_counter()
+        assert session(Tmf8x0xApp(ic_com=ReplayIcCom(log, realtime=True))) == recorded
+        assert time.perf_counter() - start >= records[-1].time
+
+    def test_mismatch(self):
+        log, _, _ = self._record()
+        tof = Tmf8x0xApp(ic_com=ReplayIcCom(log))
+        tof.open()
+        with pytest.raises(RuntimeError):
+            tof.readSerialNumber()                  # not in the recording
+
+    def test_truncated_log(self):
+        log, _, count = self._record()
+        data = log.getvalue()
+        assert len(list(readLog(io.BytesIO(data[:-3])))) == count - 1
+        with pytest.raises(ValueError):
+            ReplayIcCom(io.BytesIO(b"not a log file"))
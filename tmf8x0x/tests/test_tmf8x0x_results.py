@@ -0,0 +1,84 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import os
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_results import ResultRingBuffer, RESULT_FRAME_SIZE, recordToResultFrame
+from tmf8x0x.auto.tmf8806_regs import tmf8806DistanceResultFrame
+
+class TestResultRingBuffer:
+
+    def test_decode_matches_ctypes(self):
+        ring = ResultRingBuffer(capacity=4)
+        for _ in range(10):
+            wire = bytearray(os.urandom(RESULT_FRAME_SIZE))
+            frame = tmf8806DistanceResultFrame.from_buffer_copy(wire)
+            record = ring.push(bytearray(4) + wire, 4)
+            for name in ("resultNum", "reliability", "resultStatus", "distPeak", "sysClock", "temperature", "referenceHits", "objectHits", "xtalk"):
+                assert record[name] == getattr(frame, name), name
+            assert list(record["stateData"]) == list(frame.stateData)
+            assert bytes(recordToResultFrame(record)) == bytes(wire)
+
+    def test_wrap_around(self):
+        ring = ResultRingBuffer(capacity=3)
+        assert ring.latest is None
+        for number in range(1, 6):
+            ring.push(bytes([number]) + bytes(RESULT_FRAME_SIZE - 1))
+        assert len(ring) == 3
+        assert ring.count == 5
+        assert [ record["resultNum"] for record in ring.toArray() ] == [3, 4, 5]
+        assert ring[0]["resultNum"] == 3
+        assert ring[-1]["resultNum"] == ring.latest["resultNum"] == 5
+        older, newer = ring.views()
+        assert older.base is not None and newer.base is not None     # views, no copies
+        with pytest.raises(IndexError):
+            ring[3]
+
+    def test_read_into_ring(self):
+        com = Tmf8806Emulator()
+        tof = Tmf8x0xApp(ic_com=com)
+        tof.open()
+        tof.enableAndStart()
+        ring = ResultRingBuffer(capacity=2)
+        config = tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 5
+        tof.measure(config)
+        records = [ tof.readResultFrameIntoRing(ring) for _ in range(3) ]
+        tof.stop()
+        tof.disable()
+        assert records[2]["resultNum"] == 3
+        assert records[2]["distPeak"] == com.devices[0].targetDistanceMm
+        assert records[0]["resultNum"] == 3         # the slot of the first frame was re-used
+        assert ring.count == 3
+
+    def test_read_errors(self):
+        com = Tmf8806Emulator()
+        tof = Tmf8x0xApp(ic_com=com)
+        tof.open()
+        tof.enableAndStart()
+        ring = ResultRingBuffer(capacity=2)
+        with pytest.raises(RuntimeError, match="timeout"):
+            tof.readResultFrameIntoRing(ring, timeout=0.01)                     # no measurement running
+        config = tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 5
+        tof.measure(config)
+        read = com.i2cTxRx
+        com.i2cTxRx = lambda devaddr, tx, rx_size: read(devaddr, tx, rx_size)[:17 if rx_size == tof.TMF8X0X_APP_RESULT_SIZE else None]
+        try:
+            with pytest.raises(RuntimeError, match="short read"):
+                tof.readResultFrameIntoRing(ring)
+        finally:
+            com.i2cTxRx = read
+        assert com.errors[-1] == "TMF8x0x.readResultFrameIntoRing: short read, 17 of 34 bytes"
+        assert ring.count == 0
+        tof.stop()
+        tof.disable()
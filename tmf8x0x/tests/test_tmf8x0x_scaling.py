@@ -0,0 +1,60 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import csv
+import io
+import numpy
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp, Histogram
+from tmf8x0x.tmf8x0x_scaling import shiftScale, factorScale
+
+def referenceScale(bins:list)->list:
+    """The list implementation the scaling engine replaces."""
+    return ([bin << bins[127] for bin in bins[0:127]] + bins[127:128]
+            + [bin << bins[255] for bin in bins[128:255]] + bins[255:])
+
+def rawHistograms(*shape)->numpy.ndarray:
+    raw = numpy.random.default_rng(1).integers(0, 1 << 12, size=shape + (256,), dtype=numpy.uint16)
+    raw[..., 127] = numpy.random.default_rng(2).integers(0, 8, size=shape)
+    raw[..., 255] = numpy.random.default_rng(3).integers(0, 8, size=shape)
+    return raw
+
+class TestScaling:
+
+    def test_shift_scale(self):
+        raw = rawHistograms(3, 5)                   # frames x channels x bins
+        scaled = shiftScale(raw)
+        assert scaled.dtype == numpy.uint32 and scaled.shape == raw.shape
+        for frame in range(3):
+            for channel in range(5):
+                assert scaled[frame, channel].tolist() == referenceScale(raw[frame, channel].tolist())
+        assert Tmf8x0xApp._scaleBins(raw[0, 0].tolist()) == scaled[0, 0].tolist()
+        short = list(range(100))
+        assert shiftScale(short).tolist() == short
+
+    def test_in_place(self):
+        raw = rawHistograms(2, 5)
+        expected = shiftScale(raw)
+        block = raw.astype(numpy.uint32)
+        assert Tmf8x0xApp.scaleHistograms(block, Histogram.HISTOGRAM_DISTANCE, out=block) is block
+        assert numpy.array_equal(block, expected)
+        block = raw.astype(numpy.uint32)
+        assert numpy.array_equal(Tmf8x0xApp.scaleHistograms(raw, Histogram.HISTOGRAM_PUC), raw.astype(numpy.uint32) * 2)
+        assert factorScale(block, 4, out=block) is block
+        assert numpy.array_equal(block, raw.astype(numpy.uint32) * 4)
+
+    def test_histogram_csv(self):
+        raw = rawHistograms()
+        histogram = Histogram(raw)
+        histogram.type = Histogram.HISTOGRAM_DISTANCE
+        out = io.StringIO()
+        histogram.toCSV(csv.writer(out))
+        row = next(csv.reader(io.StringIO(out.getvalue())))
+        assert row[0] == "#TG"
+        assert [ int(value) for value in row[1:] ] == referenceScale(raw.tolist())
@@ -0,0 +1,129 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import csv
+import io
+import os
+import numpy
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp, Histogram
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.auto.tmf8806_regs import tmf8806DistanceResultFrame
+from tmf8x0x.tmf8x0x_session import PROC_PUC_TAG, SessionLogWriter, SessionLogReader, convertToCSV
+
+class TestSessionLog:
+    FRAMES = 10
+
+    def setup_method(self, method):
+        self.tof = Tmf8x0xApp(ic_com=Tmf8806Emulator(time_scale=5.0))
+        self.tof.open()
+        self.tof.enableAndStart()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _capture(self, path:str, index_interval:int=4, close:bool=True)->list:
+        self.tof.configureHistogramDumping(distance=True, summed=True)
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = 20
+        self.tof.measure(config)
+        frames = []
+        log = SessionLogWriter(path, index_interval=index_interval)
+        for i in range(self.FRAMES):
+            status, hr = self.tof.readHistogramsAndResult()
+            assert status == self.tof.Status.OK
+            log.write(hr, host_time=1000.0 + i)
+            frames.append(hr)
+        self.tof.stop()
+        if close:
+            log.close()
+        else:
+            log.flush()
+        return frames
+
+    def test_roundtrip(self, tmp_path):
+        path = str(tmp_path / "session.tmfs")
+        frames = self._capture(path)
+        with SessionLogReader(path) as log:
+            assert len(log) == self.FRAMES
+            for frame, hr in zip(log, frames):
+                assert numpy.array_equal(frame.histogramsDist, hr.histogramsDist)
+                assert numpy.array_equal(frame.histogramSum, hr.histogramSum)
+                assert bytes(frame.result) == bytes(hr.result)
+                assert frame.frozen
+            results = log.results()
+            assert results["resultNum"].tolist() == [ hr.result.resultNum for hr in frames ]
+            assert log.find(host_time=1004.5) == 5
+            assert log.find(sys_clock=int(log.index["sysClock"][3])) == 3
+            assert log.findResultNum(frames[7].result.resultNum) == 7
+            assert log.findResultNum(300 % 256, start=self.FRAMES) == -1
+            blocks = log.histograms(2)
+            assert numpy.array_equal(blocks[Histogram.HISTOGRAM_DISTANCE], frames[2].histogramsDist)
+            del blocks
+        assert os.path.getsize(path) < 6 * self.FRAMES * 256 * 4 + 2000
+
+    def test_unclosed_and_truncated(self, tmp_path):
+        path = str(tmp_path / "session.tmfs")
+        frames = self._capture(path, close=False)
+        with SessionLogReader(path) as log:
+            assert len(log) == self.FRAMES                   # no END record: the records are scanned
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:-10])                             # the last result record is incomplete
+        with SessionLogReader(path) as log:
+            assert len(log) == self.FRAMES - 1
+            assert bytes(log[-1].result) == bytes(frames[-2].result)
+        with open(path, "wb") as f:
+            f.write(b"not a session log")
+        with pytest.raises(ValueError):
+            SessionLogReader(path)
+
+    def test_raw_histograms(self, tmp_path):
+        path = str(tmp_path / "session.tmfs")
+        self.tof.configureHistogramDumping(distance=True)
+        self.tof.measure(self.tof.getDefaultConfiguration())
+        self.tof.waitStrategy.waitForInterrupt(self.tof, self.tof.TMF8X0X_APP_INTERRUPT_DIAG, 1.0, clear=False)
+        status, histograms = self.tof.readHistogramsUnscaled()
+        raw = numpy.array([ histogram.data for histogram in histograms ], dtype=numpy.uint16)
+        status, hr = self.tof.readHistogramsAndResult()
+        self.tof.stop()
+        with SessionLogWriter(path) as log:
+            log.writeHistograms(raw, Histogram.HISTOGRAM_DISTANCE)
+            log.writeResult(hr.result)
+        with SessionLogReader(path) as log:
+            frame = log[0]
+            assert numpy.array_equal(frame.histogramsDist, Tmf8x0xApp.scaleHistograms(raw, Histogram.HISTOGRAM_DISTANCE))
+
+    def test_raw_proc_puc(self, tmp_path):
+        path = str(tmp_path / "session.tmfs")
+        raw = numpy.random.default_rng(7).integers(0, 1 << 16, size=(5, 128), dtype=numpy.uint16)
+        with SessionLogWriter(path) as log:
+            log.writeHistograms(raw, PROC_PUC_TAG)
+            log.writeHistograms(raw[:1], Histogram.HISTOGRAM_PUC)
+            log.writeResult(tmf8806DistanceResultFrame())
+        with SessionLogReader(path) as log:
+            frame = log[0]
+            assert numpy.array_equal(frame.histogramsProcPuc, Tmf8x0xApp.scaleHistograms(raw, Histogram.HISTOGRAM_PUC))
+            assert numpy.array_equal(frame.histogramsDistPuc, Tmf8x0xApp.scaleHistograms(raw[:1], Histogram.HISTOGRAM_PUC))
+
+    def test_csv_conversion(self, tmp_path):
+        path = str(tmp_path / "session.tmfs")
+        frames = self._capture(path)
+        csv_file = str(tmp_path / "session.csv")
+        assert convertToCSV(path, csv_file) == self.FRAMES
+        expected = io.StringIO(newline="")
+        expected.write("sep=;\n")
+        writer = csv.writer(expected, delimiter=";")
+        for i, hr in enumerate(frames):
+            hr.toCSV(writer, timestamp=1000.0 + i)
+        with open(csv_file, encoding="UTF8", newline="") as f:
+            assert f.read() == expected.getvalue()
@@ -0,0 +1,89 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import time
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_stream import OverflowPolicy
+
+class TestMeasurementStream:
+    com: Tmf8806Emulator
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator(time_scale=5.0)
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _config(self, period_ms:int):
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = period_ms
+        return config
+
+    def test_results(self):
+        numbers = []
+        with self.tof.stream(self._config(50)) as results:   # 10 ms host time per result, no drops under load
+            for result in results:
+                numbers.append(result.resultNum)
+                if len(numbers) == 5:
+                    break
+        assert numbers == [1, 2, 3, 4, 5]
+        assert results.statistics.deviceDrops == 0
+        assert self.tof.readIntStatus() == 0            # stopped, no result pending
+
+    def test_histograms(self):
+        with self.tof.stream(self._config(10), histograms=dict(distance=True)) as items:
+            item = items.get(timeout=1.0)
+        assert len(item.histogramsDist) == 5
+        assert item.result.resultNum == 1
+
+    @pytest.mark.parametrize("policy", [OverflowPolicy.DROP_OLDEST, OverflowPolicy.DROP_NEWEST])
+    def test_slow_consumer(self, policy:OverflowPolicy):
+        with self.tof.stream(self._config(5), queue_size=2, policy=policy) as results:
+            time.sleep(0.1)                              # ~20 results at time scale 5
+            first = results.get(timeout=1.0)
+        assert len(results) <= 2
+        assert results.statistics.queueDrops > 0
+        assert first.resultNum > 2 if policy == OverflowPolicy.DROP_OLDEST else first.resultNum == 1
+
+    def test_block_detects_device_drops(self):
+        with self.tof.stream(self._config(5), queue_size=1, policy=OverflowPolicy.BLOCK) as results:
+            time.sleep(0.1)
+            numbers = [ results.get(timeout=1.0).resultNum for _ in range(3) ]
+        assert results.statistics.queueDrops == 0
+        assert results.statistics.deviceDrops > 0       # the device kept measuring while acquisition was blocked
+        assert numbers[0] == 1 and numbers[1] == 2 and numbers[2] > 3
+
+    def test_ends_after_timeouts(self):
+        strategy = self.tof.waitStrategy
+        wait = strategy.waitForInterrupt
+        def silent(app, mask, timeout, *args, **kwargs):
+            bits = 0 if waits else wait(app, mask, timeout, *args, **kwargs)
+            waits.append(bits)
+            if not bits:                                 # the device stops producing after the first result
+                time.sleep(timeout)
+            return bits
+        waits, numbers = [], []
+        strategy.waitForInterrupt = silent
+        try:
+            with self.tof.stream(self._config(10), timeout=0.01, max_timeouts=3) as results:
+                for result in results:                   # get() without timeout must not block forever
+                    numbers.append(result.resultNum)
+        finally:
+            del strategy.waitForInterrupt
+        assert numbers == [1]
+        assert results.statistics.timeouts == results.statistics.consecutiveTimeouts == 3
+        assert results.get() is None
@@ -0,0 +1,85 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import time
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+from tmf8x0x.tmf8x0x_wait import IntPinWaitStrategy, RegisterPollWaitStrategy, WaitStrategy
+
+class TestWaitStrategies:
+    """I2C transactions per wait, counted by the emulator."""
+    PERIOD_MS = 20
+    waited:float = 0.0
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator()
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def _measure(self, strategy:WaitStrategy):
+        self.tof.setWaitStrategy(strategy)
+        config = self.tof.getDefaultConfiguration()
+        config.data.repetitionPeriodMs = self.PERIOD_MS
+        assert self.tof.Status.OK == self.tof.measure(config)
+
+    def _wait(self, strategy:WaitStrategy, timeout:float=1.0)->tuple:
+        before = self.com.getStatistics()
+        start = time.monotonic()
+        bits = strategy.waitForInterrupt(self.tof, self.tof.TMF8X0X_APP_INTERRUPT_RESULTS, timeout)
+        self.waited = time.monotonic() - start
+        after = self.com.getStatistics()
+        return bits, after["transactions"] - before["transactions"], after["gpioReads"] - before["gpioReads"]
+
+    def test_abstract(self):
+        with pytest.raises(TypeError):
+            WaitStrategy()
+
+    def test_register_poll(self):
+        strategy = RegisterPollWaitStrategy(poll_interval=0.001)
+        self._measure(strategy)
+        bits, transactions, gpio_reads = self._wait(strategy)
+        assert bits == self.tof.TMF8X0X_APP_INTERRUPT_RESULTS
+        assert transactions == strategy.transactions
+        assert 2 <= transactions <= self.waited / strategy.poll_interval + 2     # at most one read per poll interval, plus the clear
+        assert gpio_reads == strategy.gpioReads == 0
+        self.tof.stop()
+
+    def test_int_pin(self):
+        strategy = IntPinWaitStrategy(poll_interval=0.0001)
+        self._measure(strategy)
+        self.tof.readResultFrameInt()
+        bits, transactions, gpio_reads = self._wait(strategy)
+        assert bits == self.tof.TMF8X0X_APP_INTERRUPT_RESULTS
+        assert transactions == strategy.transactions == 2         # INT_STATUS read and clear, the pin did the waiting
+        assert gpio_reads == strategy.gpioReads > 1
+        self.tof.stop()
+
+    def test_int_pin_held_low(self):
+        device = self.com.devices[0]
+        device.intEnable |= self.tof.TMF8X0X_APP_INTERRUPT_DIAG
+        device.intStatus |= self.tof.TMF8X0X_APP_INTERRUPT_DIAG   # not awaited, holds the pin low
+        strategy = IntPinWaitStrategy()
+        bits, transactions, _ = self._wait(strategy, timeout=0.1)
+        assert bits == 0
+        assert transactions == strategy.transactions
+        assert transactions < 25                                   # backoff up to max_poll_interval, not one read per pin poll
+
+        self._measure(strategy)
+        bits, transactions, _ = self._wait(strategy)
+        assert bits == self.tof.TMF8X0X_APP_INTERRUPT_RESULTS      # still found while the pin is held
+        assert transactions < 25
+        assert device.intStatus & self.tof.TMF8X0X_APP_INTERRUPT_DIAG
+        self.tof.stop()
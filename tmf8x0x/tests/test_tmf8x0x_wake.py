@@ -0,0 +1,73 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import time
+import __init__
+
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_emulator import Tmf8806Emulator
+
+class TestWarmWake:
+    com: Tmf8806Emulator
+    tof: Tmf8x0xApp
+
+    def setup_method(self, method):
+        self.com = Tmf8806Emulator()
+        self.tof = Tmf8x0xApp(ic_com=self.com)
+        self.tof.open()
+        self.tof.enableAndStart()
+        self.calibration = self.tof.readFactoryCalibration()
+        self.tof.disable()
+        self.config = self.tof.getDefaultConfiguration()
+        self.config.data.repetitionPeriodMs = 0
+        self.config.data.kIters = 10
+
+    def teardown_method(self, method):
+        self.tof.disable()
+        self.tof.close()
+
+    def test_warm_enable(self):
+        start = time.perf_counter()
+        assert self.tof.warmEnable() == self.tof.Status.OK
+        assert time.perf_counter() - start < 0.02          # enable() alone sleeps 20ms
+        assert self.tof.startRomApp() == self.tof.Status.OK
+
+    def test_cycles(self):
+        prepared = self.tof.prepareMeasurement(self.config, self.calibration)
+        stateData = None
+        results = []
+        for _ in range(3):
+            status, result, stateData = self.tof.warmWakeMeasure(prepared, stateData)
+            assert status == self.tof.Status.OK
+            assert bytes(stateData) == bytes(result.stateData)
+            results.append(result.resultNum)
+            assert not self.com.devices[0].powered
+        assert len(results) == 3
+        statistics = self.tof.getWakeStatistics()
+        assert set(statistics) == set(Tmf8x0xApp.WAKE_PHASES)
+        assert all(phase["count"] == 3 for phase in statistics.values())
+        phases = sum(statistics[phase]["meanUs"] for phase in Tmf8x0xApp.WAKE_PHASES if phase != "total")
+        assert phases <= statistics["total"]["meanUs"] + len(Tmf8x0xApp.WAKE_PHASES)
+        self.tof.resetWakeStatistics()
+        assert self.tof.getWakeStatistics()["total"]["count"] == 0
+
+    def test_phase_instrumentation(self):
+        self.tof.enableInstrumentation()
+        prepared = self.tof.prepareMeasurement(self.config, self.calibration)
+        status, _, _ = self.tof.warmWakeMeasure(prepared)
+        assert status == self.tof.Status.OK
+        snapshot = self.tof.getInstrumentationSnapshot()
+        assert snapshot["warmWakeMeasure/enable"]["gpioCalls"] == 1
+        assert snapshot["warmWakeMeasure/measure/measurePrepared"]["transactions"] > 0
+
+    def test_no_device(self):
+        tof = Tmf8x0xApp(ic_com=self.com, exception_level=Tmf8x0xApp.ExceptionLevel.OFF)
+        self.com.devices[0].default_address = self.com.devices[0].i2c_address = 0x10     # the device does not acknowledge 0x41
+        status, result, stateData = tof.warmWakeMeasure(tof.prepareMeasurement(self.config))
+        assert status != self.tof.Status.OK
+        assert result is None and stateData is None
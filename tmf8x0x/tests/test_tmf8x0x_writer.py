@@ -0,0 +1,119 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+import os
+import threading
+import numpy
+import pytest
+import __init__
+
+from tmf8x0x.tmf8x0x_app import HistogramsAndResult
+from tmf8x0x.tmf8x0x_csv import loadCSV
+from tmf8x0x.tmf8x0x_session import SessionLogReader
+from tmf8x0x.tmf8x0x_stream import OverflowPolicy
+from tmf8x0x.tmf8x0x_writer import FrameWriter, OutputFormat
+
+def frame(number:int)->HistogramsAndResult:
+    hr = HistogramsAndResult()
+    hr.histogramsDist = numpy.random.default_rng(number).integers(0, 1 << 16, size=(5, 256))
+    hr.result.resultNum = number & 0xff
+    hr.result.reliability = 10
+    hr.result.distPeak = 100 + number
+    return hr
+
+class GatedWriter(FrameWriter):
+    """Writer whose thread waits for the gate before each batch, a disk that stalls."""
+
+    def __init__(self, *args, **kwargs):
+        self.gate = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _writeBatch(self, batch:list):
+        self.gate.wait()
+        super()._writeBatch(batch)
+
+class TestFrameWriter:
+    FRAMES = 40
+
+    def test_csv(self, tmp_path):
+        path = str(tmp_path / "capture.csv")
+        frames = [ frame(i) for i in range(self.FRAMES) ]
+        with FrameWriter(path, batch_size=16) as writer:
+            hr = HistogramsAndResult()
+            for i, source in enumerate(frames):
+                hr.histogramsDist = source.histogramsDist          # the buffer is reused, put keeps a copy
+                hr.result = source.result
+                assert writer.put(hr, host_time=2000.0 + i)
+            assert writer.flush(timeout=5.0)
+            statistics = writer.getStatistics()
+        assert writer.files == [ path ]
+        assert statistics["written"] == self.FRAMES
+        assert statistics["queueDepth"] == 0
+        assert 1 <= statistics["batches"] <= self.FRAMES
+        assert statistics["bytesWritten"] == os.path.getsize(path)
+        assert statistics["writeLatency"]["count"] == statistics["batches"]
+        assert statistics["frameLatency"]["count"] == self.FRAMES
+        capture = loadCSV(path)
+        assert len(capture) == self.FRAMES
+        dist = capture.stack("TG")
+        for i, hr in enumerate(frames):
+            assert numpy.array_equal(dist[i], hr.histogramsDist)
+        assert capture.results["distPeak"].tolist() == [ hr.result.distPeak for hr in frames ]
+        assert capture.objects["timestamp"].tolist() == [ 2000000 + 1000 * i for i in range(self.FRAMES) ]
+
+    def test_rotation_and_session(self, tmp_path):
+        with FrameWriter(str(tmp_path / "capture.csv"), output_format=OutputFormat.CSV_BYTES, batch_size=4, max_bytes=20000) as writer:
+            for i in range(self.FRAMES):
+                writer.put(frame(i))
+        assert len(writer.files) > 2
+        assert os.path.basename(writer.files[1]) == "capture-0001.csv"
+        captures = [ loadCSV(name) for name in writer.files ]
+        assert sum(len(capture) for capture in captures) == self.FRAMES
+        assert numpy.concatenate([ capture.results["resultNum"] for capture in captures ]).tolist() == list(range(self.FRAMES))
+        assert "OBJ" not in captures[0].tags
+
+        with FrameWriter(str(tmp_path / "session-{index}.tmfs"), output_format=OutputFormat.SESSION, max_seconds=3600) as writer:
+            for i in range(self.FRAMES):
+                writer.put(frame(i), host_time=100.0 + i)
+        assert writer.files == [ str(tmp_path / "session-0.tmfs") ]
+        with SessionLogReader(writer.files[0]) as log:
+            assert len(log) == self.FRAMES
+            assert log.find(host_time=110.0) == 10
+            assert numpy.array_equal(log[5].histogramsDist, frame(5).histogramsDist)
+
+    @pytest.mark.parametrize("policy", [ OverflowPolicy.DROP_OLDEST, OverflowPolicy.DROP_NEWEST ])
+    def test_drop_policy(self, tmp_path, policy):
+        path = str(tmp_path / "capture.csv")
+        writer = GatedWriter(path, output_format=OutputFormat.CSV_BYTES, queue_size=4, policy=policy, batch_size=2)
+        kept = [ writer.put(frame(i)) for i in range(self.FRAMES) ]
+        assert writer.queueDepth <= 4
+        writer.gate.set()
+        writer.close()
+        statistics = writer.getStatistics()
+        assert statistics["maxQueueDepth"] == 4
+        assert statistics["written"] + statistics["dropped"] == self.FRAMES
+        assert statistics["written"] <= 4 + 2
+        written = loadCSV(path).results["resultNum"].tolist()
+        assert len(written) == statistics["written"]
+        if policy == OverflowPolicy.DROP_OLDEST:
+            assert written[-4:] == list(range(self.FRAMES - 4, self.FRAMES))
+            assert kept.count(False) == statistics["dropped"]
+        else:
+            assert written[-1] < self.FRAMES - 1
+            assert [ i for i, k in enumerate(kept) if k ] == written
+        with pytest.raises(ValueError):
+            writer.put(frame(0))
+
+    def test_write_error(self, tmp_path):
+        writer = FrameWriter(str(tmp_path / "missing" / "capture.csv"))
+        writer.put(frame(0))
+        with pytest.raises(FileNotFoundError):
+            writer.flush(timeout=5.0)
+        with pytest.raises(ValueError):
+            writer.put(frame(1))
+        writer.close()
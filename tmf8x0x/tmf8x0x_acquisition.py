@@ -0,0 +1,282 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Acquisition from several adapters (e.g. several EVMs) in parallel: one worker per adapter, the results of all
+adapters merged into one time-ordered stream with a shared queue budget.
+"""
+
+import __init__
+import collections
+import threading
+import time
+from typing import Iterator, List
+
+# local imports
+from tmf8x0x.tmf8x0x_bus import Tmf8x0xBus
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_stream import OverflowPolicy
+from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd, tmf8806DistanceResultFrame
+
+class AcquiredResult:
+    """One result of the merged stream."""
+    __slots__ = ("timestamp", "adapter", "sensor", "result")
+
+    def __init__(self, timestamp:float, adapter:int, sensor:str, result:tmf8806DistanceResultFrame):
+        self.timestamp = timestamp
+        """Host time (time.monotonic) the result was read."""
+        self.adapter = adapter
+        """Index of the adapter in the coordinator."""
+        self.sensor = sensor
+        """Name of the sensor on its adapter."""
+        self.result = result
+
+class AdapterHealth:
+    """Counters of one adapter worker."""
+
+    def __init__(self):
+        self.results:int = 0
+        """Number of results read."""
+        self.queueDrops:int = 0
+        """Number of results discarded because the budget was exhausted."""
+        self.blockedSeconds:float = 0.0
+        """Time the worker waited for budget (backpressure)."""
+        self.errors:int = 0
+        self.lastError:str = None
+        self.lastResultTime:float = None
+        self.running:bool = False
+
+    def toDict(self, now:float)->dict:
+        return { "results": self.results, "queueDrops": self.queueDrops, "blockedSeconds": self.blockedSeconds,
+                 "errors": self.errors, "lastError": self.lastError, "running": self.running,
+                 "lastResultAgeSeconds": None if self.lastResultTime is None else now - self.lastResultTime }
+
+class AcquisitionCoordinator:
+    """Reads the sensors of several adapters in parallel. Every adapter is a Tmf8x0xBus (one or more sensors) and gets one
+       worker thread of its own, so the adapters run in parallel while the bus accesses of one adapter stay serialized.
+       The workers do not occupy the adapter executors (see executorFor). Example:
+
+        buses = [ Tmf8x0xBus(com, enable_pins=[com.enable_pin], addresses=[0x41]) for com in coms ]
+        for bus in buses:
+            bus.open()
+            bus.bringUp()
+        with AcquisitionCoordinator(buses, budget=256) as results:
+            for item in results:
+                print(item.timestamp, item.adapter, item.sensor, item.result.distPeak)
+
+       The results of all adapters are returned in the order they were read. A worker only reads the next result while
+       the number of queued results is below the budget (backpressure, the devices keep measuring and the missed
+       results show up in deviceDrops), or it discards queued results, see OverflowPolicy.
+       While the coordinator runs, its workers own the adapters, the application must not access their devices otherwise
+       (neither with Tmf8x0xApp nor with AsyncTmf8x0xApp).
+    """
+
+    def __init__(self, buses:List[Tmf8x0xBus], budget:int=1024, policy:OverflowPolicy=OverflowPolicy.BLOCK,
+                 poll_timeout:float=0.01, max_skew:float=0.5):
+        """Create the coordinator, nothing is started before start.
+
+        Args:
+            buses (List[Tmf8x0xBus]): One bus per adapter, the sensors must be brought up.
+            budget (int, optional): Maximum number of results queued for all adapters together (plus one in flight per adapter). Defaults to 1024.
+            policy (OverflowPolicy, optional): What happens when the budget is exhausted. Defaults to OverflowPolicy.BLOCK.
+            poll_timeout (float, optional): Maximum time in seconds a worker waits for a result before it reports progress. Defaults to 0.01.
+            max_skew (float, optional): A result is released without waiting for an adapter that did not report progress for this time,
+                e.g. because its adapter hangs. Defaults to 0.5.
+        """
+        if budget < 1:
+            raise ValueError("budget must be at least 1")
+        self.buses = buses
+        self.budget = budget
+        self.policy = policy
+        self.poll_timeout = poll_timeout
+        self.max_skew = max_skew
+        self.health:List[AdapterHealth] = [ AdapterHealth() for _ in buses ]
+        self._queues:List[collections.deque] = [ collections.deque() for _ in buses ]
+        self._watermarks:List[float] = [ 0.0 ] * len(buses)
+        self._queued = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._threads:List[threading.Thread] = []
+
+    # ------------------------------------------------------------------ start / stop
+
+    def start(self, config:tmf8806MeasureCmd=None, configs:List[List[tmf8806MeasureCmd]]=None)->"AcquisitionCoordinator":
+        """Start the measurements on all adapters and the workers.
+
+        Args:
+            config (tmf8806MeasureCmd, optional): Configuration of all sensors. Defaults to the default configuration.
+            configs (List[List[tmf8806MeasureCmd]], optional): Configurations per adapter and sensor, replaces config. Defaults to None.
+
+        Returns:
+            AcquisitionCoordinator: self
+        """
+        if self._threads:
+            return self
+        for index, bus in enumerate(self.buses):
+            status = bus.start(config, configs=configs[index] if configs else None)
+            if status != Tmf8x0xDevice.Status.OK:
+                raise RuntimeError("TMF8x0x acquisition: measurement did not start on adapter {} ({})".format(index, status))
+        now = time.monotonic()
+        self._running = True
+        for index, bus in enumerate(self.buses):
+            self._watermarks[index] = now
+            self.health[index].running = True
+            thread = threading.Thread(target=self._work, args=(index,), name="tmf8x0x-acquisition-{}".format(index), daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop the workers and the measurements. Results still queued can be read afterwards."""
+        if not self._threads:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for bus in self.buses:
+            bus.stop()
+
+    def __enter__(self)->"AcquisitionCoordinator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------ workers
+
+    def _work(self, index:int):
+        bus = self.buses[index]
+        health = self.health[index]
+        queue = self._queues[index]
+        try:
+            while True:
+                if self.policy == OverflowPolicy.BLOCK:
+                    with self._condition:
+                        if self._queued >= self.budget and self._running:
+                            blocked = time.monotonic()
+                            self._watermarks[index] = blocked    # the next result is read after this time
+                            self._condition.notify_all()
+                            while self._queued >= self.budget and self._running:
+                                self._condition.wait()
+                            health.blockedSeconds += time.monotonic() - blocked
+                        if not self._running:
+                            return
+                elif not self._running:
+                    return
+                sensor, result = bus.read(timeout=self.poll_timeout)
+                now = time.monotonic()
+                with self._condition:
+                    self._watermarks[index] = now
+                    if result is not None:
+                        health.results += 1
+                        health.lastResultTime = now
+                        self._put(index, AcquiredResult(now, index, sensor.name, result))
+                    self._condition.notify_all()
+        except Exception as error:              # one failing adapter must not stop the others
+            health.errors += 1
+            health.lastError = repr(error)
+        finally:
+            with self._condition:
+                health.running = False
+                self._condition.notify_all()
+
+    def _put(self, index:int, item:AcquiredResult):
+        """Queue an item, the condition must be held."""
+        if self._queued >= self.budget and self.policy != OverflowPolicy.BLOCK:
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                self.health[index].queueDrops += 1
+                return
+            oldest = self._oldestQueue()
+            self._queues[oldest].popleft()
+            self._queued -= 1
+            self.health[oldest].queueDrops += 1
+        self._queues[index].append(item)
+        self._queued += 1
+
+    def _oldestQueue(self)->int:
+        oldest = None
+        for index, queue in enumerate(self._queues):
+            if queue and (oldest is None or queue[0].timestamp < self._queues[oldest][0].timestamp):
+                oldest = index
+        return oldest
+
+    # ------------------------------------------------------------------ consumer
+
+    def _releasable(self, index:int, now:float)->bool:
+        """The head of queue index can be released if no other adapter can still deliver an older result."""
+        timestamp = self._queues[index][0].timestamp
+        for other, queue in enumerate(self._queues):
+            if other == index or queue or not self.health[other].running:
+                continue
+            watermark = self._watermarks[other]
+            if watermark < timestamp and now - watermark < self.max_skew:
+                return False
+        return True
+
+    def get(self, timeout:float=None)->AcquiredResult:
+        """Take the oldest result of all adapters.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds, None waits until a result arrives or all workers ended. Defaults to None.
+
+        Returns:
+            AcquiredResult: the result, None on timeout or if all workers ended and nothing is queued
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                oldest = self._oldestQueue()
+                if oldest is not None and self._releasable(oldest, now):
+                    item = self._queues[oldest].popleft()
+                    self._queued -= 1
+                    self._condition.notify_all()
+                    return item
+                if oldest is None and not any(health.running for health in self.health):
+                    return None
+                remaining = None if deadline is None else deadline - now
+                if remaining is not None and remaining <= 0:
+                    return None
+                wait = self.max_skew if oldest is not None else None
+                if remaining is not None:
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._condition.wait(wait)
+
+    def __iter__(self)->Iterator[AcquiredResult]:
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item
+
+    def __len__(self)->int:
+        """Number of queued results."""
+        return self._queued
+
+    def getStatistics(self)->dict:
+        """Health of every adapter and the queue usage.
+
+        Returns:
+            dict: per adapter the worker counters and the bus statistics, plus the number of queued results and the budget
+        """
+        now = time.monotonic()
+        adapters = []
+        for bus, health in zip(self.buses, self.health):
+            stats = health.toDict(now)
+            stats["bus"] = bus.getStatistics()
+            stats["deviceDrops"] = sum(sensor["deviceDrops"] for sensor in stats["bus"]["sensors"].values())
+            adapters.append(stats)
+        return { "queued": self._queued, "budget": self.budget, "adapters": adapters }
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -11,17 +11,25 @@ tmf8x0x app0 class and sample test with fixed hex file for download
 """
 
 import __init__
+import contextlib
 import time
-from typing import List
+from typing import List, Dict
 import csv
 import os
-from intelhex import IntelHex
 import ctypes
-from typing import Tuple
+from typing import Tuple, Iterable, Iterator
+import numpy
 
 # local imports
 from aos_com.ic_com import IcCom
 from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_wait import WaitStrategy, RegisterPollWaitStrategy
+from tmf8x0x.tmf8x0x_poll import Poller, LatencyHistogram
+from tmf8x0x.tmf8x0x_instrument import instrumented, instrumentTag
+from tmf8x0x.tmf8x0x_results import ResultRingBuffer
+from tmf8x0x.tmf8x0x_scaling import shiftScale, factorScale, SUM_FACTOR, PUC_FACTOR
+from tmf8x0x.tmf8x0x_stream import MeasurementStream, OverflowPolicy
+from tmf8x0x.tmf8x0x_firmware import FirmwareImage, FirmwareImageCache, DownloadStatistics, Segment, DEFAULT_FIRMWARE_CACHE
 from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd, tmf8806FactoryCalibData, tmf8806DistanceResultFrame, tmf8806StateData
 
 class Histogram:
@@ -37,9 +45,20 @@ class Histogram:
     HISTOGRAM_SUM:int       = 29 # identifier sum histogram
     HISTOGRAM_PUC:int       = 30 # identifier for pile-up corrected histograms
 
-    def __init__(self):
+    def __init__(self, data:numpy.ndarray=None):
+        """Create a histogram.
+
+        Args:
+            data (numpy.ndarray, optional): The bin values, typically a uint16 view into the readout buffer of Tmf8x0xApp. Defaults to None.
+        """
         self.type:int = self.HISTOGRAM_UNKNOWN
-        self.bins:List[int] = None
+        self.data:numpy.ndarray = data
+        """The raw bin values (uint16)."""
+
+    @property
+    def bins(self)->List[int]:
+        """The bin values as list of ints, kept for compatibility. The list is a copy, write into data to change bins."""
+        return self.data.tolist()
 
     def toCSV(self, csvwriter:csv.writer):
         """
@@ -53,6 +72,7 @@ class Histogram:
         """
         do_scale = True
         name = ""
+        bins = self.data
 
         if ( self.type == Histogram.HISTOGRAM_EC ):
             name = "#CI"
@@ -63,7 +83,7 @@ class Histogram:
         elif ( self.type == Histogram.HISTOGRAM_DISTANCE ):
             name = "#TG"
         elif ( self.type == Histogram.HISTOGRAM_SUM ):
-            if self.bins[127] == 0: # summed histograms only fill 120 bins
+            if bins[127] == 0: # summed histograms only fill 120 bins
                 name = "#SUM"
             else:
                 name = "#TGPUC" # pile-up corrected distance histograms, they fill all 128 bins
@@ -72,71 +92,164 @@ class Histogram:
             name = "#UNKNOWN"
             do_scale = False
 
-        msg =  [ name ] + ( Tmf8x0xApp._scaleBins(self.bins) if do_scale else self.bins )
+        msg =  [ name ] + ( shiftScale(bins) if do_scale else bins ).tolist()
         csvwriter.writerow(msg)
 
+def _histogramView(kind:str, doc:str)->property:
+    """Property of HistogramsAndResult that maps a list-style attribute name to its uint32 block."""
+    def get(self)->numpy.ndarray:
+        return self._view(kind)
+    def set(self, histograms):
+        rows = numpy.asarray(histograms, dtype=numpy.uint32)
+        if rows.size == 0:
+            self._rows(kind, 0, 0, 0)
+            return
+        if kind == HistogramsAndResult.SUM:
+            rows = rows.reshape(1, -1)
+        self._rows(kind, 0, len(rows), rows.shape[1])[:] = rows
+    return property(get, set, doc=doc)
+
 class HistogramsAndResult:
-    """class for storing a set of histograms and the associated result frame"""
+    """class for storing a set of histograms and the associated result frame.
+       The bins of every histogram kind are kept in one uint32 block (channels x bins) that is reused when the object is
+       passed to Tmf8x0xApp.readHistogramsAndResult again. The histogram attributes are numpy views into these blocks:
+       use copy() to keep a frame while the object is reused, freeze() to make it read-only.
+    """
+    __slots__ = ( "_blocks", "_counts", "_frozen", "result" )
+
+    EC:str       = "histogramsEc"
+    OC:str       = "histogramsOc"
+    PROX:str     = "histogramsProx"
+    DIST:str     = "histogramsDist"
+    PROC_PUC:str = "histogramsProcPuc"
+    DIST_PUC:str = "histogramsDistPuc"
+    SUM:str      = "histogramSum"
+    KINDS = ( EC, OC, PROX, DIST, PROC_PUC, DIST_PUC, SUM )
+
     def __init__(self):
-        self.histogramsEc:List[List[int]]      = []
-        self.histogramsOc:List[List[int]]      = []
-        self.histogramsProx:List[List[int]]    = []
-        self.histogramsDist:List[List[int]]    = []
-        self.histogramsProcPuc:List[List[int]] = []
-        self.histogramsDistPuc:List[List[int]] = []
-        self.histogramSum:List[int]            = []
+        self._blocks:Dict[str,numpy.ndarray] = {}
+        self._counts:Dict[str,int] = dict.fromkeys(self.KINDS, 0)
+        self._frozen:bool = False
         self.result:tmf8806DistanceResultFrame = tmf8806DistanceResultFrame()
 
+    histogramsEc      = _histogramView(EC, "Electrical calibration histograms, channels x bins.")
+    histogramsOc      = _histogramView(OC, "Optical calibration histograms, channels x bins.")
+    histogramsProx    = _histogramView(PROX, "Proximity histograms, channels x bins.")
+    histogramsDist    = _histogramView(DIST, "Distance histograms, channels x bins.")
+    histogramsProcPuc = _histogramView(PROC_PUC, "Pile-up corrected proximity histograms, channels x bins.")
+    histogramsDistPuc = _histogramView(DIST_PUC, "Pile-up corrected distance histograms, channels x bins.")
+    histogramSum      = _histogramView(SUM, "Summed histogram, bins.")
+
+    def _view(self, kind:str)->numpy.ndarray:
+        count = self._counts[kind]
+        if kind == self.SUM:
+            return self._blocks[kind][0] if count else numpy.zeros(0, dtype=numpy.uint32)
+        return self._blocks[kind][:count] if count else numpy.zeros((0, 0), dtype=numpy.uint32)
+
+    def _rows(self, kind:str, first:int, rows:int, bins:int)->numpy.ndarray:
+        """Rows first .. first+rows of the block of a kind, the block grows if needed. The kind then holds first+rows histograms.
+
+        Returns:
+            numpy.ndarray: the rows to fill in, rows x bins
+        """
+        if self._frozen:
+            raise ValueError("HistogramsAndResult is frozen, use copy() to get a writable one")
+        if first + rows == 0:
+            self._counts[kind] = 0
+            return None
+        block = self._blocks.get(kind)
+        if block is None or block.shape[1] != bins or block.shape[0] < first + rows:
+            grown = numpy.zeros((max(first + rows, 1 if kind == self.SUM else 5), bins), dtype=numpy.uint32)
+            if block is not None and block.shape[1] == bins:
+                grown[:first] = block[:first]
+            block = self._blocks[kind] = grown
+        self._counts[kind] = first + rows
+        return block[first:first + rows]
+
+    def clear(self):
+        """Forget all histograms and the result frame, the blocks are kept for the next readout."""
+        if self._frozen:
+            raise ValueError("HistogramsAndResult is frozen, use copy() to get a writable one")
+        self._counts = dict.fromkeys(self.KINDS, 0)
+        ctypes.memset(ctypes.addressof(self.result), 0, ctypes.sizeof(self.result))
+
+    def copy(self)->"HistogramsAndResult":
+        """A writable copy that holds only the histograms that are present (e.g. to buffer frames).
+
+        Returns:
+            HistogramsAndResult: the copy
+        """
+        other = HistogramsAndResult()
+        for kind, block in self._blocks.items():
+            count = self._counts[kind]
+            if count:
+                other._blocks[kind] = block[:count].copy()
+                other._counts[kind] = count
+        other.result = tmf8806DistanceResultFrame.from_buffer_copy(self.result)
+        return other
+
+    def freeze(self)->"HistogramsAndResult":
+        """Make the histograms read-only, the object can no longer be reused for a readout.
+
+        Returns:
+            HistogramsAndResult: self
+        """
+        self._frozen = True
+        for block in self._blocks.values():
+            block.flags.writeable = False
+        return self
+
+    @property
+    def frozen(self)->bool:
+        """True after freeze()."""
+        return self._frozen
+
+    @property
+    def nbytes(self)->int:
+        """Memory of the histogram blocks in bytes."""
+        return sum(block.nbytes for block in self._blocks.values())
+
+    def _csvRows(self)->Iterator[list]:
+        for i, bins in enumerate(self.histogramsEc):
+            yield [ f"#CI{i}" ] + bins.tolist()
+        for i, bins in enumerate(self.histogramsOc):
+            yield [ f"#CO{i}" ] + bins.tolist()
+        for i, bins in enumerate(self.histogramsProx):
+            yield [ f"#PT{i}" ] + bins.tolist()
+        for i, bins in enumerate(self.histogramsDist):
+            yield [ f"#TG{i}" ] + bins.tolist()
+        for i, bins in enumerate(self.histogramsProcPuc):
+            yield [ f"#PTPUC{i+1}" ] + bins.tolist()
+        for i, bins in enumerate(self.histogramsDistPuc):
+            yield [ f"#TGPUC{i+1}" ] + bins.tolist()
+        if len(self.histogramSum) > 0:
+            yield [ "#SUM"] + self.histogramSum.tolist()
+
     def toCSVBytes(self,csvwriter:csv.writer):
         """Write all available histograms and one result frame to a CSV file.
            Write result frame as list of bytes.
         Args:
             csvwriter (csv.writer): CSV writer object
         """
-        for i in range(len(self.histogramsEc)):
-            csvwriter.writerow( [ f"#CI{i}" ] + self.histogramsEc[i] )
-        for i in range(len(self.histogramsOc)):
-            csvwriter.writerow( [ f"#CO{i}" ] + self.histogramsOc[i] )
-        for i in range(len(self.histogramsProx)):
-            csvwriter.writerow( [ f"#PT{i}" ] + self.histogramsProx[i] )
-        for i in range(len(self.histogramsDist)):
-            csvwriter.writerow( [ f"#TG{i}" ] + self.histogramsDist[i] )
-        for i in range(len(self.histogramsProcPuc)):
-            csvwriter.writerow( [ f"#PTPUC{i+1}" ] + self.histogramsProcPuc[i] )
-        for i in range(len(self.histogramsDistPuc)):
-            csvwriter.writerow( [ f"#TGPUC{i+1}" ] + self.histogramsDistPuc[i] )
-        if len(self.histogramSum) > 0:
-            csvwriter.writerow( [ "#SUM"] + self.histogramSum )
+        csvwriter.writerows(self._csvRows())
         if self.result:
             csvwriter.writerow( ["#RES"] + list(bytes(self.result)))
 
-    def toCSV(self,csvwriter:csv.writer,distance_correction_factor:float=1.0, write_raw_result:bool = True):
+    def toCSV(self,csvwriter:csv.writer,distance_correction_factor:float=1.0, write_raw_result:bool = True, timestamp:float = None):
         """Write all available histograms and one result frame to a CSV file.
            Write result frame as list of bytes in the same format as the TMF8x0x EVM GUI.
         Args:
            csvwriter (csv.writer): CSV writer object
            distance_correction_factor(float): factor to correct measured distances
            write_raw_result(bool): If True, write the raw result frame before the parsed result.
+           timestamp(float): host time of the result in seconds since the epoch, for the #OBJ row. Defaults to now.
         """
-        for i in range(len(self.histogramsEc)):
-            csvwriter.writerow( [ f"#CI{i}" ] + self.histogramsEc[i] )
-        for i in range(len(self.histogramsOc)):
-            csvwriter.writerow( [ f"#CO{i}" ] + self.histogramsOc[i] )
-        for i in range(len(self.histogramsProx)):
-            csvwriter.writerow( [ f"#PT{i}" ] + self.histogramsProx[i] )
-        for i in range(len(self.histogramsDist)):
-            csvwriter.writerow( [ f"#TG{i}" ] + self.histogramsDist[i] )
-        for i in range(len(self.histogramsProcPuc)):
-            csvwriter.writerow( [ f"#PTPUC{i+1}" ] + self.histogramsProcPuc[i] )
-        for i in range(len(self.histogramsDistPuc)):
-            csvwriter.writerow( [ f"#TGPUC{i+1}" ] + self.histogramsDistPuc[i] )
-        if len(self.histogramSum) > 0:
-            csvwriter.writerow( [ "#SUM"] + self.histogramSum )
+        csvwriter.writerows(self._csvRows())
         if self.result:
             if write_raw_result:
                 csvwriter.writerow( ["#RES"] + list(bytes(self.result)))
             out  = [ "#OBJ" ]
-            out += [ str(int(time.time()*1000)) ]
+            out += [ str(int((time.time() if timestamp is None else timestamp)*1000)) ]
             if self.result.reliability > 0:
                 out += [ 1 ]                         # number of detected objects
                 out += [ self.result.reliability ]   # confidence level of object
@@ -148,6 +261,48 @@ class HistogramsAndResult:
             csvwriter.writerow( out )
             csvwriter.writerow( [ "#TMP", self.result.temperature ])
 
+class PreparedMeasurement:
+    """A measurement command and optional factory calibration, encoded once into the I2C frames Tmf8x0xApp.measure writes.
+       Only the state data is copied into the frame per measurement. Use it for repeated starts with the same configuration,
+       e.g. a wake cycle after hibernation:
+
+        prepared = tof.prepareMeasurement(config, calibration)
+        tof.measurePrepared(prepared, stateData)
+    """
+
+    def __init__(self, config:tmf8806MeasureCmd, calibration:tmf8806FactoryCalibData=None):
+        """Encode the frames. The configuration is copied, later changes of config are not seen.
+
+        Args:
+            config (tmf8806MeasureCmd): configuration data
+            calibration (tmf8806FactoryCalibData, optional): calibration data. Defaults to None.
+        """
+        config = tmf8806MeasureCmd.from_buffer_copy(config)
+        config.data.data.factoryCal = 1 if calibration else 0
+        self.command:int = config.data.command
+        config.data.data.algState = 0
+        self._measureFrame = bytes([Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_9]) + bytes(config)
+        config.data.data.algState = 1
+        self._measureFrameState = bytes([Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_9]) + bytes(config)
+        # calibration then state data, written in one frame from 0x20 on (same as measure)
+        calibration = bytes(calibration) if calibration else bytes()
+        self._dataFrame = bytes([Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_START]) + calibration if calibration else None
+        self._dataFrameState = bytearray([Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_START]) + calibration + bytes(Tmf8x0xApp.TMF8X0X_APP_STATE_DATA_SIZE)
+        self._stateStart = 1 + len(calibration)
+
+    def frames(self, stateData:tmf8806StateData=None)->Tuple[bytes,bytes]:
+        """The frames of one measurement start, the state data is copied into the pre-encoded frame.
+
+        Args:
+            stateData (tmf8806StateData, optional): state data. Defaults to None.
+        Returns:
+            Tuple[bytes,bytes]: the frame with calibration and state data (None if there is none) and the measure command frame
+        """
+        if stateData:
+            self._dataFrameState[self._stateStart:] = stateData
+            return self._dataFrameState, self._measureFrameState
+        return self._dataFrame, self._measureFrame
+
 class Tmf8x0xApp(Tmf8x0xDevice):
     """The TMF8x0x application class to interface the Koloth/Dahar/Leica application as a host driver would.
     """
@@ -171,6 +326,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
     TMF8X0X_COM_APP_ID__bootloader = 0x80
 
     TMF8X0X_BL_MAX_DATA_SIZE = 0x80 # Number of bytes that can be written or read with one BL command
+    POLL_DELAY_PROBE = 0.75         # the learned download poll delay shrinks by this factor when the first poll saw the acknowledge
 
     TMF8X0X_COM_CMD_STAT                        = 0x08 # bootloader commands must be written to this address
     TMF8X0X_COM_CMD_STAT__bl_cmd_reset          = 0x10
@@ -183,7 +339,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
     TMF8X0X_COM_CMD_STAT__bl_cmd_test_i2c       = 0x2c # Run an I2C-RAM BIST.
     TMF8X0X_COM_CMD_STAT__bl_cmd_r_ram          = 0x40 # Read from BL RAM.
     TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram          = 0x41 # Write to BL RAM.
-    TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram        = 0x42 # Write to BL RAM.
+    TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram        = 0x42 # Compute the CRC-32 of BL RAM, starting at the selected address.
     TMF8X0X_COM_CMD_STAT__bl_cmd_addr_ram       = 0x43 # Select the BL RAM address to read/write to.
     TMF8X0X_COM_CMD_STAT__stat_ok               = 0x0 # Everything is okay
 
@@ -195,6 +351,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
     TMF8X0X_APP_MODE__ignore_check              = 0x7F # flag for python script only to ignore the mode
 
     TMF8X0X_APP_CMD_STAT__stat_ok                   = 0x0 # Everything is okay
+    TMF8X0X_APP_CMD_STAT__cmd_measure               = 0x02      # start a measurement
     TMF8X0X_APP_CMD_STAT__cmd_stop                  = 0xff # Stop a measurement
     TMF8X0X_APP_CMD_STAT__cmd_factory_calibration   = 0x0a      # run factory calibration
     TMF8X0X_APP_CMD_STAT__cmd_wr_calibration        = 0x0b      # write factory calibration
@@ -250,6 +407,14 @@ class Tmf8x0xApp(Tmf8x0xDevice):
     TMF8X0X_APP_RESULT_SIZE                         = ctypes.sizeof(tmf8806DistanceResultFrame) + TMF8X0X_APP_RESULT_HEADER_SIZE # read in some bytes [0x1C] ..
     TMF8X0X_APP_COM_CONTENT_result                  = 0x56      # results must have this value in register CONTENT
 
+    # histogram readout, each TDC histogram is transferred in 4 quarters of 64 little-endian 16-bit bins
+    TMF8X0X_APP_HISTOGRAM_TDCS                      = 5
+    TMF8X0X_APP_HISTOGRAM_BINS                      = 256
+    TMF8X0X_APP_HISTOGRAM_QUARTERS                  = 4
+    TMF8X0X_APP_HISTOGRAM_QUARTER_BINS              = TMF8X0X_APP_HISTOGRAM_BINS // TMF8X0X_APP_HISTOGRAM_QUARTERS
+    TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE              = 2 * TMF8X0X_APP_HISTOGRAM_QUARTER_BINS
+    TMF8X0X_APP_HISTOGRAM_DTYPE                     = numpy.dtype('<u2')
+
     # factory calibartion is uploaded to this address
     TMF8X0X_APP_FACTORY_CALIBRATION_START           = 0x20      # factory calibration data starts at this address
     TMF8X0X_APP_FACTORY_CALIBRATION_SIZE            = ctypes.sizeof(tmf8806FactoryCalibData)
@@ -265,15 +430,115 @@ class Tmf8x0xApp(Tmf8x0xDevice):
 
     TMF8806_DIAG_HIST_ALG_PILEUP    = 16    # if TMF8806_COM_DIAG_INFO >> 1 & 0x1F == 16 -> pileup-corrected histogram
 
-    def __init__(self, ic_com: IcCom, hex_file:str="", log:bool=False, exception_level:Tmf8x0xDevice.ExceptionLevel = Tmf8x0xDevice.ExceptionLevel.DEVICE):
+    # names of the application commands, used as keys for the poller
+    APP_COMMAND_NAMES = {
+        TMF8X0X_APP_CMD_STAT__cmd_measure:               "measure",
+        TMF8X0X_APP_CMD_STAT__cmd_stop:                  "stop",
+        TMF8X0X_APP_CMD_STAT__cmd_factory_calibration:   "factory_calibration",
+        TMF8X0X_APP_CMD_STAT__cmd_wr_calibration:        "wr_calibration",
+        TMF8X0X_APP_CMD_STAT__cmd_set_gpio:              "set_gpio",
+        TMF8X0X_APP_CMD_STAT__cmd_wr_add_config:         "wr_add_config",
+        TMF8X0X_APP_CMD_STAT__cmd_rd_add_config:         "rd_add_config",
+        TMF8X0X_APP_CMD_STAT__cmd_histogram_readout:     "histogram_readout",
+        TMF8X0X_APP_CMD_STAT__cmd_continue:              "continue",
+        TMF8X0X_APP_CMD_STAT__cmd_read_serial_number:    "read_serial_number",
+        TMF8X0X_APP_CMD_STAT__cmd_change_i2c_address:    "change_i2c_address",
+        TMF8X0X_APP_CMD_STAT__cmd_read_histogram:        "read_histogram",
+    }
+
+    # names of the bootloader commands, used as keys for the poller
+    BL_COMMAND_NAMES = {
+        TMF8X0X_COM_CMD_STAT__bl_cmd_upload_init:        "bl_upload_init",
+        TMF8X0X_COM_CMD_STAT__bl_cmd_r_ram:              "bl_r_ram",
+        TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram:              "bl_w_ram",
+        TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram:            "bl_crc_ram",
+        TMF8X0X_COM_CMD_STAT__bl_cmd_addr_ram:           "bl_addr_ram",
+    }
+
+    # expected time in seconds until a command is completed. The poller polls once right away, then not before
+    # this time has passed, and backs off exponentially afterwards.
+    # The values are estimates, neither the datasheet nor the host driver specify command completion times:
+    # a value below the real completion time costs an extra status read, a value above it delays every call.
+    # So the estimates are kept at or below the shortest completion times expected from the firmware, measure them on
+    # an EVM with test_tmf8x0x_app.py::test_command_latency (Poller.measuredLatencies) before tuning them.
+    COMMAND_EXPECTED_LATENCY = {
+        "measure":              0.0005,     # the configuration is checked and the measurement engine is set up
+        "stop":                 0.0005,     # a running integration is aborted first
+        "factory_calibration":  0.0005,     # same command path as measure, the calibration itself is signalled by interrupt
+        "wr_calibration":       0.0002,     # copies calibration and state data from the register page
+        "set_gpio":             0.0001,     # register level commands, a few register writes in the firmware
+        "wr_add_config":        0.0001,
+        "rd_add_config":        0.0001,
+        "histogram_readout":    0.0001,
+        "continue":             0.0001,
+        "read_serial_number":   0.0002,     # fuse read
+        "change_i2c_address":   0.0002,     # the I2C block is re-configured
+        "read_histogram":       0.0001,     # the first quarter is copied to the register page
+        "bl_upload_init":       0.0001,     # bootloader commands: short, bl_w_ram is learned per download, see downloadPollDelay
+        "bl_r_ram":             0.0001,
+        "bl_w_ram":             0.0001,
+        "bl_crc_ram":           0.0005,     # CRC over up to the full patch size
+        "bl_addr_ram":          0.0,        # only sets the RAM pointer, done on the first poll
+        "start_ram_app":        0.002,      # application start, the ROM application start is of the same order
+        "start_rom_app":        0.002,
+        "bootloader_sleep":     0.0,        # standby is entered right away
+        "cpu_ready":            0.0005,     # wake-up from PON=1 until the CPU is ready
+    }
+
+    HISTOGRAM_KINDS = {
+        Histogram.HISTOGRAM_EC:         HistogramsAndResult.EC,
+        Histogram.HISTOGRAM_OPTICAL:    HistogramsAndResult.OC,
+        Histogram.HISTOGRAM_PROXIMITY:  HistogramsAndResult.PROX,
+        Histogram.HISTOGRAM_DISTANCE:   HistogramsAndResult.DIST,
+        Histogram.HISTOGRAM_SUM:        HistogramsAndResult.SUM,
+        Histogram.HISTOGRAM_PUC:        HistogramsAndResult.DIST_PUC,
+    }
+    """HistogramsAndResult attribute per histogram type."""
+
+    WAKE_PHASES = ( "enable", "cpu_ready", "app_start", "measure", "result", "disable", "total" )
+    """Phases of warmWakeMeasure, see getWakeStatistics."""
+
+    def __init__(self, ic_com: IcCom, hex_file:str="", log:bool=False, exception_level:Tmf8x0xDevice.ExceptionLevel = Tmf8x0xDevice.ExceptionLevel.DEVICE,
+                 wait_strategy:WaitStrategy=None, firmware_cache:FirmwareImageCache=None, skip_loaded_patch:bool=False, verify_patch:bool=False,
+                 i2c_address:int=None, enable_pin:int=None):
         """The default constructor. It initializes the TMF8X0X driver.
         Args:
             log (bool, optional): Enable verbose driver outputs. False per default.
             exception_level (Tmf8x0xDevice.ExceptionLevel, optional): runtime exception level
             hex_file (str): The hex file to load with enableAndStart. If empty, run the ROM application. Defaults to ''.
+            wait_strategy (WaitStrategy, optional): How to wait for results, histograms and calibration. Defaults to INT_STATUS register polling.
+            firmware_cache (FirmwareImageCache, optional): Cache for parsed and pre-framed hex files. Defaults to the in-memory cache shared by all instances.
+            skip_loaded_patch (bool, optional): enableAndStart does not download the hex file if the RAM CRC shows it is still loaded. Defaults to False.
+            verify_patch (bool, optional): enableAndStart checks the RAM CRC after the download. Defaults to False.
+            i2c_address (int, optional): The I2C address of this device. Defaults to I2C_SLAVE_ADDR.
+            enable_pin (int, optional): GPIO mask of the enable pin of this device. Defaults to the enable pin of ic_com.
         """
-        super().__init__(ic_com=ic_com,log=log,exception_level=exception_level)
+        super().__init__(ic_com=ic_com,log=log,exception_level=exception_level,i2c_address=i2c_address,enable_pin=enable_pin)
         self.hex_file = hex_file
+        self.waitStrategy:WaitStrategy = wait_strategy if wait_strategy else RegisterPollWaitStrategy()
+        self.lastResultTransactions:int = 0
+        """Number of I2C transactions (wait + readout) the last result frame cost."""
+        self.poller = Poller(self.COMMAND_EXPECTED_LATENCY)
+        """Polling engine for all command completion loops, keeps poll counts and latencies per command."""
+        self.firmwareCache:FirmwareImageCache = firmware_cache if firmware_cache else DEFAULT_FIRMWARE_CACHE
+        """Parsed hex files with the bootloader frames to download them, see downloadHexFile."""
+        self.skipLoadedPatch:bool = skip_loaded_patch
+        self.verifyPatch:bool = verify_patch
+        self.lastDownloadSkipped:bool = False
+        """True if the last downloadHexFile found the patch already in RAM and did not transfer it."""
+        self.wakeStatistics:Dict[str,LatencyHistogram] = { phase: LatencyHistogram() for phase in self.WAKE_PHASES }
+        """Time per phase of all warmWakeMeasure cycles."""
+        self.fuseStatusCheck:bool = True
+        """Command completion and application status are checked with one block read per poll (CMD_STAT .. STATUS), instead of
+           polling CMD_STAT and reading STATE/STATUS afterwards."""
+        self.downloadChunkSize:int = self.TMF8X0X_BL_MAX_DATA_SIZE
+        """Number of bytes per RAM write command of downloadHexFile."""
+        self.downloadPollDelay:float = None
+        """Delay in seconds before the first status poll of a RAM write. None: learn the delay from the acknowledge times, see _bootloaderSendFrames."""
+        self.lastDownloadStatistics:DownloadStatistics = DownloadStatistics()
+        """Frames, bytes, polls, time and throughput of the last download."""
+        self._learnedPollDelay:float = None
+        self._bootloaderReadTimes:List[float] = []
         self._defaultConfig = tmf8806MeasureCmd()
         self._defaultConfig.data.command = 0x2
         self._defaultConfig.data.kIters = 900
@@ -291,6 +556,10 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self._defaultConfig.data.spreadSpecVcselChp.amplitude = 0 # off
         self._defaultConfig.data.spreadSpecVcselChp.config = 0 # two-frequency mode
         self._defaultConfig.data.spreadSpecVcselChp.singleEdgeMode = 0 # randomize both edges
+        # preallocated readout buffer for one histogram set (one row per TDC), re-used by every histogram readout
+        self._histogramBuffer = numpy.zeros((self.TMF8X0X_APP_HISTOGRAM_TDCS, self.TMF8X0X_APP_HISTOGRAM_BINS), dtype=self.TMF8X0X_APP_HISTOGRAM_DTYPE)
+        self.histogramReadTransactions:int = 0
+        """Number of I2C transactions used to read the quarters of the last histogram set."""
 
     def _log(self,msg:str):
         """generic logging function
@@ -300,6 +569,14 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         """
         if self.LOG:print(msg)
 
+    def setWaitStrategy(self, wait_strategy:WaitStrategy):
+        """Select how this instance waits for results, histograms and calibration.
+
+        Args:
+            wait_strategy (WaitStrategy): e.g. RegisterPollWaitStrategy() or IntPinWaitStrategy(poll_interval=0.0005)
+        """
+        self.waitStrategy = wait_strategy
+
     def switchLog(self,log:bool):
         """enable or disable log for all functions in the class
 
@@ -308,6 +585,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         """
         self.LOG=log
 
+    @instrumented("isAppRunning")
     def isAppRunning(self)->bool:
         """Check if the application is running.
         Returns:
@@ -316,6 +594,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         val = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_COM_APP_ID], 1)
         return val and val[0] == self.TMF8X0X_COM_APP_ID__application
 
+    @instrumented("getAppId")
     def getAppId(self)->list:
         """Get the application version.
 
@@ -333,8 +612,18 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         Returns:
             Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
         """
+        regs = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_APP_COM_STATE], 2)
+        return self._evaluateAppStatus(regs)
+
+    def _evaluateAppStatus(self, regs)->Tmf8x0xDevice.Status:
+        """
+        Evaluate the STATE and STATUS registers, see _checkAppStatus.
+        Args:
+            regs: the values of the STATE and STATUS registers
+        Returns:
+            Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
+        """
         stateRegister = self.TMF8X0X_APP_COM_STATE
-        regs = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [stateRegister], 2)
         if regs[0] == self.TMF8X0X_APP_STATE_ERROR:
             msg = "ERROR Tmf8x0xApp._checkAppStatus in ERROR state register 0x{:02x} has value 0x{:02x}, register 0x{:02x} has value 0x{:02x})".format(stateRegister,regs[0],stateRegister+1, regs[1])
             self._log(msg)
@@ -361,21 +650,40 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         Returns:
             Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
         """
-        maxTime = time.time() + timeout
         regAddr = self.TMF8X0X_APP_CMD_STAT
-        while True:
+        def cmdDone():
             regs = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [regAddr], 2)
-            if ( regs[0] == 0 ) and ( regs[1] == cmd ):
-                msg1 = "Tmf8x0xApp._checkCmdDone register 0x{:02x} has value 0x{:02x}, register 0x{:02x} has value 0x{:02x})".format(regAddr,regs[0],regAddr+1, regs[1])
-                self._log(msg1)
-                return self.Status.OK # okay, done, if one after command regsister is command, then command is done
-            if ( time.time() > maxTime):
-                break # do while loop - usefull when stepping through
+            # if one after command register is command, then command is done
+            return regs if ( regs[0] == 0 ) and ( regs[1] == cmd ) else None
+        regs = self.poller.poll(self._commandName(cmd), cmdDone, timeout)
+        if regs:
+            msg1 = "Tmf8x0xApp._checkCmdDone register 0x{:02x} has value 0x{:02x}, register 0x{:02x} has value 0x{:02x})".format(regAddr,regs[0],regAddr+1, regs[1])
+            self._log(msg1)
+            return self.Status.OK
 
         msg2="Tmf8x0xApp._checkCmdDone Timeout expected register 0x{:02x} has value 0x{:02x}, register 0x{:02x} has value 0x{:02x})".format(regAddr,0,regAddr+1,cmd)
         self._setError(msg2)
         return self.Status.APP_ERROR
 
+    def _commandName(self, cmd:int)->str:
+        """Name of an application command, used as poller key.
+
+        Args:
+            cmd (int): the command code
+
+        Returns:
+            str: the command name
+        """
+        return self.APP_COMMAND_NAMES.get(cmd, "cmd_0x{:02x}".format(cmd))
+
+    def getPollStatistics(self)->dict:
+        """Get poll counts and latency distributions of all commands waited for so far.
+
+        Returns:
+            dict: statistics per command name
+        """
+        return self.poller.getStatistics()
+
     def _checkAppStatusAndCommandDone(self,cmd:int, timeout: float)->Tmf8x0xDevice.Status:
         """check if an error occured during command execution and if command execution is finished, convenience wrapper
 
@@ -386,10 +694,38 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         Returns:
             Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
         """
-        status:Tmf8x0xDevice.Status = self._checkCmdDone(cmd=cmd,timeout=timeout)
-        if status == self.Status.OK:
-            return self._checkAppStatus()
-        return status
+        with instrumentTag(self._instrumentation, "commandDone"):
+            if self.fuseStatusCheck:
+                return self._checkCmdDoneAndAppStatus(cmd=cmd, timeout=timeout)
+            status:Tmf8x0xDevice.Status = self._checkCmdDone(cmd=cmd,timeout=timeout)
+            if status == self.Status.OK:
+                return self._checkAppStatus()
+            return status
+
+    def _checkCmdDoneAndAppStatus(self, cmd:int, timeout: float)->Tmf8x0xDevice.Status:
+        """
+        Same as _checkCmdDone followed by _checkAppStatus, but every poll reads the registers CMD_STAT .. STATUS in one
+        transaction, so the status check needs no extra round trip.
+        Args:
+            cmd (int): A valid command for the device application.
+            timeout (float): how long to try to figure out that the command is done.
+        Returns:
+            Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
+        """
+        regAddr = self.TMF8X0X_APP_CMD_STAT
+        size = self.TMF8X0X_APP_COM_STATUS - regAddr + 1
+        def cmdDone():
+            regs = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [regAddr], size)
+            # if one after command register is command, then command is done
+            return regs if len(regs) == size and ( regs[0] == 0 ) and ( regs[1] == cmd ) else None
+        regs = self.poller.poll(self._commandName(cmd), cmdDone, timeout)
+        if regs:
+            state = self.TMF8X0X_APP_COM_STATE - regAddr
+            return self._evaluateAppStatus(regs[state:state + 2])
+
+        msg="Tmf8x0xApp._checkCmdDoneAndAppStatus Timeout expected register 0x{:02x} has value 0x{:02x}, register 0x{:02x} has value 0x{:02x})".format(regAddr,0,regAddr+1,cmd)
+        self._setError(msg)
+        return self.Status.APP_ERROR
 
     def _waitForCalibrationDone(self,timeout:float=10.0)->Tmf8x0xDevice.Status:
         """wait until factory calibration has finished
@@ -402,14 +738,27 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         """
         maxTime = time.time() + timeout
         while True:
-            interrupt = self.readAndClearInt(self.TMF8X0X_APP_INTERRUPT_RESULTS)
-            if ( interrupt == self.TMF8X0X_APP_INTERRUPT_RESULTS ):
-                blob = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [ self.TMF8X0X_APP_COM_CONTENT ], 1)
-                if (len(blob) > 0) and (blob[0] == self.TMF8X0X_APP_CMD_STAT__cmd_factory_calibration):
-                    return self.Status.OK
+            interrupt = self.waitStrategy.waitForInterrupt(self, self.TMF8X0X_APP_INTERRUPT_RESULTS, max(0.0, maxTime - time.time()))
+            if self._calibrationStep(interrupt):
+                return self.Status.OK
             if ( time.time() > maxTime ):
                 return self.Status.TIMEOUT_ERROR
 
+    def _calibrationStep(self, interrupt:int)->bool:
+        """One step of the factory calibration wait after an interrupt wait, shared with the asyncio front-end.
+
+        Args:
+            interrupt (int): the pending interrupt bits the wait returned
+
+        Returns:
+            bool: True if the result interrupt came from the finished factory calibration
+        """
+        if ( interrupt == self.TMF8X0X_APP_INTERRUPT_RESULTS ):
+            blob = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [ self.TMF8X0X_APP_COM_CONTENT ], 1)
+            return (len(blob) > 0) and (blob[0] == self.TMF8X0X_APP_CMD_STAT__cmd_factory_calibration)
+        return False
+
+    @instrumented("factoryCalibration")
     def factoryCalibration(self, config:tmf8806MeasureCmd=None, kilo_iters:int = 40960, timeout: float = 10.0)->Tmf8x0xDevice.Status:
         """
         Execute a factory calibration sequence.
@@ -421,14 +770,25 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         Returns:
             Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
         """
-        # clear the result place to check if it becomes non-zero == command completed
+        self.measure(self._factoryCalibrationConfig(config, kilo_iters))
+        return self._waitForCalibrationDone(timeout=timeout)
+
+    def _factoryCalibrationConfig(self, config:tmf8806MeasureCmd, kilo_iters:int)->tmf8806MeasureCmd:
+        """Build the measure command that starts a factory calibration.
+
+        Args:
+            config (tmf8806MeasureCmd): The measurement config with the settings for the calibration, None for the default configuration.
+            kilo_iters (int): The kilo-iterations for the factory calibration.
+
+        Returns:
+            tmf8806MeasureCmd: a copy of config with kIters and the calibration command set
+        """
         if not config:
             config = self._defaultConfig
         fact_cal = tmf8806MeasureCmd.from_buffer_copy(bytes(config))
         fact_cal.data.kIters = kilo_iters
         fact_cal.data.command = self.TMF8X0X_APP_CMD_STAT__cmd_factory_calibration
-        self.measure(fact_cal)
-        return self._waitForCalibrationDone(timeout=timeout)
+        return fact_cal
 
     def getDefaultConfiguration(self)->tmf8806MeasureCmd:
         """
@@ -438,6 +798,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         """
         return tmf8806MeasureCmd.from_buffer_copy(bytes(self._defaultConfig)) # deep copy
 
+    @instrumented("readFactoryCalibration")
     def readFactoryCalibration(self)->tmf8806FactoryCalibData:
         """
         Read back the factory calibration.
@@ -452,6 +813,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
             return None
         return tmf8806FactoryCalibData.from_buffer_copy(bytes(blob))
 
+    @instrumented("setFactoryCalibration")
     def setFactoryCalibration(self,calibration:tmf8806FactoryCalibData, timeout: float = 0.01)->Tmf8x0xDevice.Status:
         """
         Upload the factory calibration data to the register where it will be read in by the FW when the Write-Calibration command
@@ -474,6 +836,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self.com.i2cTx(self.I2C_SLAVE_ADDR, cmd )
         return self._checkAppStatusAndCommandDone(cmd=self.TMF8X0X_APP_CMD_STAT__cmd_wr_calibration, timeout=timeout)
 
+    @instrumented("setThresholds")
     def setThresholds(self, persistence:int=0, low_threshold:int=0,high_threshold:int=10000, timeout:float=0.001)->Tmf8x0xDevice.Status:
         """Set additional configuration
         Args:
@@ -498,6 +861,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self.com.i2cTx(self.I2C_SLAVE_ADDR, cmd )
         return self._checkAppStatusAndCommandDone(cmd=self.TMF8X0X_APP_CMD_STAT__cmd_wr_add_config, timeout=timeout)
 
+    @instrumented("getThresholds")
     def getThresholds(self, timeout:float=0.001)->Tuple[int,int,int]:
         """Read back the additional configuration of the device
             timeout (float, optional): How long to wait until command is completed. Defaults to 0.001.
@@ -521,6 +885,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         else:
             return -1, -1, -1   # error
 
+    @instrumented("setGPIO")
     def setGPIO(self, gpio0:int=0, gpio1:int=0,timeout:float=0.01)->Tmf8x0xDevice.Status:
         """Set the state of the GPIOs without starting a measurement. Please note: setting gpiox = 3 does not enable VCSEL pulse output.
            You need to use the GPIO control of the measurement command and set configuration.data.daxDelay100us to a value > 0 to do this:
@@ -546,6 +911,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self.com.i2cTx(self.I2C_SLAVE_ADDR, cmd )
         return self._checkAppStatusAndCommandDone(cmd=self.TMF8X0X_APP_CMD_STAT__cmd_set_gpio, timeout=timeout)
 
+    @instrumented("measure")
     def measure(self, config:tmf8806MeasureCmd, calibration:tmf8806FactoryCalibData = None, stateData:tmf8806StateData = None, timeout:float=1.0)->Tmf8x0xDevice.Status:
         """
         Start a measurement.
@@ -569,13 +935,45 @@ class Tmf8x0xApp(Tmf8x0xDevice):
             additional_data += bytearray(stateData)
         else:
             config.data.data.algState = 0
-        if additional_data:
-            self.com.i2cTx(self.I2C_SLAVE_ADDR, bytearray([self.TMF8X0X_APP_FACTORY_CALIBRATION_START]) + additional_data)
+        data_frame = bytearray([self.TMF8X0X_APP_FACTORY_CALIBRATION_START]) + additional_data if additional_data else None
+        measure_frame = bytes([self.TMF8X0X_APP_CMD_DATA_9]) + bytes(config)
+        return self._startMeasurement(data_frame, measure_frame, config.data.command, timeout)
 
+    def prepareMeasurement(self, config:tmf8806MeasureCmd, calibration:tmf8806FactoryCalibData = None)->PreparedMeasurement:
+        """Encode a measurement command once for measurePrepared.
+        Args:
+            config (tmf8806MeasureCmd): configuration data
+            calibration (tmf8806FactoryCalibData, optional): calibration data
+        Returns:
+            PreparedMeasurement: the encoded frames
+        """
+        return PreparedMeasurement(config, calibration)
 
-        self.com.i2cTx(self.I2C_SLAVE_ADDR, bytes([self.TMF8X0X_APP_CMD_DATA_9]) + bytes(config))
-        return self._checkAppStatusAndCommandDone(cmd=config.data.command, timeout=timeout)
+    @instrumented("measurePrepared")
+    def measurePrepared(self, prepared:PreparedMeasurement, stateData:tmf8806StateData = None, timeout:float=1.0)->Tmf8x0xDevice.Status:
+        """
+        Start a measurement with pre-encoded frames, the same I2C traffic as measure with the same arguments.
+        Args:
+            prepared (PreparedMeasurement): configuration and calibration from prepareMeasurement
+            stateData (tmf8806StateData, optional): state data
+            timeout (float, optional): How long to allow for a measurement to start in seconds. Defaults to 1.0 seconds
+        Returns:
+            Tmf8x0xDevice.Status.OK: if ok, else an error has a different value.
+        """
+        data_frame, measure_frame = prepared.frames(stateData)
+        return self._startMeasurement(data_frame, measure_frame, prepared.command, timeout)
+
+    def _startMeasurement(self, data_frame:bytes, measure_frame:bytes, cmd:int, timeout:float)->Tmf8x0xDevice.Status:
+        """Write calibration/state data (if any) and the measure command, and wait until the command is done."""
+        if data_frame:
+            self.com.i2cTx(self.I2C_SLAVE_ADDR, data_frame)
+
+        self.waitStrategy.prepare(self, self.TMF8X0X_APP_INTERRUPT_RESULTS | self.TMF8X0X_APP_INTERRUPT_DIAG)
 
+        self.com.i2cTx(self.I2C_SLAVE_ADDR, measure_frame)
+        return self._checkAppStatusAndCommandDone(cmd=cmd, timeout=timeout)
+
+    @instrumented("stop")
     def stop(self, timeout: float = 0.050) -> Tmf8x0xDevice.Status:
         """
         Issue a stop command and wait for completion
@@ -591,30 +989,77 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self.clearIntStatus( self.TMF8X0X_APP_INTERRUPT_RESULTS | self.TMF8X0X_APP_INTERRUPT_DIAG )
         return status
 
+    @instrumented("readResultFrameInt")
     def readResultFrameInt(self,timeout:float=1.0)->tmf8806DistanceResultFrame:
         """
-        Read a result frame if the interrupt is set and return it
+        Read a result frame if the interrupt is set and return it.
+        The number of I2C transactions the frame cost is stored in lastResultTransactions.
         Args:
             timeout (float, optional): How long to wait for an interrupt to occur. Defaults to 1.0 seconds
             log (bool, optional): print info message or not. Defaults to False.
         Returns:
             tmf8806DistanceResultFrame: result frame or None
         """
-        maxTime = time.time() + timeout
-        while True:
-            interrupt = self.readAndClearInt(self.TMF8X0X_APP_INTERRUPT_RESULTS)
-            if ( interrupt == self.TMF8X0X_APP_INTERRUPT_RESULTS ):
-                results = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_APP_COM_STATE], self.TMF8X0X_APP_RESULT_SIZE)
-                if len(results) > 0:
-                    return tmf8806DistanceResultFrame.from_buffer_copy(bytes(results[self.TMF8X0X_APP_RESULT_HEADER_SIZE:]))
-                else:
-                    return None
+        interrupt = self.waitStrategy.waitForInterrupt(self, self.TMF8X0X_APP_INTERRUPT_RESULTS, timeout)
+        return self._resultFrameStep(interrupt)
 
-            if ( time.time() > maxTime ):
-                msg = "TMF8x0x.readResultFrameInt: timeout"
-                self._log(msg)
-                self._setError(msg)
+    def _resultFrameStep(self, interrupt:int)->tmf8806DistanceResultFrame:
+        """Second half of readResultFrameInt after the interrupt wait, shared with the asyncio front-end.
 
+        Args:
+            interrupt (int): the pending interrupt bits the wait returned
+
+        Returns:
+            tmf8806DistanceResultFrame: result frame or None (the timeout is reported)
+        """
+        self.lastResultTransactions = self.waitStrategy.transactions
+        if ( interrupt == self.TMF8X0X_APP_INTERRUPT_RESULTS ):
+            return self._readResultFrame()
+        msg = "TMF8x0x.readResultFrameInt: timeout"
+        self._log(msg)
+        self._setError(msg)
+        return None
+
+    def _readResultFrame(self)->tmf8806DistanceResultFrame:
+        """
+        Read the result frame, the result interrupt must already be cleared.
+        Returns:
+            tmf8806DistanceResultFrame: result frame or None
+        """
+        results = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_APP_COM_STATE], self.TMF8X0X_APP_RESULT_SIZE)
+        self.lastResultTransactions += 1
+        if len(results) > 0:
+            return tmf8806DistanceResultFrame.from_buffer_copy(results, self.TMF8X0X_APP_RESULT_HEADER_SIZE)
+        return None
+
+    @instrumented("readResultFrameIntoRing")
+    def readResultFrameIntoRing(self, ring:ResultRingBuffer, timeout:float=1.0)->numpy.void:
+        """
+        Wait for the result interrupt and decode the result frame into the next slot of a ring buffer.
+        The frame is decoded straight from the I2C read buffer into the ring, no object is kept per frame.
+        Args:
+            ring (ResultRingBuffer): the ring buffer
+            timeout (float, optional): How long to wait for an interrupt to occur. Defaults to 1.0 seconds
+        Returns:
+            numpy.void: the frame, a view into the ring that is valid until the slot is overwritten. None on timeout or a short read.
+        """
+        interrupt = self.waitStrategy.waitForInterrupt(self, self.TMF8X0X_APP_INTERRUPT_RESULTS, timeout)
+        self.lastResultTransactions = self.waitStrategy.transactions
+        if ( interrupt == self.TMF8X0X_APP_INTERRUPT_RESULTS ):
+            results = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_APP_COM_STATE], self.TMF8X0X_APP_RESULT_SIZE)
+            self.lastResultTransactions += 1
+            if len(results) == self.TMF8X0X_APP_RESULT_SIZE:
+                return ring.push(results, self.TMF8X0X_APP_RESULT_HEADER_SIZE)
+            msg = "TMF8x0x.readResultFrameIntoRing: short read, {} of {} bytes".format(len(results), self.TMF8X0X_APP_RESULT_SIZE)
+            self._log(msg)
+            self._setError(msg)
+            return None
+        msg = "TMF8x0x.readResultFrameIntoRing: timeout"
+        self._log(msg)
+        self._setError(msg)
+        return None
+
+    @instrumented("configureHistogramDumping")
     def configureHistogramDumping(self, ec:bool=False, prox:bool=False, distance:bool=False, distance_puc:bool=False, summed:bool=False,  timeout:float=0.01)->Tmf8x0xDevice.Status:
         """
         Configure to dump histograms (if at least one of the bool parameters except log are True) or not dump any (all bool parameters except log must be False) )
@@ -646,6 +1091,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self._log("Diagnostics histogram readout enabled for Addr=0x{:02x} 0x{:02x} {:02x} {:02x} {:02x}".format(reg_addr,cmd_data3,cmd_data2,cmd_data1,cmd_data0))
         return self._checkAppStatusAndCommandDone(cmd=cmd, timeout=timeout)
 
+    @instrumented("continueAfterHistogram")
     def continueAfterHistogram(self, timeout:float=0.01)->Tmf8x0xDevice.Status:
         """
         Command that needs to be issued after the devices has provided a complete histogram (e.g. all 5 channel for EC)
@@ -659,54 +1105,78 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self.com.i2cTx(self.I2C_SLAVE_ADDR, command )
         return self._checkAppStatusAndCommandDone(cmd=cmd, timeout = timeout)
 
-    def _readSingleHistogram(self, id:int, timeout:float=1.0)->Tuple[Tmf8x0xDevice.Status,Histogram]:
+    def _readSingleHistogram(self, id:int, timeout:float=1.0, bins:numpy.ndarray=None)->Tuple[Tmf8x0xDevice.Status,Histogram]:
         """
-        Read in a single tdc histogram of 4 quadrants, each is 64 bins each bin 2 bytes wide
+        Read in a single tdc histogram of 4 quadrants, each is 64 bins each bin 2 bytes wide.
+        Header and payload of a quadrant are read with a single I2C transaction.
         Args:
             id (int): histogram quarter ID.
             timeout (float,optional): timeout value for histogram reading, defaults to 1.0s
+            bins (numpy.ndarray,optional): uint16 array of 256 bins the histogram is decoded into. If None, a new array is allocated.
         Returns:
-            Tmf8x0xDevice.Status, Histogram: status and histogram object with histogram type and bin list
+            Tmf8x0xDevice.Status, Histogram: status and histogram object with histogram type and bin array
         """
-        hist = Histogram()
-        hist.bins = [0 for i in range(256)]
+        if bins is None:
+            bins = numpy.zeros(self.TMF8X0X_APP_HISTOGRAM_BINS, dtype=self.TMF8X0X_APP_HISTOGRAM_DTYPE)
+        else:
+            bins.fill(0)
+        hist = Histogram(bins)
+        quarter_bins = self.TMF8X0X_APP_HISTOGRAM_QUARTER_BINS
+        header_size = self.TMF8X0X_APP_RESULT_HEADER_SIZE
+        frame_size = header_size + self.TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE
+        regAddr = self.TMF8X0X_APP_COM_STATE
         out = time.time() + timeout
-        for tid in range( 4 ):
-            while True:                         # stay in this loop until the quarter is read
-                if time.time() > out:
-                    return self.Status.TIMEOUT_ERROR, hist
-                regAddr = self.TMF8X0X_APP_COM_STATE
-                header = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [regAddr], 4)
-                if ( header[ 0 ] != self.TMF8X0X_APP_STATE_ERROR ):   # if the state machine is not in state error
-                    hist.type = header[ 0 ]         # the state defines the histogram type
-                    if hist.type == Histogram.HISTOGRAM_SUM and tid > 1:
-                        return self.Status.OK, hist
-                    if ( header[ 2 ] == id ):
-                        self._log("Quarter histogram received 0x{:2x}".format(header[2]))
-                        data = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_APP_COM_RESULT_NUMBER], 128 )
-                        if ( data ):
-                            for i in range(64):
-                                hist.bins[64*tid+i] = data[2*i]+data[2*i+1]*256
-                                self._log("Histogram 0x{:02x}".format( id ))
-                                self._log(hist.bins)
-                            id = id + 1
-                            break # go on with next quarter
-                else:
-                    self._log("Error state during histogram reading")
-                    return self.Status.APP_ERROR, hist
+        for tid in range( self.TMF8X0X_APP_HISTOGRAM_QUARTERS ):
+            read_size = frame_size              # optimistic: header and payload in a single transaction
+            with instrumentTag(self._instrumentation, "histogram_quarter"):
+                while True:                         # stay in this loop until the quarter is read
+                    if time.time() > out:
+                        return self.Status.TIMEOUT_ERROR, hist
+                    frame = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [regAddr], read_size)
+                    self.histogramReadTransactions += 1
+                    if ( len(frame) < header_size ):
+                        self._log("Short histogram read of {} bytes".format(len(frame)))
+                        read_size = frame_size      # no header to check, poll again until the timeout
+                        continue
+                    if ( frame[ 0 ] == self.TMF8X0X_APP_STATE_ERROR ):   # the state machine is in state error
+                        self._log("Error state during histogram reading")
+                        return self.Status.APP_ERROR, hist
+                    hist.type = frame[ 0 ]          # the state defines the histogram type
+                    if ( frame[ 2 ] != id ):
+                        read_size = header_size     # quarter not published yet, only re-poll the header
+                        continue
+                    if ( len(frame) != frame_size ):
+                        read_size = frame_size      # header matches now, fetch header and payload together
+                        continue
+                    self._log("Quarter histogram received 0x{:2x}".format(frame[2]))
+                    # decode the 64 little-endian 16-bit bins straight from the I2C payload
+                    bins[quarter_bins*tid:quarter_bins*(tid+1)] = numpy.frombuffer(frame, dtype=self.TMF8X0X_APP_HISTOGRAM_DTYPE, offset=header_size)
+                    if self.LOG:
+                        self._log("Histogram 0x{:02x}".format( id ))
+                        self._log(bins[quarter_bins*tid:quarter_bins*(tid+1)].tolist())
+                    id = id + 1
+                    break # go on with next quarter
+            if hist.type == Histogram.HISTOGRAM_SUM and tid > 0:
+                return self.Status.OK, hist     # summed histograms only have 2 quarters
 
         return self.Status.OK, hist
 
-    def readHistogramsUnscaled(self, timeout:float=1.0)->Tuple[Tmf8x0xDevice.Status,List[Histogram]]:
+    @instrumented("readHistogramsUnscaled")
+    def readHistogramsUnscaled(self, timeout:float=1.0, buffer:numpy.ndarray=None)->Tuple[Tmf8x0xDevice.Status,List[Histogram]]:
         """
         Function to read a complete histogram series of one type (i.e. 5 histograms each with 256 bins).
         Function does not scale bin values.
+        The data of the returned histograms are uint16 rows of buffer. By default that is the preallocated readout buffer
+        of this object, so the next histogram readout overwrites them: copy the data to keep it, or pass an own buffer.
 
         Args:
             timeout (float, optional): time-out for status checking and histogram reads. Defaults to 0.1.
+            buffer (numpy.ndarray, optional): 5 x 256 uint16 array the histograms are decoded into.
+                Defaults to None (the preallocated readout buffer).
         Returns:
             Tmf8x0xDevice.Status, list: status and a list of 5 histograms (one for each TDC).
         """
+        self.histogramReadTransactions = 0
         interrupt = self.readAndClearInt( self.TMF8X0X_APP_INTERRUPT_DIAG )
         EMPTY_HISTOGRAMS = [ None, None, None, None, None ]
         if ( interrupt ):
@@ -724,17 +1194,19 @@ class Tmf8x0xApp(Tmf8x0xDevice):
                 hist3:Histogram = None
                 hist4:Histogram = None
 
-                status, hist0 = self._readSingleHistogram( id )
+                if buffer is None:
+                    buffer = self._histogramBuffer
+                status, hist0 = self._readSingleHistogram( id, timeout=timeout, bins=buffer[0] )
                 if ( status != self.Status.OK ): return status, EMPTY_HISTOGRAMS
 
                 if hist0.type != Histogram.HISTOGRAM_SUM:
-                    status, hist1 = self._readSingleHistogram( id +  4, timeout=timeout )
+                    status, hist1 = self._readSingleHistogram( id +  4, timeout=timeout, bins=buffer[1] )
                     if ( status != self.Status.OK ): return status, EMPTY_HISTOGRAMS
-                    status, hist2 = self._readSingleHistogram( id +  8, timeout=timeout )
+                    status, hist2 = self._readSingleHistogram( id +  8, timeout=timeout, bins=buffer[2] )
                     if ( status != self.Status.OK ): return status, EMPTY_HISTOGRAMS
-                    status, hist3 = self._readSingleHistogram( id + 12, timeout=timeout )
+                    status, hist3 = self._readSingleHistogram( id + 12, timeout=timeout, bins=buffer[3] )
                     if ( status != self.Status.OK ): return status, EMPTY_HISTOGRAMS
-                    status, hist4 = self._readSingleHistogram( id + 16, timeout=timeout )
+                    status, hist4 = self._readSingleHistogram( id + 16, timeout=timeout, bins=buffer[4] )
                     if ( status != self.Status.OK ): return status, EMPTY_HISTOGRAMS
                 else:
                     # read diagnostic register to find out if we have a summed histogram 
@@ -751,7 +1223,8 @@ class Tmf8x0xApp(Tmf8x0xDevice):
             else:
                 return statusCheck, EMPTY_HISTOGRAMS
 
-    def _scaleBins(self,bins:List[int]):
+    @staticmethod
+    def _scaleBins(bins:List[int])->List[int]:
         """Scale histograms with the scaling factors in bin[127] for channel 0 and bin[255] for channel 1
 
         Args:
@@ -760,67 +1233,128 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         Returns:
             List[int]: list of scaled bin values
         """
-        if len(bins) <= self.UINT8_MAX:
-            return bins
-        else:
-            return ([bin << bins[127] for bin in bins[0:127]]
-                    + bins[127:128]
-                    + [bin << bins[255] for bin in bins[128:255]]
-                    + bins[255:])
+        return shiftScale(bins).tolist()
+
+    @staticmethod
+    def scaleHistograms(bins, histogram_type:int, out:numpy.ndarray=None)->numpy.ndarray:
+        """Scale raw histograms of one type like readHistogramsAndResult does, e.g. archived readHistogramsUnscaled data.
+           All histograms are scaled in one vectorized operation.
+
+        Args:
+            bins: raw bins, a histogram (bins), a set (channels x bins) or a recording (frames x channels x bins)
+            histogram_type (int): Histogram.HISTOGRAM_... type of the histograms
+            out (numpy.ndarray, optional): Array for the result, e.g. bins itself to scale in place. Defaults to None (a new array).
+
+        Returns:
+            numpy.ndarray: the scaled bins
+        """
+        if histogram_type == Histogram.HISTOGRAM_SUM:
+            return factorScale(bins, SUM_FACTOR, out)
+        if histogram_type == Histogram.HISTOGRAM_PUC:
+            return factorScale(bins, PUC_FACTOR, out)
+        return shiftScale(bins, out)
+
+    @classmethod
+    def _storeHistograms(cls, hr:HistogramsAndResult, histograms:List[Histogram]):
+        """Scale a histogram set read with readHistogramsUnscaled and store it in hr according to its type.
 
-    def readHistogramsAndResult(self,timeout:float=10.0)->Tuple[Tmf8x0xDevice.Status,HistogramsAndResult]:
+        Args:
+            hr (HistogramsAndResult): the object to store the histograms in
+            histograms (List[Histogram]): the histograms of one set
+        """
+        if histograms and histograms[0]:
+            histogram_type = histograms[0].type
+            kind = cls.HISTOGRAM_KINDS.get(histogram_type)
+            if kind is None:
+                return
+            present = [ histogram.data for histogram in histograms[:1 if kind == HistogramsAndResult.SUM else None] if histogram ]
+            first = 0
+            if kind == HistogramsAndResult.DIST_PUC:
+                first = hr._counts[kind] if hr._counts[kind] != 4 else 0    # the PUC histograms can come in several sets
+            rows = hr._rows(kind, first, len(present), len(present[0]))
+            for row, data in zip(rows, present):
+                row[:] = data
+            cls.scaleHistograms(rows, histogram_type, out=rows)
+
+    @instrumented("readHistogramsAndResult")
+    def readHistogramsAndResult(self,timeout:float=10.0, hr:HistogramsAndResult=None)->Tuple[Tmf8x0xDevice.Status,HistogramsAndResult]:
         """Read all available histograms. Stop as soon as a result frame arrives.
 
         Args:
             timeout (float, optional): Maximum time to retrieve all histograms and a result frame. Defaults to 10.0.
+            hr (HistogramsAndResult, optional): Object to reuse, its histogram blocks are overwritten. Defaults to None (a new object).
 
         Returns:
             Tmf8x0xDevice.Status, HistogramsAndResult: status, histograms and result object
         """
-        hr = HistogramsAndResult()
+        if hr is None:
+            hr = HistogramsAndResult()
+        else:
+            hr.clear()
         out = time.time() + timeout
         while True:
             if time.time() > out:
                 return self.Status.TIMEOUT_ERROR, hr
 
-            interrupt = self.readIntStatus() # only read INT status here once
-
-            if interrupt & self.TMF8X0X_APP_INTERRUPT_RESULTS:
-                hr.result = self.readResultFrameInt(timeout=timeout)
-                return self.Status.OK, hr
-            if interrupt & self.TMF8X0X_APP_INTERRUPT_DIAG:
-                status, histograms = self.readHistogramsUnscaled(timeout=timeout)
-                if ( status != self.Status.OK ):
-                    return self.Status.APP_ERROR, hr
-                if histograms and histograms[0]:
-                    if histograms[0].type == Histogram.HISTOGRAM_EC:
-                        hr.histogramsEc = []
-                        for histogram in histograms:
-                            if histogram:
-                                hr.histogramsEc.append(self._scaleBins(histogram.bins))
-                    if histograms[0].type == Histogram.HISTOGRAM_OPTICAL:
-                        hr.histogramsOc = []
-                        for histogram in histograms:
-                            if histogram:
-                                hr.histogramsOc.append(self._scaleBins(histogram.bins))
-                    if histograms[0].type == Histogram.HISTOGRAM_PROXIMITY:
-                        hr.histogramsProx = []
-                        for histogram in histograms:
-                            if histogram:
-                                hr.histogramsProx.append(self._scaleBins(histogram.bins))
-                    if histograms[0].type == Histogram.HISTOGRAM_DISTANCE:
-                        hr.histogramsDist = []
-                        for histogram in histograms:
-                            if histogram:
-                                hr.histogramsDist.append(self._scaleBins(histogram.bins))
-                    if histograms[0].type == Histogram.HISTOGRAM_SUM: 
-                            hr.histogramSum = [ bin * 4 for bin in histograms[0].bins ]                # scale summed histogram with a factor of 4
-                    if histograms[0].type == Histogram.HISTOGRAM_PUC:              
-                        if len(hr.histogramsDistPuc) == 4:
-                            hr.histogramsDistPuc = []
-                        for histogram in histograms:   
-                            if histogram:
-                                hr.histogramsDistPuc.append( [ bin * 2 for bin in histogram.bins ] )   # scale PUC histograms with a factor of 4
+            # only read INT status here once, the histogram readout clears the diagnostic interrupt
+            interrupt = self.waitStrategy.waitForInterrupt(self, self.TMF8X0X_APP_INTERRUPT_RESULTS | self.TMF8X0X_APP_INTERRUPT_DIAG,
+                                                           max(0.0, out - time.time()), clear=False)
+            status = self._histogramsAndResultStep(hr, interrupt, timeout)
+            if status is not None:
+                return status, hr
+
+    def _histogramsAndResultStep(self, hr:HistogramsAndResult, interrupt:int, timeout:float)->Tmf8x0xDevice.Status:
+        """One step of readHistogramsAndResult after the interrupt wait, shared with the asyncio front-end:
+           read the result frame, or read and store a histogram set.
+
+        Args:
+            hr (HistogramsAndResult): the object to store the histograms and the result in
+            interrupt (int): the pending interrupt bits the wait returned (not cleared)
+            timeout (float): time-out for the histogram readout
+
+        Returns:
+            Tmf8x0xDevice.Status: OK if the result frame was read, None if the readout goes on, else the error
+        """
+        self.lastResultTransactions = self.waitStrategy.transactions
+        if interrupt & self.TMF8X0X_APP_INTERRUPT_RESULTS:
+            self.clearIntStatus(self.TMF8X0X_APP_INTERRUPT_RESULTS)
+            self.lastResultTransactions += 1
+            hr.result = self._readResultFrame()
+            return self.Status.OK
+        if interrupt & self.TMF8X0X_APP_INTERRUPT_DIAG:
+            status, histograms = self.readHistogramsUnscaled(timeout=timeout)
+            if ( status != self.Status.OK ):
+                return self.Status.APP_ERROR
+            self._storeHistograms(hr, histograms)
+        return None
+
+    def stream(self, config:tmf8806MeasureCmd=None, calibration:tmf8806FactoryCalibData=None, stateData:tmf8806StateData=None,
+               histograms:dict=None, queue_size:int=64, policy:OverflowPolicy=OverflowPolicy.DROP_OLDEST, timeout:float=1.0,
+               max_timeouts:int=3)->MeasurementStream:
+        """
+        Continuous measurement as iterator. The measurement runs while the returned stream is entered:
+
+            with tof.stream(config) as results:
+                for result in results:
+                    ...
+
+        Args:
+            config (tmf8806MeasureCmd, optional): configuration data. Defaults to the default configuration.
+            calibration (tmf8806FactoryCalibData, optional): calibration data. Defaults to None.
+            stateData (tmf8806StateData, optional): state data. Defaults to None.
+            histograms (dict, optional): arguments for configureHistogramDumping, e.g. dict(distance=True); the stream then yields
+                HistogramsAndResult objects instead of result frames. Defaults to None.
+            queue_size (int, optional): maximum number of items waiting for the consumer. Defaults to 64.
+            policy (OverflowPolicy, optional): what to do when the queue is full. Defaults to OverflowPolicy.DROP_OLDEST.
+            timeout (float, optional): maximum time to wait for one result, a timeout is counted, not raised. Defaults to 1.0.
+            max_timeouts (int, optional): timeouts in a row that end the stream, None never ends it. Defaults to 3.
+        Returns:
+            MeasurementStream: the stream, with dropped frame and timeout counters in its statistics
+        """
+        if config is None:
+            config = self.getDefaultConfiguration()
+        return MeasurementStream(self, config, calibration=calibration, state_data=stateData, histograms=histograms,
+                                 queue_size=queue_size, policy=policy, timeout=timeout, max_timeouts=max_timeouts)
 
     def isDiagnosticInterrupt(self)->bool:
         """
@@ -839,6 +1373,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         return self.readIntStatus() & self.TMF8X0X_APP_INTERRUPT_RESULTS
 
 
+    @instrumented("enableAndStart")
     def enableAndStart(self)->Tmf8x0xDevice.Status:
         """Convenience function that enables the device, optionally downloads a RAM (patch) application, and starts the application.
 
@@ -848,11 +1383,122 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self.enable()
         if self.hex_file:
             #self.uploadInitForEncryptedDevices() # only for encrypted devices.
-            self.downloadHexFile(self.hex_file)
+            self.downloadHexFile(self.hex_file, skip_if_loaded=self.skipLoadedPatch, verify=self.verifyPatch)
             return self.startRamApp()
         else:
             return self.startRomApp()
     
+    def _powerUp(self, i2c_ready:float, timeout:float)->Tmf8x0xDevice.Status:
+        """Set the enable pin and poll the ENABLE register until the bootloader sleeps (0x00) or the CPU is already awake."""
+        self.com.gpioSet(self._enablePin(), self._enablePin())
+        time.sleep(i2c_ready)          # the device does not acknowledge I2C before
+        def standby():
+            enable = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_ENABLE], 1)
+            return len(enable) == 1 and enable[0] in (0, self.TMF8X0X_ENABLE__app_ready__MASK)   # not 0xff: no acknowledge
+        if self.poller.poll("bootloader_sleep", standby, timeout):
+            return self.Status.OK
+        self._setError("The device did not respond within {} seconds after the enable pin was set".format(i2c_ready + timeout))
+        return self.Status.TIMEOUT_ERROR
+
+    def _wakeUp(self, timeout:float)->Tmf8x0xDevice.Status:
+        """Set PON=1 and poll the ENABLE register until the CPU is ready."""
+        self.com.i2cTx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_ENABLE, self.TMF8X0X_ENABLE__wakeup__MASK])
+        def ready():
+            enable = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_ENABLE], 1)
+            return len(enable) == 1 and enable[0] == self.TMF8X0X_ENABLE__app_ready__MASK
+        if self.poller.poll("cpu_ready", ready, timeout):
+            return self.Status.OK
+        self._setError("The device did not become ready within {} seconds after PON=1".format(timeout))
+        return self.Status.TIMEOUT_ERROR
+
+    @instrumented("warmEnable")
+    def warmEnable(self, i2c_ready:float=0.0016, timeout:float=0.01)->Tmf8x0xDevice.Status:
+        """Enable the device like enable(), but poll the ENABLE register for readiness instead of fixed sleeps (datasheet power-up flow).
+
+        Args:
+            i2c_ready (float, optional): Time from the enable pin until the device acknowledges I2C. Defaults to 0.0016 seconds.
+            timeout (float, optional): How long to poll for the bootloader and for cpu_ready. Defaults to 0.01 seconds.
+
+        Returns:
+            Tmf8x0xDevice.Status: Tmf8x0xDevice.Status.OK if the CPU is ready
+        """
+        status = self._powerUp(i2c_ready, timeout)
+        if status == self.Status.OK:
+            status = self._wakeUp(timeout)
+        return status
+
+    @contextlib.contextmanager
+    def _wakePhase(self, phase:str):
+        """Account the time and (with instrumentation on) the I2C transactions of a block to a phase of warmWakeMeasure."""
+        start = time.perf_counter()
+        try:
+            with instrumentTag(self._instrumentation, phase):
+                yield
+        finally:
+            self.wakeStatistics[phase].record(time.perf_counter() - start)
+
+    @instrumented("warmWakeMeasure")
+    def warmWakeMeasure(self, prepared:PreparedMeasurement, stateData:tmf8806StateData=None, i2c_ready:float=0.0016,
+                        timeout:float=1.0)->Tuple[Tmf8x0xDevice.Status,tmf8806DistanceResultFrame,tmf8806StateData]:
+        """One duty cycle of a hibernating sensor: enable the device (polling for readiness), start the application,
+        start a single measurement with calibration and state data, read the result and disable the device again.
+        The time of every phase is recorded in wakeStatistics.
+
+        Args:
+            prepared (PreparedMeasurement): measurement configuration and calibration from prepareMeasurement, usually single shot
+            stateData (tmf8806StateData, optional): state data of the previous cycle. Defaults to None (first cycle).
+            i2c_ready (float, optional): Time from the enable pin until the device acknowledges I2C. Defaults to 0.0016 seconds.
+            timeout (float, optional): How long to wait for the measurement result. Defaults to 1.0 seconds.
+
+        Returns:
+            Tuple[Tmf8x0xDevice.Status,tmf8806DistanceResultFrame,tmf8806StateData]: status, result frame and the state data
+            for the next cycle. On error the result frame is None and the given state data is returned.
+        """
+        start = time.perf_counter()
+        result = None
+        try:
+            with self._wakePhase("enable"):
+                status = self._powerUp(i2c_ready, timeout=0.01)
+            if status == self.Status.OK:
+                with self._wakePhase("cpu_ready"):
+                    status = self._wakeUp(timeout=0.01)
+            if status == self.Status.OK:
+                with self._wakePhase("app_start"):
+                    if self.hex_file:
+                        self.downloadHexFile(self.hex_file, skip_if_loaded=self.skipLoadedPatch, verify=self.verifyPatch)
+                        status = self.startRamApp()
+                    else:
+                        status = self.startRomApp()
+            if status == self.Status.OK:
+                with self._wakePhase("measure"):
+                    status = self.measurePrepared(prepared, stateData, timeout=timeout)
+            if status == self.Status.OK:
+                with self._wakePhase("result"):
+                    result = self.readResultFrameInt(timeout=timeout)
+                if result is None:
+                    status = self.Status.TIMEOUT_ERROR
+                else:
+                    stateData = tmf8806StateData.from_buffer_copy(result.stateData)
+        finally:
+            with self._wakePhase("disable"):
+                self.disable()
+            self.wakeStatistics["total"].record(time.perf_counter() - start)
+        return status, result, stateData
+
+    def getWakeStatistics(self)->Dict[str,dict]:
+        """Get the time distribution per phase of all warmWakeMeasure cycles so far.
+
+        Returns:
+            Dict[str,dict]: latency summary per phase (see WAKE_PHASES), in microseconds
+        """
+        return { phase: histogram.toDict() for phase, histogram in self.wakeStatistics.items() }
+
+    def resetWakeStatistics(self):
+        """Erase the warmWakeMeasure phase statistics."""
+        for histogram in self.wakeStatistics.values():
+            histogram.reset()
+
+    @instrumented("readSerialNumber")
     def readSerialNumber(self,timeout:float=0.5)->Tuple[Tmf8x0xDevice.Status,List[int]]:
         """retrieve the device serial number
 
@@ -875,6 +1521,7 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self._log(f"Serial number {regs[0]:02X} {regs[1]:02X} {regs[2]:02X} {regs[3]:02X}")
         return self.Status.OK, [ regs[0], regs[1], regs[2], regs[3] ]
 
+    @instrumented("changeI2Caddress")
     def changeI2Caddress(self,address:int=Tmf8x0xDevice.I2C_SLAVE_ADDR,mask:int=0,value:int=0,timeout:float=0.5)->Tmf8x0xDevice.Status:
         """Change the I2C slave address of the TOF sensor. The I2C address change is executed only if
           (mask_gpio1 & GPIO1) << 1 + (mask_gpio0 & GPIO0) == value_gpio1 << 1 + value_gpio0
@@ -995,87 +1642,193 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         frame.append(checksum)
 
 
+    @staticmethod
+    def _bootloaderFrame(cmd:int, payload:List[int] = []) -> bytes:
+        """Build the complete I2C write frame of a bootloader command.
+
+        Args:
+            cmd (int): The bootloader command byte
+            payload (List[int]): The payload data for the command. (not including length and checksum)
+        Returns:
+            bytes: command register address, command, payload len, payload, and checksum
+        """
+        frame = [Tmf8x0xApp.TMF8X0X_COM_CMD_STAT, cmd, len(payload)] + list(payload)
+        Tmf8x0xApp._appendChecksumToFrame(frame)
+        return bytes(frame)
+
+    @staticmethod
+    def _iterDownloadFrames(segments:List[Segment], chunk_size:int) -> Iterator[bytes]:
+        """Build the bootloader frames that download the segments one by one: for each segment one address
+           command followed by RAM write commands of at most chunk_size bytes.
+
+        Args:
+            segments (List[Segment]): The start addresses and data of the segments.
+            chunk_size (int): The maximum number of data bytes per RAM write command.
+        Returns:
+            Iterator[bytes]: The I2C write frames in download order.
+        """
+        for target_address, data in segments:
+            # 16-bit RAM address in little endian format
+            yield Tmf8x0xApp._bootloaderFrame(Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_addr_ram, [target_address & 0xff, (target_address >> 8) & 0xff])
+            for data_idx in range(0, len(data), chunk_size):
+                yield Tmf8x0xApp._bootloaderFrame(Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram, data[data_idx: data_idx + chunk_size])
+
+    @staticmethod
+    def _buildDownloadFrames(segments:List[Segment], chunk_size:int) -> List[bytes]:
+        """Build all bootloader frames that download the segments, see _iterDownloadFrames.
+
+        Args:
+            segments (List[Segment]): The start addresses and data of the segments.
+            chunk_size (int): The maximum number of data bytes per RAM write command.
+        Returns:
+            List[bytes]: The I2C write frames in download order.
+        """
+        return list(Tmf8x0xApp._iterDownloadFrames(segments, chunk_size))
+
     def _bootloaderSendCommand(self, cmd:int, payload:List[int] = [], response_payload_len: int = 0, timeout:float=0.02):
         """Send a command with payload, and read back response_payload_len bytes.
            Args:
                 cmd : The bootloader command byte
                 payload (List[int]): The payload data for the command. (not including length and checksum)
         """
+        return self._bootloaderSendFrame(self._bootloaderFrame(cmd, payload), response_payload_len, timeout)
+
+    def _bootloaderSendFrame(self, write_frame:bytes, response_payload_len: int = 0, timeout:float=0.02):
+        """Send a pre-built bootloader frame, and read back response_payload_len bytes.
+           Args:
+                write_frame (bytes): The complete frame, see _bootloaderFrame.
+                response_payload_len (int): The expected response payload length.
+                timeout (float): How long to wait for the response.
+        """
+        self.com.i2cTx(self.I2C_SLAVE_ADDR, write_frame)
+        return self._bootloaderReadResponse(write_frame, response_payload_len, timeout)
 
-        # The write frame consists of a command register address, command, payload len, payload, and crc
-        write_frame = [self.TMF8X0X_COM_CMD_STAT, cmd, len(payload)] + payload
+    def _bootloaderReadResponse(self, write_frame:bytes, response_payload_len: int = 0, timeout:float=0.02):
+        """Poll for the response to a bootloader frame that has been sent, and read back response_payload_len bytes.
+           The completion times of all reads are kept for the download statistics, the last one is the read that got the response.
+           Args:
+                write_frame (bytes): The frame that was sent.
+                response_payload_len (int): The expected response payload length.
+                timeout (float): How long to wait for the response.
+        """
+        cmd = write_frame[1]
         # The read frame is the command register address
         read_frame = [self.TMF8X0X_COM_CMD_STAT]
-        self._appendChecksumToFrame(write_frame)
-        self.com.i2cTx(self.I2C_SLAVE_ADDR, write_frame)
+        reads = []
 
-        max_time = time.time() + timeout
-        while True:
+        def responseReady():
             # read back status + payload_len + payload + crc
             response = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, read_frame, 3 + response_payload_len)
-            if len(response) != self.TMF8X0X_COM_CMD_STAT__bl_header + response_payload_len:
-                self._setError("The application did not accept frame {}. Response is {}.".format(write_frame, response))
-                return self.Status.APP_ERROR, []
-            if response[0] != cmd:
-                #response is ready, check if the frame is okay.
-                cmd_status = response[0]
-                actual_payload_len = response[1]
-                payload = response[1:-1]
-                checksum = response[-1]
-
-                # Collect errors, and report at once.
-                error = ""
-                if cmd_status != self.TMF8X0X_COM_CMD_STAT__stat_ok:
-                    error += "The bootloader returned cmd_status {}.".format(cmd_status)
-                if actual_payload_len != response_payload_len:
-                    error += "The bootloader payload response length should be {}, is {}.".format(actual_payload_len, response_payload_len)
-                if self._computeBootloaderChecksum(payload) != checksum:
-                    error += "The checksum {} does not match to the frame content.".format(checksum)
-
-                if error:
-                    self._setError("{}\n Write Frame: {}, Read Frame: {}, Response {}.".format(error, write_frame, read_frame, response))
-                    return self.Status.APP_ERROR, bytearray()
-                else:
-                    #every check passed, return payload data.
-                    return self.Status.OK, payload
-            if ( time.time() > max_time):
-                break
-        #Timed out
-        self._setError("The bootloader frame {} timed out after {}s.".format(write_frame, timeout))
-        return self.Status.TIMEOUT_ERROR, []
-
-
-    def _bootLoaderDownloadData(self, target_address: int, data: bytearray,  timeout: float = 0.02) -> Tmf8x0xDevice.Status:
+            reads.append(time.perf_counter())
+            if len(response) != self.TMF8X0X_COM_CMD_STAT__bl_header + response_payload_len or response[0] != cmd:
+                return ( response, )    # wrapped, an empty response is a result too
+            return None
+        ready = self.poller.poll(self.BL_COMMAND_NAMES.get(cmd, "bl_cmd_0x{:02x}".format(cmd)), responseReady, timeout)
+        if ready is None:
+            #Timed out
+            self._setError("The bootloader frame {} timed out after {}s.".format(list(write_frame), timeout))
+            return self.Status.TIMEOUT_ERROR, []
+        self._bootloaderReadTimes = reads
+        response = ready[0]
+        if len(response) != self.TMF8X0X_COM_CMD_STAT__bl_header + response_payload_len:
+            self._setError("The application did not accept frame {}. Response is {}.".format(list(write_frame), response))
+            return self.Status.APP_ERROR, []
+
+        #response is ready, check if the frame is okay.
+        cmd_status = response[0]
+        actual_payload_len = response[1]
+        payload = response[1:-1]
+        checksum = response[-1]
+
+        # Collect errors, and report at once.
+        error = ""
+        if cmd_status != self.TMF8X0X_COM_CMD_STAT__stat_ok:
+            error += "The bootloader returned cmd_status {}.".format(cmd_status)
+        if actual_payload_len != response_payload_len:
+            error += "The bootloader payload response length should be {}, is {}.".format(actual_payload_len, response_payload_len)
+        if self._computeBootloaderChecksum(payload) != checksum:
+            error += "The checksum {} does not match to the frame content.".format(checksum)
+
+        if error:
+            self._setError("{}\n Write Frame: {}, Read Frame: {}, Response {}.".format(error, list(write_frame), read_frame, response))
+            return self.Status.APP_ERROR, bytearray()
+        #every check passed, return payload data.
+        return self.Status.OK, response[2:-1]
+
+
+    def _bootLoaderDownloadData(self, target_address: int, data: bytearray,  timeout: float = 0.02, chunk_size:int = TMF8X0X_BL_MAX_DATA_SIZE) -> Tmf8x0xDevice.Status:
         """Load a data chunk to the target at a specific address.
 
         Args:
             target_address (int): The address on the target.
             data (bytearray): The data to be written onto the target.
             timeout: abort if command is not executed successfully within this timeframe
+            chunk_size (int): The maximum number of bytes per RAM write command. Defaults to TMF8X0X_BL_MAX_DATA_SIZE.
         Returns:
             Status: The status code (OK = 0, error != 0).
         """
-        # 16-bit RAM address in little endian format
-        target_address_bytes = [target_address & 0xff, (target_address >> 8) & 0xff]
-        #First, send the target RAM address (little endian)
-        status, _ = self._bootloaderSendCommand(self.TMF8X0X_COM_CMD_STAT__bl_cmd_addr_ram, target_address_bytes, 0, timeout)
-        if status != self.Status.OK:
-            self._setError("Setting RAM address {} failed.".format(target_address))
-            return status
+        # the frames are built one by one, while the bootloader processes the previous one
+        return self._bootloaderSendFrames(self._iterDownloadFrames([(target_address, bytes(data))], chunk_size), timeout)
 
-        #Set the maximum chunk size that can be transferred at once.
-        max_chunk_len = self.TMF8X0X_BL_MAX_DATA_SIZE
-        # Split the big bytearray into smaller chunks that can be transferred with single I2C bulk writes.
-        for data_idx in range(0,len(data), max_chunk_len):
-            payload_data = data[data_idx: data_idx + max_chunk_len]
-            self._log("Loading address 0x{:x} chunk with {} bytes.".format(target_address + data_idx, len(payload_data)))
-            # Write the payload of one chunk
-            status, _ = self._bootloaderSendCommand(self.TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram, list(payload_data), 0, timeout)
-            if status != self.Status.OK:
-                self._setError("Writing RAM chunk {} failed.".format(payload_data))
-                return status
+    def _bootloaderSendFrames(self, frames:Iterable[bytes], timeout:float = 0.02) -> Tmf8x0xDevice.Status:
+        """Download engine: send bootloader frames back-to-back. After a frame is sent, the next frame is fetched
+           (only a generator like _iterDownloadFrames builds it here, a cached image just hands it out), then the status is polled.
+           The first poll of a RAM write is delayed by downloadPollDelay. If that is None, the delay is learned:
+           when the first poll saw the acknowledge, the delay shrinks by POLL_DELAY_PROBE, when it did not, the delay grows to
+           the time of the last poll that missed the acknowledge. The learned delay is kept for the next download.
+           The statistics are stored in lastDownloadStatistics.
+
+        Args:
+            frames (Iterable[bytes]): The complete I2C write frames.
+            timeout (float): The timeout for the device to respond on a frame.
+        Returns:
+            Status: The status code (OK = 0, error != 0).
+        """
+        stats = DownloadStatistics()
+        learn = self.downloadPollDelay is None
+        if not learn:
+            delay = self.downloadPollDelay
+        elif self._learnedPollDelay is not None:
+            delay = self._learnedPollDelay
+        else:
+            delay = 0.0                         # nothing measured yet, poll right away
+        stats.pollDelay = delay
+        start = time.perf_counter()
+        frames = iter(frames)
+        frame = next(frames, None)
+        try:
+            while frame is not None:
+                with instrumentTag(self._instrumentation, self.BL_COMMAND_NAMES.get(frame[1], "bl_frame")):
+                    self.com.i2cTx(self.I2C_SLAVE_ADDR, frame)
+                    sent = time.perf_counter()
+                    next_frame = next(frames, None)
+                    if frame[1] == self.TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram:
+                        pause = delay - (time.perf_counter() - sent)
+                        if pause > 0:
+                            time.sleep(pause)           # an earlier poll cannot see the acknowledge, it only costs a bus round trip
+                    status, _ = self._bootloaderReadResponse(frame, 0, timeout)
+                    if status != self.Status.OK:
+                        self._setError("Writing bootloader frame {} failed.".format(list(frame)))
+                        return status
+                    reads = self._bootloaderReadTimes
+                    stats.frames += 1
+                    stats.polls += len(reads)
+                    if frame[1] == self.TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram:
+                        stats.bytes += frame[2]
+                        stats.recordAck(reads[-1] - sent, missed=len(reads) > 1)
+                        if learn:
+                            # a missed poll bounds the acknowledge time from below, a hit only from above: probe downwards
+                            delay = max(delay, reads[-2] - sent) if len(reads) > 1 else delay * self.POLL_DELAY_PROBE
+                frame = next_frame
+        finally:
+            stats.seconds = time.perf_counter() - start
+            stats.learnedPollDelay = delay
+            self.lastDownloadStatistics = stats
+        if learn:
+            self._learnedPollDelay = delay
         return self.Status.OK
-    
+
+    @instrumented("uploadInitForEncryptedDevices")
     def uploadInitForEncryptedDevices( self, timeout:float = 0.020 ) ->Tmf8x0xDevice.Status:
         # Write the download init command, has a single parameter the Seed = 0x29
         status, _ = self._bootloaderSendCommand(self.TMF8X0X_COM_CMD_STAT__bl_cmd_upload_init,[0x29], 0, timeout)
@@ -1085,38 +1838,113 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         return self.Status.OK
         
         
-    def downloadHexFile(self, hex_file: str = DEFAULT_PATCH_FILE_UNENCRYPTED, timeout:float = 0.020) ->Tmf8x0xDevice.Status:
+    @instrumented("readRamCrc")
+    def readRamCrc(self, address:int, size:int, timeout:float = 0.020) -> Tuple[Tmf8x0xDevice.Status,int]:
+        """Let the bootloader compute the CRC-32 of a RAM area.
+           The area is selected with an address command, the crc command gets the 16-bit size (little endian)
+           and responds with the 32-bit CRC (little endian).
+           Experimental: this framing and the zlib CRC-32 are assumed, they are not taken from the bootloader
+           specification. The emulator implements the same assumption, only the hardware test
+           test_tmf8x0x_app.py::test_ram_crc checks it against a device.
+
+        Args:
+            address (int): The start address of the area.
+            size (int): The number of bytes.
+            timeout (float, optional): The timeout for the device to respond on a command. Defaults to 20ms.
+
+        Returns:
+            Tuple[Tmf8x0xDevice.Status,int]: The status code (OK = 0, error != 0) and the CRC.
+        """
+        status, _ = self._bootloaderSendCommand(self.TMF8X0X_COM_CMD_STAT__bl_cmd_addr_ram, [address & 0xff, (address >> 8) & 0xff], 0, timeout)
+        if status != self.Status.OK:
+            return status, 0
+        status, crc = self._bootloaderSendCommand(self.TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram, [size & 0xff, (size >> 8) & 0xff], 4, timeout)
+        if status != self.Status.OK:
+            return status, 0
+        return self.Status.OK, int.from_bytes(bytes(crc), "little")
+
+    def _compareRamCrcs(self, image:FirmwareImage, timeout:float) -> bool:
+        """Compare the RAM CRC of every segment of the image with the CRC computed on the host.
+           A failing or timed out CRC command does not raise and is not kept in the error list, it is logged
+           and counts as mismatch, so that the caller falls back to a download.
+
+        Args:
+            image (FirmwareImage): The image.
+            timeout (float): The timeout for the device to respond on a command.
+
+        Returns:
+            bool: True if all segments match.
+        """
+        errors = len(self.com.errors)
+        level, self._exception_level = self._exception_level, self.ExceptionLevel.OFF
+        try:
+            for (address, data), expected in zip(image.segments, image.crcs):
+                status, crc = self.readRamCrc(address, len(data), timeout)
+                if status != self.Status.OK:
+                    self._log("RAM CRC of segment 0x{:x} failed ({})".format(address, status))
+                    return False
+                if crc != expected:
+                    self._log("RAM CRC of segment 0x{:x} is 0x{:08x}, expected 0x{:08x}".format(address, crc, expected))
+                    return False
+            return True
+        finally:
+            self._exception_level = level
+            for message in self.com.errors[errors:]:
+                self._log(message)
+            del self.com.errors[errors:]
+
+    @instrumented("downloadHexFile")
+    def downloadHexFile(self, hex_file: str = DEFAULT_PATCH_FILE_UNENCRYPTED, timeout:float = 0.020, skip_if_loaded:bool = False, verify:bool = False, chunk_size:int = None) ->Tmf8x0xDevice.Status:
         """Download a application/patch hex file to the device.
            To run the application, call
 
+        The hex file is parsed and framed only once, later downloads of the same file content
+        re-use the frames from the firmware cache.
+
         Args:
             hex_file (str): The firmware/patch to load. Defaults to the encrypted patch file.
             timeout (float, optional): The timeout for the device to respond on a command. Defaults to 20ms.
+            skip_if_loaded (bool, optional): Compare the RAM CRC of every segment first, and do not download if all match
+                (e.g. RAM was retained while the device was disabled). Defaults to False.
+            verify (bool, optional): Compare the RAM CRC of every segment after the download. Defaults to False.
+            chunk_size (int, optional): Number of bytes per RAM write command, 1 .. TMF8X0X_BL_MAX_DATA_SIZE. Defaults to downloadChunkSize.
 
         Returns:
             Status: The status code (OK = 0, error != 0).
         """
-        segments = []
+        if chunk_size is None:
+            chunk_size = self.downloadChunkSize
+        if not 0 < chunk_size <= self.TMF8X0X_BL_MAX_DATA_SIZE:
+            self._setError("The chunk size {} is not in the range 1 .. {}.".format(chunk_size, self.TMF8X0X_BL_MAX_DATA_SIZE))
+            return self.Status.OTHER_ERROR
         try:
-            intel_hex = IntelHex()
-            intel_hex.fromfile(hex_file, format='hex')
-            # Load the segments.
-            segments = intel_hex.segments()
-            if len(segments) != 1:
-                self._log("Warning - Expecting only 1 segment, but found {}".format(len(segments)))
+            image = self.firmwareCache.load(hex_file, chunk_size, self._buildDownloadFrames)
+            if len(image.segments) != 1:
+                self._log("Warning - Expecting only 1 segment, but found {}".format(len(image.segments)))
         except Exception as e:
             self._setError("Error with hex file {}: {}".format(hex_file, str(e)))
             return self.Status.OTHER_ERROR
 
-        for start_segment, end_segment in segments:
-            self._log("Loading SYS image segment start: {:x}, end: {:x}".format(start_segment, end_segment))
-            status = self._bootLoaderDownloadData(start_segment, intel_hex.tobinarray(start= start_segment, size= end_segment - start_segment), timeout=timeout)
-            if status != self.Status.OK:
-                return status
+        self.lastDownloadSkipped = False
+        if skip_if_loaded and self._compareRamCrcs(image, timeout):
+            self._log("Patch {} is already loaded, download skipped".format(hex_file))
+            self.lastDownloadSkipped = True
+            return self.Status.OK
+
+        for start_segment, data in image.segments:
+            self._log("Loading SYS image segment start: {:x}, end: {:x}".format(start_segment, start_segment + len(data)))
+        status = self._bootloaderSendFrames(image.frames, timeout)
+        if status != self.Status.OK:
+            return status
+        self._log("Downloaded {} bytes in {:.4f}s ({:.0f} bytes/s)".format(self.lastDownloadStatistics.bytes, self.lastDownloadStatistics.seconds, self.lastDownloadStatistics.bytesPerSecond))
 
+        if verify and not self._compareRamCrcs(image, timeout):
+            self._setError("RAM CRC check after download of {} failed.".format(hex_file))
+            return self.Status.DEV_ERROR
         return self.Status.OK
 
 
+    @instrumented("startRamApp")
     def startRamApp(self, timeout: float = 20e-3) -> Tmf8x0xDevice.Status:
         """Start the RAM application from the bootloader.
 
@@ -1130,14 +1958,12 @@ class Tmf8x0xApp(Tmf8x0xDevice):
         self._appendChecksumToFrame(ram_remap_cmd)
         self.com.i2cTx(self.I2C_SLAVE_ADDR, ram_remap_cmd)
 
-        max_time = time.time() + timeout
-        while True:
-            if self.isAppRunning() == True:
-                return self.Status.OK
-            if time.time() > max_time:
-                self._setError("The application did not start within {} seconds".format(timeout))
-                return self.Status.TIMEOUT_ERROR
+        if self.poller.poll("start_ram_app", self.isAppRunning, timeout):
+            return self.Status.OK
+        self._setError("The application did not start within {} seconds".format(timeout))
+        return self.Status.TIMEOUT_ERROR
 
+    @instrumented("startRomApp")
     def startRomApp(self, timeout= 20e-3) -> Tmf8x0xDevice.Status:
         """Start the ROM application from the bootloader.
 
@@ -1148,12 +1974,10 @@ class Tmf8x0xApp(Tmf8x0xDevice):
             Status: The status code (OK = 0, error != 0).
         """
         self.com.i2cTx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_COM_REQ_APP_ID, self.TMF8X0X_COM_APP_ID__application])
-        max_time = time.time() + timeout
-        while not self.isAppRunning():
-            if time.time() > max_time: 
-                self._setError("The application did not start within {} seconds".format(timeout))
-                return self.Status.TIMEOUT_ERROR
-        return self.Status.OK
+        if self.poller.poll("start_rom_app", self.isAppRunning, timeout):
+            return self.Status.OK
+        self._setError("The application did not start within {} seconds".format(timeout))
+        return self.Status.TIMEOUT_ERROR
 
 if __name__ == "__main__":
     print("Only for inclusion in example programs. No example code here.")
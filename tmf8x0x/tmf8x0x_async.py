@@ -0,0 +1,186 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+asyncio front-end of the TMF8x0x application. The blocking I2C calls run on one executor thread per adapter,
+the waits for interrupts yield to the event loop between two polls.
+"""
+
+import __init__
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+import weakref
+from typing import Callable, Tuple
+from aos_com.ic_com import IcCom
+
+# local imports
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp, HistogramsAndResult
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_instrument import IcComProxy
+from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd, tmf8806FactoryCalibData, tmf8806DistanceResultFrame, tmf8806StateData
+
+_executors = weakref.WeakKeyDictionary()
+_executorsLock = threading.Lock()
+
+def executorFor(com:IcCom)->concurrent.futures.ThreadPoolExecutor:
+    """Get the executor of an adapter. All devices on one adapter share a single thread, so their bus accesses
+       never overlap, while devices on different adapters run in parallel.
+
+    Args:
+        com (IcCom): the adapter, wrappers like InstrumentedIcCom are resolved to the adapter they wrap
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: the executor with one worker thread
+    """
+    while isinstance(com, IcComProxy):
+        com = com.com
+    with _executorsLock:
+        executor = _executors.get(com)
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="tmf8x0x-i2c")
+            _executors[com] = executor
+        return executor
+
+class AsyncTmf8x0xApp:
+    """Awaitable version of the Tmf8x0xApp functions, e.g.:
+
+        tof = AsyncTmf8x0xApp(Tmf8x0xApp(ic_com=com))
+        await tof.run(tof.app.open)
+        await tof.enableAndStart()
+        await tof.measure(config)
+        result = await tof.readResultFrameInt()
+
+       While a coroutine of this object runs, the application must not call the blocking Tmf8x0xApp functions of the same device.
+    """
+
+    def __init__(self, app:Tmf8x0xApp, executor:concurrent.futures.Executor=None, poll_interval:float=0.0005):
+        """Wrap an application.
+
+        Args:
+            app (Tmf8x0xApp): The blocking application.
+            executor (concurrent.futures.Executor, optional): Executor for the I2C calls. Defaults to the executor of the adapter of app.
+            poll_interval (float, optional): Time in seconds the event loop gets between two interrupt polls. Defaults to 0.0005.
+        """
+        self.app = app
+        self.executor = executor if executor is not None else executorFor(app.com)
+        self.poll_interval = poll_interval
+
+    async def run(self, function:Callable, *args, **kwargs):
+        """Run a blocking function on the executor of this device.
+
+        Args:
+            function (Callable): the function, usually a Tmf8x0xApp method
+
+        Returns:
+            the return value of function
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def _waitForInterrupt(self, mask:int, timeout:float, clear:bool=True)->int:
+        """Wait until at least one bit of mask is pending. Same as WaitStrategy.waitForInterrupt, but the loop runs other tasks between the polls.
+
+        Args:
+            mask (int): The interrupt bits to wait for.
+            timeout (float): Maximum time to wait in seconds.
+            clear (bool, optional): If True, clear the pending bits. Defaults to True.
+
+        Returns:
+            int: the pending bits of mask, 0 on timeout
+        """
+        app = self.app
+        strategy = app.waitStrategy
+        strategy.transactions = 0
+        strategy.gpioReads = 0
+        maxTime = time.monotonic() + timeout
+        while True:
+            bits = await self.run(strategy.pollOnce, app, mask, clear)
+            if bits:
+                return bits
+            if time.monotonic() > maxTime:
+                # last chance, the interrupt might be pending without being enabled for the pin
+                return await self.run(strategy._readAndClear, app, mask, clear)
+            await asyncio.sleep(self.poll_interval)
+
+    async def enableAndStart(self, **kwargs)->Tmf8x0xDevice.Status:
+        """Same as Tmf8x0xApp.enableAndStart, the keyword arguments are passed on."""
+        return await self.run(self.app.enableAndStart, **kwargs)
+
+    async def measure(self, config:tmf8806MeasureCmd, calibration:tmf8806FactoryCalibData=None, stateData:tmf8806StateData=None,
+                      timeout:float=1.0)->Tmf8x0xDevice.Status:
+        """Same as Tmf8x0xApp.measure."""
+        return await self.run(self.app.measure, config, calibration=calibration, stateData=stateData, timeout=timeout)
+
+    async def stop(self)->Tmf8x0xDevice.Status:
+        """Same as Tmf8x0xApp.stop."""
+        return await self.run(self.app.stop)
+
+    async def readResultFrameInt(self, timeout:float=1.0)->tmf8806DistanceResultFrame:
+        """Wait for the result interrupt and read the result frame, see Tmf8x0xApp.readResultFrameInt.
+
+        Args:
+            timeout (float, optional): How long to wait for an interrupt to occur. Defaults to 1.0 seconds
+
+        Returns:
+            tmf8806DistanceResultFrame: result frame or None
+        """
+        interrupt = await self._waitForInterrupt(self.app.TMF8X0X_APP_INTERRUPT_RESULTS, timeout)
+        return await self.run(self.app._resultFrameStep, interrupt)
+
+    async def readHistogramsAndResult(self, timeout:float=10.0, hr:HistogramsAndResult=None)->Tuple[Tmf8x0xDevice.Status,HistogramsAndResult]:
+        """Read all available histograms until a result frame arrives, see Tmf8x0xApp.readHistogramsAndResult.
+
+        Args:
+            timeout (float, optional): Maximum time to retrieve all histograms and a result frame. Defaults to 10.0.
+            hr (HistogramsAndResult, optional): Object to reuse, its histogram blocks are overwritten. Defaults to None (a new object).
+
+        Returns:
+            Tmf8x0xDevice.Status, HistogramsAndResult: status, histograms and result object
+        """
+        app = self.app
+        if hr is None:
+            hr = HistogramsAndResult()
+        else:
+            hr.clear()
+        out = time.time() + timeout
+        while True:
+            if time.time() > out:
+                return app.Status.TIMEOUT_ERROR, hr
+            # only read INT status here once, the histogram readout clears the diagnostic interrupt
+            interrupt = await self._waitForInterrupt(app.TMF8X0X_APP_INTERRUPT_RESULTS | app.TMF8X0X_APP_INTERRUPT_DIAG,
+                                                     max(0.0, out - time.time()), clear=False)
+            status = await self.run(app._histogramsAndResultStep, hr, interrupt, timeout)
+            if status is not None:
+                return status, hr
+
+    async def factoryCalibration(self, config:tmf8806MeasureCmd=None, kilo_iters:int=40960, timeout:float=10.0)->Tmf8x0xDevice.Status:
+        """Execute a factory calibration, see Tmf8x0xApp.factoryCalibration. The loop keeps running during the calibration.
+
+        Args:
+            config (tmf8806MeasureCmd, optional): The measurement config with the settings for the calibration. Defaults to None.
+            kilo_iters (int, optional): The kilo-iterations for the factory calibration. Defaults to 40960.
+            timeout (float, optional): Maximum time to wait for factory calibration completion. Defaults to 10.0.
+
+        Returns:
+            Tmf8x0xDevice.Status: OK if the calibration finished, TIMEOUT_ERROR else
+        """
+        app = self.app
+        await self.run(app.measure, app._factoryCalibrationConfig(config, kilo_iters))
+        maxTime = time.time() + timeout
+        while True:
+            interrupt = await self._waitForInterrupt(app.TMF8X0X_APP_INTERRUPT_RESULTS, max(0.0, maxTime - time.time()))
+            if await self.run(app._calibrationStep, interrupt):
+                return app.Status.OK
+            if time.time() > maxTime:
+                return app.Status.TIMEOUT_ERROR
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
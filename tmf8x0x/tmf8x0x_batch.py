@@ -0,0 +1,105 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Write combining: register writes are queued and writes to consecutive registers are sent as one burst.
+"""
+
+import __init__
+from typing import Callable, List
+from aos_com.ic_com import IcCom
+
+# local imports
+from tmf8x0x.tmf8x0x_instrument import IcComProxy
+
+class WriteCombiningIcCom(IcComProxy):
+    """IcCom wrapper that queues i2cTx calls. A write that starts at the register after the end of the previous queued write
+       (same device) is appended to it, e.g. [0xE1, a] followed by [0xE2, b] becomes [0xE1, a, b].
+       Every other call (reads, GPIOs) sends the queued writes first, so the order on the bus is kept.
+       A queued write always returns I2C_OK, a write that fails when it is sent is reported to on_error.
+       Use it through Tmf8x0xDevice.batchWrites.
+    """
+
+    def __init__(self, com:IcCom, max_length:int=256, on_error:Callable[[str], None]=None):
+        """Start a batch.
+
+        Args:
+            com (IcCom): the communication object the writes are sent to
+            max_length (int, optional): Maximum number of bytes (including the register address) of a combined write. Defaults to 256.
+            on_error (Callable[[str], None], optional): Called with a message if a queued write fails when it is sent,
+                e.g. Tmf8x0xDevice._setError. Defaults to None (the message is appended to errors).
+        """
+        super().__init__(com)
+        self.max_length = max_length
+        self.on_error = on_error
+        self._pending:List[list] = []          # [devaddr, bytearray(register + data)]
+        self.queued:int = 0
+        """Number of writes queued."""
+        self.sent:int = 0
+        """Number of writes sent, queued - sent is the number of saved transactions."""
+
+    def flush(self)->int:
+        """Send the queued writes. A failing write is reported to on_error.
+
+        Returns:
+            int: I2C_OK, or the status of the first failing write
+        """
+        result = self.I2C_OK
+        failed = None
+        pending, self._pending = self._pending, []
+        for devaddr, data in pending:
+            status = self.com.i2cTx(devaddr, data)
+            self.sent += 1
+            if status != self.I2C_OK and result == self.I2C_OK:
+                result = status
+                failed = data
+        if result != self.I2C_OK:
+            message = "TMF8x0x.batchWrites: queued write to register 0x{:02X} failed ({})".format(failed[0], result)
+            if self.on_error is not None:
+                self.on_error(message)
+            else:
+                self.errors.append(message)
+        return result
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        self.queued += 1
+        if self._pending:
+            address, data = self._pending[-1]
+            if address == devaddr and data[0] + len(data) - 1 == tx[0] and len(data) + len(tx) - 1 <= self.max_length:
+                data += bytes(tx[1:])
+                return self.I2C_OK
+        self._pending.append([devaddr, bytearray(tx)])
+        return self.I2C_OK
+
+    def i2cRx(self, devaddr:int, rx_size:int) -> bytearray:
+        self.flush()
+        return self.com.i2cRx(devaddr, rx_size)
+
+    def i2cTxRx(self, devaddr:int, tx:list, rx_size:int) -> bytearray:
+        self.flush()
+        return self.com.i2cTxRx(devaddr, tx, rx_size)
+
+    def gpioGet(self, r_mask:int) -> int:
+        self.flush()
+        return self.com.gpioGet(r_mask)
+
+    def gpioSet(self, w_mask:int, value:int):
+        self.flush()
+        return self.com.gpioSet(w_mask, value)
+
+    def gpioSetDirection(self, out_mask:int, out_value:int):
+        self.flush()
+        return self.com.gpioSetDirection(out_mask, out_value)
+
+    def i2cClose(self) -> int:
+        self.flush()
+        return self.com.i2cClose()
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
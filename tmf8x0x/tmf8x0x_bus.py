@@ -0,0 +1,298 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Several TMF8x0x on one I2C bus: bring-up with unique addresses, and a scheduler that reads the results of all sensors
+over a single IcCom adapter.
+"""
+
+import __init__
+import time
+from typing import List, Tuple
+from aos_com.ic_com import IcCom
+
+# local imports
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.tmf8x0x_instrument import InstrumentedIcCom, instrumentTag
+from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd, tmf8806FactoryCalibData, tmf8806DistanceResultFrame
+
+class SensorStatistics:
+    """Counters of one sensor on the bus."""
+
+    def __init__(self):
+        self.results:int = 0
+        """Number of result frames read."""
+        self.polls:int = 0
+        """Number of INT_STATUS reads."""
+        self.emptyPolls:int = 0
+        """Number of INT_STATUS reads without a pending result."""
+        self.deviceDrops:int = 0
+        """Number of results the host missed, detected from gaps in resultNum."""
+
+class BusSensor:
+    """One sensor on the bus, with the scheduling state of the bus manager."""
+
+    def __init__(self, name:str, app:Tmf8x0xApp, address:int):
+        self.name = name
+        self.app = app
+        self.address = address
+        """The I2C address the sensor gets at bring-up."""
+        self.statistics = SensorStatistics()
+        self.period:float = None
+        """Estimated time between two results in seconds, learned from the result arrivals."""
+        self.nextDue:float = 0.0
+        """Time (time.monotonic) the sensor is polled next."""
+        self.lastServed:int = 0
+        """Sequence number of the last poll, the sensor waiting longest gets the bus first."""
+        self.lastResultTime:float = None
+        self.lastResultNum:int = None
+
+class Tmf8x0xBus:
+    """Manager of several TMF8x0x on one IcCom adapter. The sensors share the I2C bus and the interrupt line,
+       every sensor has its own enable pin. Example:
+
+        bus = Tmf8x0xBus(com, enable_pins=[0x2, 0x10, 0x20])
+        bus.open()
+        bus.bringUp()
+        bus.start(config)
+        for _ in range(100):
+            sensor, result = bus.read()
+        bus.stop()
+        print(bus.getStatistics())
+
+       Scheduling: a sensor is polled when its next result is expected, its result period is learned from the
+       arrivals. If several sensors are due, the one that waited longest gets the bus first (round robin), so
+       a fast sensor cannot starve the others and no bus time is spent polling sensors that cannot have a result.
+    """
+
+    DEFAULT_FIRST_ADDRESS = Tmf8x0xDevice.I2C_SLAVE_ADDR + 1
+
+    def __init__(self, com:IcCom, enable_pins:List[int], addresses:List[int]=None, hex_file:str="",
+                 exception_level:Tmf8x0xDevice.ExceptionLevel=Tmf8x0xDevice.ExceptionLevel.OFF,
+                 poll_interval:float=0.0002, early:float=0.8):
+        """Create the sensor objects, the sensors are not touched before bringUp.
+
+        Args:
+            com (IcCom): The adapter all sensors are connected to.
+            enable_pins (List[int]): GPIO mask of the enable pin of every sensor.
+            addresses (List[int], optional): Unique I2C address of every sensor. Defaults to consecutive addresses after the default address.
+            hex_file (str, optional): Patch to load into every sensor, empty to run the ROM application. Defaults to "".
+            exception_level (Tmf8x0xDevice.ExceptionLevel, optional): Exception level of the sensors. Defaults to ExceptionLevel.OFF.
+            poll_interval (float, optional): Time in seconds before a sensor that had no result is polled again. Defaults to 0.0002.
+            early (float, optional): A sensor is polled again after this fraction of its result period. Defaults to 0.8.
+        """
+        if addresses is None:
+            addresses = [ self.DEFAULT_FIRST_ADDRESS + i for i in range(len(enable_pins)) ]
+        if len(addresses) != len(enable_pins):
+            raise ValueError("one address per enable pin needed")
+        if len(set(addresses)) != len(addresses):
+            raise ValueError("the I2C addresses must be unique")
+        if any(not 0x08 <= address <= 0x77 for address in addresses):
+            raise ValueError("I2C addresses must be 0x08 .. 0x77")
+        if len(set(enable_pins)) != len(enable_pins):
+            raise ValueError("every sensor needs its own enable pin")
+        self.com = InstrumentedIcCom(com)
+        """All sensors talk through this wrapper, it accounts the bus traffic and bus time per sensor."""
+        self.poll_interval = poll_interval
+        self.early = early
+        self.sensors:List[BusSensor] = []
+        for index, (pin, address) in enumerate(zip(enable_pins, addresses)):
+            app = Tmf8x0xApp(ic_com=self.com, hex_file=hex_file, exception_level=exception_level, enable_pin=pin)
+            self.sensors.append(BusSensor("sensor{}".format(index), app, address))
+        self._sequence = 0
+        self._startTime:float = None
+        self._stopTime:float = None
+
+    def open(self, i2c_speed:int=1000000)->int:
+        """Open the adapter and configure the enable pins.
+
+        Returns:
+            int: the status of IcCom.i2cOpen
+        """
+        status = self.com.i2cOpen(i2c_speed=i2c_speed)
+        if status == self.com.I2C_OK:
+            for sensor in self.sensors:
+                self.com.gpioSetDirection(sensor.app.enable_pin, 0)
+        return status
+
+    def close(self):
+        """Power down all sensors and close the adapter."""
+        self.disable()
+        self.com.i2cClose()
+
+    def disable(self):
+        """Power down all sensors, they lose their I2C address."""
+        for sensor in self.sensors:
+            sensor.app.disable()
+
+    def bringUp(self)->Tmf8x0xDevice.Status:
+        """Power up the sensors one after the other, start the application and move each to its own address.
+           Only one sensor at a time is powered with the default address, so the address change reaches exactly that one.
+           A sensor that keeps the default address is brought up last.
+
+        Returns:
+            Tmf8x0xDevice.Status: OK if all sensors run at their address, else the status of the first failing sensor
+        """
+        self.disable()
+        default = Tmf8x0xDevice.I2C_SLAVE_ADDR
+        for sensor in sorted(self.sensors, key=lambda sensor: sensor.address == default):
+            with instrumentTag(self.com, sensor.name):
+                status = sensor.app.enableAndStart()
+                if status == Tmf8x0xDevice.Status.OK and sensor.address != default:
+                    status = sensor.app.changeI2Caddress(address=sensor.address)
+            if status != Tmf8x0xDevice.Status.OK:
+                sensor.app._log("Tmf8x0xBus: bring-up of {} failed ({})".format(sensor.name, status))
+                return status
+        return Tmf8x0xDevice.Status.OK
+
+    def start(self, config:tmf8806MeasureCmd=None, calibrations:List[tmf8806FactoryCalibData]=None,
+              configs:List[tmf8806MeasureCmd]=None)->Tmf8x0xDevice.Status:
+        """Start the measurement on all sensors and reset the statistics.
+
+        Args:
+            config (tmf8806MeasureCmd, optional): Configuration of all sensors. Defaults to the default configuration.
+            calibrations (List[tmf8806FactoryCalibData], optional): Factory calibration of every sensor. Defaults to None.
+            configs (List[tmf8806MeasureCmd], optional): Configuration of every sensor, replaces config. Defaults to None.
+
+        Returns:
+            Tmf8x0xDevice.Status: OK if all sensors started
+        """
+        self.resetStatistics()
+        result = Tmf8x0xDevice.Status.OK
+        now = time.monotonic()
+        for index, sensor in enumerate(self.sensors):
+            app = sensor.app
+            sensorConfig = configs[index] if configs else config
+            with instrumentTag(self.com, sensor.name):
+                status = app.measure(sensorConfig if sensorConfig else app.getDefaultConfiguration(),
+                                     calibration=calibrations[index] if calibrations else None)
+            if status != Tmf8x0xDevice.Status.OK:
+                result = status
+            sensor.period = None
+            sensor.nextDue = now
+            sensor.lastResultTime = None
+            sensor.lastResultNum = None
+        self._startTime = time.monotonic()
+        self._stopTime = None
+        return result
+
+    def stop(self)->Tmf8x0xDevice.Status:
+        """Stop the measurement on all sensors.
+
+        Returns:
+            Tmf8x0xDevice.Status: OK if all sensors stopped
+        """
+        result = Tmf8x0xDevice.Status.OK
+        for sensor in self.sensors:
+            with instrumentTag(self.com, sensor.name):
+                status = sensor.app.stop()
+            if status != Tmf8x0xDevice.Status.OK:
+                result = status
+        self._stopTime = time.monotonic()
+        return result
+
+    def _next(self, now:float)->BusSensor:
+        due = [ sensor for sensor in self.sensors if sensor.nextDue <= now ]
+        if due:
+            return min(due, key=lambda sensor: sensor.lastServed)
+        return min(self.sensors, key=lambda sensor: sensor.nextDue)
+
+    def _poll(self, sensor:BusSensor)->tmf8806DistanceResultFrame:
+        """Read the result of a sensor if one is pending, and update its schedule."""
+        app = sensor.app
+        with instrumentTag(self.com, sensor.name):
+            bits = app.readIntStatus() & app.TMF8X0X_APP_INTERRUPT_RESULTS
+            result = None
+            if bits:
+                app.clearIntStatus(bits)
+                result = app._readResultFrame()
+        now = time.monotonic()
+        self._sequence += 1
+        sensor.lastServed = self._sequence
+        sensor.statistics.polls += 1
+        if result is not None and result.resultNum == sensor.lastResultNum:
+            result = None                   # the next result arrived between clear and readout, and was read with the previous interrupt
+        if result is None:
+            sensor.statistics.emptyPolls += 1
+            sensor.nextDue = now + self.poll_interval
+            return None
+        if sensor.lastResultTime is not None:
+            interval = now - sensor.lastResultTime
+            sensor.period = interval if sensor.period is None else 0.875 * sensor.period + 0.125 * interval
+        if sensor.lastResultNum is not None:
+            sensor.statistics.deviceDrops += (result.resultNum - sensor.lastResultNum - 1) & 0xff
+        sensor.lastResultTime = now
+        sensor.lastResultNum = result.resultNum
+        sensor.statistics.results += 1
+        sensor.nextDue = now + (sensor.period * self.early if sensor.period else self.poll_interval)
+        return result
+
+    def read(self, timeout:float=1.0)->Tuple[BusSensor,tmf8806DistanceResultFrame]:
+        """Read the next result of any sensor.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to 1.0.
+
+        Returns:
+            Tuple[BusSensor,tmf8806DistanceResultFrame]: the sensor and its result, (None, None) on timeout
+        """
+        maxTime = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            sensor = self._next(now)
+            if sensor.nextDue > now:
+                if sensor.nextDue > maxTime:
+                    time.sleep(max(0.0, maxTime - now))
+                    return None, None
+                time.sleep(sensor.nextDue - now)
+            result = self._poll(sensor)
+            if result is not None:
+                return sensor, result
+            if time.monotonic() > maxTime:
+                return None, None
+
+    def resetStatistics(self):
+        """Erase the counters and the bus time of all sensors."""
+        for sensor in self.sensors:
+            sensor.statistics = SensorStatistics()
+        self.com.reset()
+        self._startTime = time.monotonic()
+        self._stopTime = None
+
+    def getStatistics(self)->dict:
+        """Throughput and bus usage since start or resetStatistics.
+
+        Returns:
+            dict: per sensor results/s, polls, missed results, transactions, bytes and bus time, plus the totals of the bus.
+                  busUtilization is the fraction of the wall time the adapter was busy with a transaction.
+        """
+        end = self._stopTime if self._stopTime is not None else time.monotonic()
+        wall = max(1e-9, end - self._startTime) if self._startTime is not None else 1e-9
+        traffic = self.com.statistics
+        sensors = {}
+        busSeconds = 0.0
+        results = 0
+        for sensor in self.sensors:
+            stats = traffic.get(sensor.name)
+            seconds = stats.latency.totalUs * 1e-6 if stats else 0.0
+            busSeconds += seconds
+            results += sensor.statistics.results
+            sensors[sensor.name] = { "address": sensor.address, "results": sensor.statistics.results,
+                                     "resultsPerSecond": sensor.statistics.results / wall,
+                                     "periodSeconds": sensor.period, "polls": sensor.statistics.polls,
+                                     "emptyPolls": sensor.statistics.emptyPolls, "deviceDrops": sensor.statistics.deviceDrops,
+                                     "transactions": stats.transactions if stats else 0,
+                                     "bytesWritten": stats.bytesWritten if stats else 0, "bytesRead": stats.bytesRead if stats else 0,
+                                     "busSeconds": seconds, "busShare": seconds / wall }
+        return { "wallSeconds": wall, "results": results, "resultsPerSecond": results / wall,
+                 "busSeconds": busSeconds, "busUtilization": busSeconds / wall, "sensors": sensors }
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,282 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Bulk reader for measurement CSV files in the format of the EVM GUI (see HistogramsAndResult.toCSV).
+The rows of every record tag are parsed in one go into NumPy arrays, large files are read in chunks,
+a directory of files in a process pool.
+"""
+
+import __init__
+import concurrent.futures
+import glob
+import itertools
+import os
+import warnings
+from typing import Dict, Iterable, Iterator, List
+import numpy
+
+# local imports
+from tmf8x0x.tmf8x0x_results import RESULT_FRAME_DTYPE, RESULT_FRAME_SIZE, decodeResultFrames
+
+HISTOGRAM_TAGS = ( "CI", "CO", "PT", "TG", "PTPUC", "TGPUC", "SUM" )
+"""Tags of the histogram rows, without the leading # and the channel number."""
+
+RESULT_TAGS = ( "RES", "OBJ", "TMP" )
+"""Tags of the rows that follow the histograms of a frame."""
+
+OBJECT_DTYPE = numpy.dtype([
+    ("timestamp",       "<i8"),     # host time in milliseconds since the epoch
+    ("objects",         numpy.uint8),
+    ("reliability",     numpy.uint8),
+    ("distance",        "<i4"),
+    ("referenceHits",   "<u4"),
+    ("objectHits",      "<u4"),
+])
+"""Record of a #OBJ row."""
+
+CHUNK_SIZE = 32 * 1024 * 1024
+"""Default number of characters read from a file at once."""
+
+class CsvCapture:
+    """The rows of a CSV file (or a chunk of it) grouped by tag. Every row has a frame number, a frame is what toCSV writes
+       for one HistogramsAndResult: the histograms followed by the #RES, #OBJ and #TMP rows.
+    """
+
+    def __init__(self):
+        self.histograms:Dict[str,numpy.ndarray] = {}
+        """Histogram rows per tag (e.g. "TG"), rows x bins uint32 as in the file."""
+        self.channels:Dict[str,numpy.ndarray] = {}
+        """Channel of every histogram row per tag, e.g. 3 for #TG3 and #TGPUC3, 0 for #SUM."""
+        self.frames:Dict[str,numpy.ndarray] = {}
+        """Frame number of every row per tag, for the histogram tags and RES, OBJ, TMP. Numbers are ascending."""
+        self.results = numpy.zeros(0, dtype=RESULT_FRAME_DTYPE)
+        """The decoded #RES rows."""
+        self.resultBytes = numpy.zeros((0, RESULT_FRAME_SIZE), dtype=numpy.uint8)
+        """The #RES rows as written, rows x bytes. Files of the EVM GUI have 32 bytes per row, results holds the first
+           RESULT_FRAME_SIZE of them."""
+        self.objects = numpy.zeros(0, dtype=OBJECT_DTYPE)
+        """The #OBJ rows."""
+        self.temperatures = numpy.zeros(0, dtype=numpy.int16)
+        """The #TMP rows in degrees Celsius."""
+        self.frameCount:int = 0
+        """Number of frames in the file up to and including this capture (frame numbers of a chunk count from the file start)."""
+        self.size:int = 0
+        """Number of characters parsed."""
+
+    def __len__(self)->int:
+        return self.frameCount
+
+    @property
+    def tags(self)->List[str]:
+        """The tags that have rows."""
+        return list(self.frames)
+
+    def histogram(self, tag:str, frame:int)->numpy.ndarray:
+        """The histograms of a tag in one frame.
+
+        Args:
+            tag (str): histogram tag, e.g. "TG"
+            frame (int): frame number
+
+        Returns:
+            numpy.ndarray: channels x bins view, empty if the frame has no rows of that tag
+        """
+        frames = self.frames.get(tag)
+        if frames is None or tag not in self.histograms:
+            return numpy.zeros((0, 0), dtype=numpy.uint32)
+        first, last = numpy.searchsorted(frames, [frame, frame + 1])
+        return self.histograms[tag][first:last]
+
+    def stack(self, tag:str)->numpy.ndarray:
+        """All histograms of a tag as one block, e.g. stack("TG")[frame, channel].
+
+        Args:
+            tag (str): histogram tag, e.g. "TG"
+
+        Returns:
+            numpy.ndarray: frames x channels x bins uint32, zero for missing rows. The channel index starts at the lowest
+            channel in the file, i.e. at 0 for #TG0 and at 1 for #TGPUC1.
+        """
+        rows = self.histograms.get(tag)
+        if rows is None or len(rows) == 0:
+            return numpy.zeros((self.frameCount, 0, 0), dtype=numpy.uint32)
+        channels = self.channels[tag]
+        first = int(channels.min())
+        block = numpy.zeros((self.frameCount, int(channels.max()) - first + 1, rows.shape[1]), dtype=numpy.uint32)
+        block[self.frames[tag], channels - first] = rows
+        return block
+
+    @staticmethod
+    def concatenate(captures:Iterable["CsvCapture"])->"CsvCapture":
+        """Join the chunks of a file (see iterCSV) into one capture.
+
+        Args:
+            captures (Iterable[CsvCapture]): chunks in file order
+
+        Returns:
+            CsvCapture: the joined capture, the chunk itself if there is only one
+        """
+        captures = list(captures)
+        if len(captures) == 1:
+            return captures[0]
+        joined = CsvCapture()
+        for name in ( "histograms", "channels", "frames" ):
+            tags = dict.fromkeys(tag for capture in captures for tag in getattr(capture, name))
+            setattr(joined, name, { tag: numpy.concatenate([ getattr(capture, name)[tag] for capture in captures
+                                                             if tag in getattr(capture, name) ]) for tag in tags })
+        for name in ( "results", "resultBytes", "objects", "temperatures" ):
+            parts = [ getattr(capture, name) for capture in captures if len(getattr(capture, name)) ]
+            setattr(joined, name, numpy.concatenate(parts) if parts else getattr(joined, name))
+        joined.frameCount = max([ capture.frameCount for capture in captures ], default=0)
+        joined.size = sum(capture.size for capture in captures)
+        return joined
+
+class _Parser:
+    """Splits text into the rows of each tag and numbers the frames. The frame state is kept from chunk to chunk."""
+
+    def __init__(self, delimiter:str):
+        self.delimiter = delimiter
+        self.frame:int = -1
+        self._seen = set()          # (tag, channel) of the rows in the current frame
+        self._trailer = False       # current frame has a RES, OBJ or TMP row
+
+    def _parse(self, tag:str, rows:List[str])->numpy.ndarray:
+        columns = rows[0].count(self.delimiter) + 1
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)      # raised for text that is not a number, size check below
+            data = numpy.fromstring(self.delimiter.join(rows), dtype=numpy.int64, sep=self.delimiter)
+        if data.size != len(rows) * columns:
+            raise ValueError(f"#{tag} rows with a different number of values or with values that are not integers")
+        return data.reshape(len(rows), columns)
+
+    def parse(self, text:str)->CsvCapture:
+        """Parse complete lines.
+
+        Args:
+            text (str): lines of the file
+
+        Returns:
+            CsvCapture: the rows
+        """
+        delimiter = self.delimiter
+        known = set(HISTOGRAM_TAGS + RESULT_TAGS)
+        rows:Dict[str,List[str]] = {}
+        channels:Dict[str,List[int]] = {}
+        frames:Dict[str,List[int]] = {}
+        for line in text.split("\n"):
+            if not line.startswith("#"):
+                continue                                    # sep= line, empty lines
+            name, _, values = line.partition(delimiter)
+            tag = name[1:].rstrip("0123456789")
+            if tag not in known:
+                continue
+            channel = int(name[1 + len(tag):] or 0)
+            key = ( tag, channel )
+            result = tag in RESULT_TAGS
+            if self.frame < 0 or key in self._seen or (self._trailer and not result):
+                self.frame += 1
+                self._seen.clear()
+                self._trailer = False
+            self._seen.add(key)
+            self._trailer = self._trailer or result
+            if tag not in rows:
+                rows[tag], channels[tag], frames[tag] = [], [], []
+            rows[tag].append(values.rstrip(delimiter))      # spreadsheet programs pad rows with empty fields
+            channels[tag].append(channel)
+            frames[tag].append(self.frame)
+
+        capture = CsvCapture()
+        capture.size = len(text)
+        capture.frameCount = self.frame + 1
+        for tag in rows:
+            data = self._parse(tag, rows[tag])
+            capture.frames[tag] = numpy.array(frames[tag], dtype=numpy.int64)
+            if tag == "RES":
+                if data.shape[1] < RESULT_FRAME_SIZE:
+                    raise ValueError(f"#RES rows must have at least {RESULT_FRAME_SIZE} bytes, not {data.shape[1]}")
+                capture.resultBytes = data.astype(numpy.uint8)
+                capture.results = decodeResultFrames(capture.resultBytes[:, :RESULT_FRAME_SIZE])
+            elif tag == "OBJ":
+                if data.shape[1] != len(OBJECT_DTYPE.names):
+                    raise ValueError(f"#OBJ rows must have {len(OBJECT_DTYPE.names)} values, not {data.shape[1]}")
+                capture.objects = numpy.zeros(len(data), dtype=OBJECT_DTYPE)
+                for column, field in enumerate(OBJECT_DTYPE.names):
+                    capture.objects[field] = data[:, column]
+            elif tag == "TMP":
+                capture.temperatures = data[:, 0].astype(numpy.int16)
+            else:
+                capture.histograms[tag] = data.astype(numpy.uint32)
+                capture.channels[tag] = numpy.array(channels[tag], dtype=numpy.int16)
+        return capture
+
+def iterCSV(file_name:str, chunk_size:int=CHUNK_SIZE, delimiter:str=None)->Iterator[CsvCapture]:
+    """Read a file chunk by chunk, for files that do not fit into memory. A frame can be split over two chunks,
+       the frame numbers count from the start of the file.
+
+    Args:
+        file_name (str): CSV file
+        chunk_size (int, optional): number of characters to read at once. Defaults to CHUNK_SIZE.
+        delimiter (str, optional): field delimiter. Defaults to None: the one of the sep= line, ";" if there is none.
+
+    Yields:
+        CsvCapture: the rows of a chunk
+    """
+    parser = None
+    rest = ""
+    with open(file_name, "r", encoding="UTF8") as f:
+        while True:
+            text = f.read(chunk_size)
+            if not text:
+                break
+            text = rest + text
+            if parser is None:
+                if delimiter is None:
+                    delimiter = text[4] if text.startswith("sep=") and len(text) > 4 else ";"
+                parser = _Parser(delimiter)
+            end = text.rfind("\n") + 1
+            rest = text[end:]
+            if end:
+                yield parser.parse(text[:end])
+    if rest:
+        yield parser.parse(rest)
+
+def loadCSV(file_name:str, delimiter:str=None, chunk_size:int=CHUNK_SIZE)->CsvCapture:
+    """Read a whole file.
+
+    Args:
+        file_name (str): CSV file
+        delimiter (str, optional): field delimiter. Defaults to None: the one of the sep= line, ";" if there is none.
+        chunk_size (int, optional): number of characters to read at once. Defaults to CHUNK_SIZE.
+
+    Returns:
+        CsvCapture: the rows of the file
+    """
+    return CsvCapture.concatenate(iterCSV(file_name, chunk_size=chunk_size, delimiter=delimiter))
+
+def loadDirectory(directory:str, pattern:str="*.csv", processes:int=None, delimiter:str=None)->Dict[str,CsvCapture]:
+    """Read all files of a directory, in a pool of processes.
+
+    Args:
+        directory (str): directory with the CSV files
+        pattern (str, optional): file name pattern. Defaults to "*.csv".
+        processes (int, optional): number of worker processes, 1 reads the files in this process. Defaults to None: one per CPU.
+        delimiter (str, optional): field delimiter. Defaults to None: the one of the sep= line of each file.
+
+    Returns:
+        Dict[str,CsvCapture]: the capture of each file by file name, sorted by name
+    """
+    files = sorted(glob.glob(os.path.join(directory, pattern)))
+    if processes == 1 or len(files) < 2:
+        return { file_name: loadCSV(file_name, delimiter) for file_name in files }
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+        return dict(zip(files, pool.map(loadCSV, files, itertools.repeat(delimiter))))
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
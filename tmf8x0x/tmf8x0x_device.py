@@ -10,10 +10,16 @@
 TMF8x0x device support in python: Koloth, Dahar, Leica 
 """
 import __init__
+import contextlib
 import enum
 import time
+from typing import Iterator
 from aos_com.ic_com import IcCom
 
+# local imports
+from tmf8x0x.tmf8x0x_batch import WriteCombiningIcCom
+from tmf8x0x.tmf8x0x_instrument import InstrumentedIcCom, instrumented
+
 class Tmf8x0xDevice:
     """The basic Koloth/Dahar/Leica communication class.
        It offers application/bootloader functionality to interact via a FTDI module.
@@ -65,14 +71,26 @@ class Tmf8x0xDevice:
     TMF8X0X_INT_STATUS = 0xe1
     TMF8X0X_INT_ENAB = 0xe2
 
-    def __init__(self, ic_com:IcCom, log = False, exception_level: ExceptionLevel=ExceptionLevel.DEVICE):
+    _instrumentation:InstrumentedIcCom = None
+    """The IcCom wrapper that accounts the bus traffic per API, None if instrumentation is off."""
+
+    def __init__(self, ic_com:IcCom, log = False, exception_level: ExceptionLevel=ExceptionLevel.DEVICE, i2c_address:int=None, enable_pin:int=None):
         """The default constructor. It initializes the FTDI driver.
         Args:
             log (bool, optional): Enable verbose driver outputs. False per default.
             exception_level (ExceptionLevel, optional): Set the exception level at which an error gets raised an exception. Defaults to ExceptionLevel.DEVICE
+            i2c_address (int, optional): The I2C address of this device, e.g. if it was changed with changeI2Caddress before. Defaults to I2C_SLAVE_ADDR.
+            enable_pin (int, optional): GPIO mask of the enable pin of this device, for several devices on one adapter. Defaults to the enable pin of ic_com.
         """
         self.com = ic_com 
         self._exception_level = exception_level
+        self.I2C_SLAVE_ADDR = i2c_address if i2c_address is not None else type(self).I2C_SLAVE_ADDR
+        """The I2C address of this device. Every instance has its own, changeI2Caddress updates it."""
+        self.enable_pin:int = enable_pin
+        """GPIO mask of the enable pin, None to use the enable pin of the IcCom."""
+
+    def _enablePin(self)->int:
+        return self.com.enable_pin if self.enable_pin is None else self.enable_pin
 
     def _setError(self, message):
         """An error occurred - add it to the error list, which the host can later read out.
@@ -109,7 +127,7 @@ class Tmf8x0xDevice:
         """
         status = self.com.i2cOpen(i2c_speed=i2c_speed)
         if status == self.com.I2C_OK:
-            self.com.gpioSetDirection(self.com.enable_pin, 0)
+            self.com.gpioSetDirection(self._enablePin(), 0)
         return status
     
     def close( self ):
@@ -122,6 +140,60 @@ class Tmf8x0xDevice:
         """
         return self.com.i2cClose()       
 
+    def enableInstrumentation(self):
+        """Start to account every I2C transaction and GPIO access to the driver API that caused it."""
+        if self._instrumentation is None:
+            self._instrumentation = InstrumentedIcCom(self.com)
+            self.com = self._instrumentation
+
+    def disableInstrumentation(self):
+        """Stop the instrumentation, the driver talks to the IcCom directly again."""
+        if self._instrumentation is not None:
+            self.com = self._instrumentation.com
+            self._instrumentation = None
+
+    def getInstrumentationSnapshot(self)->dict:
+        """Get the bus traffic per API since the instrumentation was enabled or reset.
+
+        Returns:
+            dict: transactions, bytes, GPIO calls and latency distribution per API path, empty if instrumentation is off
+        """
+        if self._instrumentation is None:
+            return {}
+        return self._instrumentation.snapshot()
+
+    def resetInstrumentation(self):
+        """Erase the instrumentation statistics."""
+        if self._instrumentation is not None:
+            self._instrumentation.reset()
+
+    @contextlib.contextmanager
+    def batchWrites(self)->Iterator[WriteCombiningIcCom]:
+        """Context in which register writes are queued, writes to consecutive registers are combined into one burst,
+           and everything is sent in order at the latest when the context ends. Reads inside the context send the
+           queued writes first. Only use it where the device accepts the combined burst, e.g. INT_STATUS + INT_ENAB:
+
+            with tof.batchWrites():
+                tof.clearIntStatus(mask)
+                tof.enableInt(mask)
+
+           A queued write that fails when it is sent (before a read or at the end of the context) is passed to _setError.
+
+        Returns:
+            WriteCombiningIcCom: the batch, with the number of queued and sent writes
+        """
+        if isinstance(self.com, WriteCombiningIcCom):      # nested: join the outer batch
+            yield self.com
+            return
+        batch = WriteCombiningIcCom(self.com, on_error=self._setError)
+        self.com = batch
+        try:
+            yield batch
+        finally:
+            self.com = batch.com
+            batch.flush()
+
+    @instrumented("pon0")
     def pon0(self,timeout:float=0.001) -> Status:
         """
         Move the device into the STANDBY or PON=0 state.
@@ -138,6 +210,7 @@ class Tmf8x0xDevice:
             return self.Status.DEV_ERROR
         return self.Status.OK
         
+    @instrumented("pon1")
     def pon1(self,timeout:float=0.001) -> Status:
         """
         Move the device from STANDBY or PON=1 (WAKEUP) state.
@@ -162,6 +235,7 @@ class Tmf8x0xDevice:
         self._setError("Timeout The device didn't come up as expected (ENABLE register value is: 0x{:2X} expected: 0x{:2X}).".format(enable[0], self.TMF8X0X_ENABLE__app_ready__MASK))
         return self.Status.DEV_ERROR
 
+    @instrumented("enable")
     def enable(self,timeout:float=0.02) -> Status:
         """Enable the TMF8X0X.
         Args:
@@ -170,16 +244,19 @@ class Tmf8x0xDevice:
         Returns:
             Status: The status code (OK = 0, error != 0)..
         """
-        self.com.gpioSet(self.com.enable_pin, self.com.enable_pin) #set Enable pin to output, and INT pin to input.       
+        self.com.gpioSet(self._enablePin(), self._enablePin()) #set Enable pin to output, and INT pin to input.       
         # HW needs to wake up        
         time.sleep(timeout) 
         # now set the PON=1 bit
         return self.pon1()
         
+    @instrumented("disable")
     def disable(self):
-        """Disable the TMF8X0"""
-        self.com.gpioSet(self.com.enable_pin, 0) 
+        """Disable the TMF8X0. The device powers down and comes up with the default I2C address again."""
+        self.com.gpioSet(self._enablePin(), 0) 
+        self.I2C_SLAVE_ADDR = type(self).I2C_SLAVE_ADDR
 
+    @instrumented("isIntPinPulledLow")
     def isIntPinPulledLow(self):
         """Check if the interrupt is pending, ie. if the INT pin is pulled low.
 
@@ -189,6 +266,7 @@ class Tmf8x0xDevice:
         level = self.com.gpioGet(self.com.interrupt_pin)
         return level == 0 # Open drain INT pin -> 0 == pending
 
+    @instrumented("readIntStatus")
     def readIntStatus(self) -> int:
         """ read the interrupt status register of TMF8x0x """
         intreg = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_INT_STATUS], 1 )
@@ -197,6 +275,7 @@ class Tmf8x0xDevice:
         self._setError("Cannot read the INT_STATUS register")
         return 0
  
+    @instrumented("clearIntStatus")
     def clearIntStatus(self,bitMaskToClear):
         """ clear the interrupt status register of TMF8x0x 
          Args:
@@ -204,6 +283,7 @@ class Tmf8x0xDevice:
         """
         self.com.i2cTx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_INT_STATUS,bitMaskToClear] )
 
+    @instrumented("readIntEnable")
     def readIntEnable(self) -> int:
         """ read the interrupt enable register of TMF8x0x """
         enabreg = self.com.i2cTxRx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_INT_ENAB], 1 )
@@ -212,6 +292,7 @@ class Tmf8x0xDevice:
         self._setError("Cannot read the INT_STATUS register")
         return 0
     
+    @instrumented("enableInt")
     def enableInt(self,bitMaskToEnable):
         """ enable all the interrupts that have the bit set in the parameter, all other interrupts will be disabled 
          Args:
@@ -219,15 +300,18 @@ class Tmf8x0xDevice:
         """
         self.com.i2cTx(self.I2C_SLAVE_ADDR, [self.TMF8X0X_INT_ENAB,bitMaskToEnable] )
 
+    @instrumented("clearAndEnableInt")
     def clearAndEnableInt(self,bitMaskToEnable):
         """
         Clear and enable given interrupt bits
         Args:
             bitMaskToEnable : all bits set in this 8-bit mask will be cleared and enabled, all others disabled
         """
-        self.clearIntStatus(bitMaskToEnable)    # first clear any old pending interrupt
-        self.enableInt(bitMaskToEnable)         # now clear it
+        with self.batchWrites():                    # INT_STATUS and INT_ENAB are consecutive: one write
+            self.clearIntStatus(bitMaskToEnable)    # first clear any old pending interrupt
+            self.enableInt(bitMaskToEnable)         # now clear it
         
+    @instrumented("readAndClearInt")
     def readAndClearInt(self,bitMaskToCheck):
         """
         Check if given interrupt bits are set, if they are, clear them and return them
@@ -0,0 +1,714 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Register-level emulator of the TMF8806 (bootloader and measurement application) behind the IcCom interface.
+It allows to run Tmf8x0xApp, the examples and the tests without an EVM.
+"""
+
+import __init__
+import ctypes
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List
+import numpy
+from aos_com.ic_com import IcCom
+
+# local imports
+from tmf8x0x.tmf8x0x_app import Tmf8x0xApp, Histogram
+from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd, tmf8806FactoryCalibData, tmf8806DistanceResultFrame, \
+    TMF880X_APP_VERSION_MAJOR, TMF880X_APP_VERSION_MINOR, TMF880X_APP_VERSION_PATCH
+
+class EmulatorTiming:
+    """Timing of the emulated device in seconds of device time, see Tmf8806Emulator time_scale."""
+
+    def __init__(self, wakeup:float=0.0005, app_start:float=0.0015, command:float=0.0001, bl_command:float=0.00005, bl_byte:float=0.5e-6,
+                 kiter:float=1000/37.6e6, measurement_overhead:float=0.001):
+        """Create a timing set.
+
+        Args:
+            wakeup (float, optional): Time from PON=1 until cpu_ready. Defaults to 0.0005.
+            app_start (float, optional): Time from the application switch request until the application runs. Defaults to 0.0015.
+            command (float, optional): Time until an application command is done. Defaults to 0.0001.
+            bl_command (float, optional): Time until a bootloader command is done. Defaults to 0.00005.
+            bl_byte (float, optional): Additional bootloader time per payload byte. Defaults to 0.5e-6.
+            kiter (float, optional): Integration time of 1000 iterations at the 37.6MHz VCSEL clock. Defaults to 1000/37.6e6.
+            measurement_overhead (float, optional): Time of a measurement on top of the integration. Defaults to 0.001.
+        """
+        self.wakeup = wakeup
+        self.app_start = app_start
+        self.command = command
+        self.bl_command = bl_command
+        self.bl_byte = bl_byte
+        self.kiter = kiter
+        self.measurement_overhead = measurement_overhead
+
+    def measurementTime(self, config:tmf8806MeasureCmd)->float:
+        """Duration of a single measurement with the given configuration.
+
+        Args:
+            config (tmf8806MeasureCmd): the measurement configuration
+
+        Returns:
+            float: the duration in seconds
+        """
+        kiters = 1600 if config.data.kIters == 0xffff else config.data.kIters
+        clock_factor = 2 if config.data.algo.vcselClkDiv2 else 1
+        return kiters * self.kiter * clock_factor + self.measurement_overhead
+
+class Tmf8806Model:
+    """State of one emulated TMF8806. All times are device times in seconds."""
+
+    # values of the STATE register while the application works
+    STATE_MEASURE = 3
+    # bootloader status codes
+    BL_STATUS_OK = 0x00
+    BL_STATUS_CHECKSUM_ERROR = 0x03
+    BL_STATUS_UNKNOWN_COMMAND = 0x05
+    # application STATUS register values
+    STATUS_OK = 0x00
+    APP_CMD_STAT__error = 0x02          # CMD_STAT value of an unknown command
+    SYS_CLOCK_HZ = 5000000              # sysClock LSB is 0.2us, bit 0 set = valid time stamp
+    HISTOGRAM_QUARTER_END = Tmf8x0xApp.TMF8X0X_APP_COM_RESULT_NUMBER + Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE - 1
+
+    def __init__(self, enable_pin:int, timing:EmulatorTiming, i2c_address:int=Tmf8x0xApp.I2C_SLAVE_ADDR, serial_number:List[int]=None,
+                 ram_retention:bool=False, gpio_pins:List[int]=None):
+        """Create a device model. The device starts powered off (enable pin low).
+
+        Args:
+            enable_pin (int): GPIO mask of the enable pin of this device.
+            timing (EmulatorTiming): The timing of the device.
+            i2c_address (int, optional): The I2C address after power up. Defaults to 0x41.
+            serial_number (List[int], optional): 4 bytes serial number and identification. Defaults to [0x12, 0x34, 0x56, 0x78].
+            ram_retention (bool, optional): Keep the RAM (e.g. a downloaded patch) while the enable pin is low. Defaults to False.
+            gpio_pins (List[int], optional): GPIO masks of the GPIO0 and GPIO1 pins of the device, None if not connected. Defaults to None.
+        """
+        self.enable_pin = enable_pin
+        self.timing = timing
+        self.default_address = i2c_address
+        self.serial_number = serial_number if serial_number else [0x12, 0x34, 0x56, 0x78]
+        self.ram_retention = ram_retention
+        self.gpio_pins = gpio_pins
+        self.targetDistanceMm:int = 320
+        """Distance of the emulated object, 0 for no object."""
+        self.targetReliability:int = 40
+        """Reliability (confidence) reported for the object."""
+        self.temperature:int = 28
+        self.blFaults:Dict[int,int] = {}
+        """Fault injection: bootloader command -> status the command responds with instead of executing it,
+           None to never respond (the host times out)."""
+        self.ram = bytearray(0x10000)
+        self.powered = False
+        self._powerOff()
+
+    # ------------------------------------------------------------------ power and reset
+
+    def _powerOff(self):
+        self.powered = False
+        if not self.ram_retention:
+            self.ram = bytearray(len(self.ram))
+        self.i2c_address = self.default_address
+        self.pon = False
+        self.readyAt:float = None
+        self._reset()
+
+    def powerOn(self, now:float):
+        """The enable pin went high: the device is in standby (PON=0) with the bootloader."""
+        self.powered = True
+        self.pon = False
+        self.readyAt = None
+        self._reset()
+        self._startTime = now
+
+    def powerOff(self):
+        """The enable pin went low."""
+        self._powerOff()
+
+    def _reset(self):
+        """CPU reset: start the bootloader, the application state is lost."""
+        self.regs = bytearray(256)
+        self.appId = Tmf8x0xApp.TMF8X0X_COM_APP_ID__bootloader
+        self.appStartAt:float = None
+        self.startRamApp = False
+        self.patched = False
+        self.intStatus = 0
+        self.intEnable = 0
+        self._startTime = 0.0
+        # bootloader
+        self.blAddress = 0
+        self.blResponse = bytearray([0, 0, 0xff])
+        self.blDoneAt:float = None
+        self.blPending:bytearray = None
+        # application
+        self.cmdDoneAt:float = None
+        self.cmdPending:int = None
+        self.measuring = False
+        self.config:tmf8806MeasureCmd = None
+        self.nextMeasurementAt:float = None
+        self.calibrationDoneAt:float = None
+        self.calibration:bytes = None
+        self.stateData:bytes = None
+        self.status = self.STATUS_OK
+        self.resultNumber = 0
+        self.tid = 0
+        self.persistence = 0
+        self.lowThreshold = 0
+        self.highThreshold = 0xffff
+        self._inRange = 0
+        self.histogramConfig = 0            # cmd_data3 << 24 | cmd_data2 << 16 | cmd_data1 << 8 | cmd_data0
+        self.histogramSets:list = []        # pending (state, diag_info, tdcs, quarters, data) of the current measurement
+        self.histogramQuarter:int = None    # index of the published quarter while streaming
+        self.pendingResult:float = None     # time stamp of the measurement whose result waits for the histograms
+        self.gpio = [0, 0]
+        self.objectDetected = False
+
+    def isReady(self, now:float)->bool:
+        """True if the device acknowledges register accesses besides ENABLE and INT registers."""
+        return self.powered and self.pon and self.readyAt is not None and now >= self.readyAt
+
+    def intPending(self)->bool:
+        """True if this device pulls the INT pin low."""
+        return self.powered and (self.intStatus & self.intEnable) != 0
+
+    def gpioLevel(self, index:int)->int:
+        """Output level of GPIO0/GPIO1: 1 (high or open with pull-up) or 0."""
+        mode = self.gpio[index]
+        if mode == 4:  return 0
+        if mode == 6:  return 1 if self.objectDetected else 0
+        if mode == 7:  return 0 if self.objectDetected else 1
+        return 1
+
+    # ------------------------------------------------------------------ time
+
+    def update(self, now:float):
+        """Process all events up to now."""
+        if not self.powered:
+            return
+        if self.appStartAt is not None and now >= self.appStartAt:
+            self.appStartAt = None
+            self._startApplication()
+        if self.blDoneAt is not None and now >= self.blDoneAt:
+            self.blDoneAt = None
+            self.blResponse = self.blPending
+        if self.cmdDoneAt is not None and now >= self.cmdDoneAt:
+            self.cmdDoneAt = None
+            self._executeCommand(self.cmdPending, now)
+        if self.calibrationDoneAt is not None and now >= self.calibrationDoneAt:
+            self.calibrationDoneAt = None
+            self._publishCalibration()
+        # a host that does not read in time misses results, the result number still advances
+        while self.measuring and self.nextMeasurementAt is not None and now >= self.nextMeasurementAt and self.pendingResult is None:
+            self._measurementDone(self.nextMeasurementAt)
+
+    # ------------------------------------------------------------------ register access
+
+    def read(self, register:int, size:int, now:float)->bytearray:
+        """Read registers."""
+        out = bytearray(size)
+        for i in range(size):
+            addr = min(register + i, 0xff)
+            out[i] = self._readRegister(addr, now)
+        if self.histogramQuarter is not None and register <= self.HISTOGRAM_QUARTER_END < register + size:
+            self._nextQuarter()
+        return out
+
+    def _readRegister(self, addr:int, now:float)->int:
+        if addr == Tmf8x0xApp.TMF8X0X_ENABLE:
+            ready = Tmf8x0xApp.TMF8X0X_ENABLE__cpu_ready__MASK if self.isReady(now) else 0
+            return (Tmf8x0xApp.TMF8X0X_ENABLE__wakeup__MASK if self.pon else 0) | ready
+        if addr == Tmf8x0xApp.TMF8X0X_INT_STATUS:
+            return self.intStatus
+        if addr == Tmf8x0xApp.TMF8X0X_INT_ENAB:
+            return self.intEnable
+        if not self.isReady(now):
+            return 0
+        if addr == Tmf8x0xApp.TMF8X0X_COM_APP_ID:
+            return self.appId
+        if self.appId == Tmf8x0xApp.TMF8X0X_COM_APP_ID__bootloader:
+            offset = addr - Tmf8x0xApp.TMF8X0X_COM_CMD_STAT
+            if 0 <= offset < len(self.blResponse):
+                return self.blResponse[offset]
+            return 0
+        return self.regs[addr]
+
+    def write(self, data:bytes, now:float):
+        """Write registers, data[0] is the register address."""
+        register = data[0]
+        payload = bytes(data[1:])
+        if register == Tmf8x0xApp.TMF8X0X_ENABLE:
+            self._writeEnable(payload[0], now)
+            payload = payload[1:]
+            register += 1
+        if register == Tmf8x0xApp.TMF8X0X_INT_STATUS and payload:
+            self.intStatus &= ~payload[0] & 0xff          # write 1 to clear
+            payload = payload[1:]
+            register += 1
+        if register == Tmf8x0xApp.TMF8X0X_INT_ENAB and payload:
+            self.intEnable = payload[0]
+            return
+        if not payload or not self.isReady(now) or register >= Tmf8x0xApp.TMF8X0X_ENABLE:
+            return
+        if register <= Tmf8x0xApp.TMF8X0X_COM_REQ_APP_ID < register + len(payload):
+            self._requestApp(payload[Tmf8x0xApp.TMF8X0X_COM_REQ_APP_ID - register], now)
+        if self.appId == Tmf8x0xApp.TMF8X0X_COM_APP_ID__bootloader:
+            if register == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT:
+                self._bootloaderFrame(payload, now)
+            return
+        end = min(register + len(payload), 0xe0)
+        self.regs[register:end] = payload[:end - register]
+        if register <= Tmf8x0xApp.TMF8X0X_APP_CMD_STAT < end:
+            cmd = self.regs[Tmf8x0xApp.TMF8X0X_APP_CMD_STAT]
+            self.cmdPending = cmd
+            self.cmdDoneAt = now + self.timing.command
+
+    def _writeEnable(self, value:int, now:float):
+        if value & Tmf8x0xApp.TMF8X0X_ENABLE__cpu_reset__MASK:
+            pon = self.pon
+            self._reset()
+            self.pon = pon
+            self.readyAt = now + self.timing.wakeup if pon else None
+            return
+        if value & Tmf8x0xApp.TMF8X0X_ENABLE__wakeup__MASK:
+            if not self.pon:
+                self.pon = True
+                self.readyAt = now + self.timing.wakeup
+        else:
+            self.pon = False                # standby, the RAM and the application state are kept
+            self.readyAt = None
+
+    def _requestApp(self, app:int, now:float):
+        if app == Tmf8x0xApp.TMF8X0X_COM_APP_ID__application and self.appId != app:
+            self.startRamApp = False
+            self.appStartAt = now + self.timing.app_start
+        elif app == Tmf8x0xApp.TMF8X0X_COM_APP_ID__bootloader and self.appId != app:
+            pon = self.pon
+            self._reset()
+            self.pon = pon
+            self.readyAt = now
+
+    def _startApplication(self):
+        self.appId = Tmf8x0xApp.TMF8X0X_COM_APP_ID__application
+        self.patched = self.startRamApp
+        self.regs = bytearray(256)
+        self.regs[Tmf8x0xApp.TMF8X0X_COM_APP_ID] = self.appId
+        self.regs[0x01] = TMF880X_APP_VERSION_MAJOR
+        self.regs[Tmf8x0xApp.TMF8X0X_APP_ID_MINOR] = TMF880X_APP_VERSION_MINOR
+        self.regs[Tmf8x0xApp.TMF8X0X_APP_ID_MINOR + 1] = TMF880X_APP_VERSION_PATCH + (1 if self.patched else 0)
+        self._setState(Tmf8x0xApp.TMF8X0X_APP_STATE_IDLE)
+
+    # ------------------------------------------------------------------ bootloader
+
+    @staticmethod
+    def _checksum(data:bytes)->int:
+        return (0xff ^ sum(data)) & 0xff
+
+    def _bootloaderFrame(self, frame:bytes, now:float):
+        """Execute a bootloader command: frame is command, payload length, payload, checksum."""
+        cmd = frame[0]
+        length = frame[1] if len(frame) > 1 else 0
+        payload = frame[2:2 + length]
+        status = self.BL_STATUS_OK
+        response = b""
+        if cmd in self.blFaults and self.blFaults[cmd] is None:
+            self.blResponse = bytearray([cmd, 0, 0])    # busy forever
+            self.blDoneAt = None
+            return
+        if len(frame) != length + 3 or self._checksum(frame[:-1]) != frame[-1]:
+            status = self.BL_STATUS_CHECKSUM_ERROR
+        elif cmd in self.blFaults:
+            status = self.blFaults[cmd]
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_addr_ram:
+            self.blAddress = payload[0] | (payload[1] << 8)
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_w_ram:
+            end = min(self.blAddress + length, len(self.ram))
+            self.ram[self.blAddress:end] = payload[:end - self.blAddress]
+            self.blAddress = end
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_r_ram:
+            response = bytes(self.ram[self.blAddress:self.blAddress + payload[0]])
+            self.blAddress += payload[0]
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_crc_ram:
+            size = payload[0] | (payload[1] << 8)
+            response = (zlib.crc32(self.ram[self.blAddress:self.blAddress + size]) & 0xffffffff).to_bytes(4, "little")
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_upload_init:
+            pass
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_remap_reset:
+            self.startRamApp = True
+            self.appStartAt = now + self.timing.app_start
+        elif cmd == Tmf8x0xApp.TMF8X0X_COM_CMD_STAT__bl_cmd_romremap_reset:
+            self.startRamApp = False
+            self.appStartAt = now + self.timing.app_start
+        else:
+            status = self.BL_STATUS_UNKNOWN_COMMAND
+        pending = bytearray([status, len(response)]) + response
+        pending.append(self._checksum(pending[1:]))
+        self.blPending = pending
+        self.blResponse = bytearray([cmd, 0, 0])     # busy until the command is done
+        self.blDoneAt = now + self.timing.bl_command + self.timing.bl_byte * length
+
+    # ------------------------------------------------------------------ application
+
+    def _setState(self, state:int):
+        self.regs[Tmf8x0xApp.TMF8X0X_APP_COM_STATE] = state
+        self.regs[Tmf8x0xApp.TMF8X0X_APP_COM_STATUS] = self.status
+
+    def _publish(self, content:int, data:bytes, start:int=Tmf8x0xApp.TMF8X0X_APP_COM_RESULT_NUMBER):
+        """Publish a record: set CONTENT, advance TID and copy data into the register page."""
+        self.tid = (self.tid + 1) & 0xff
+        self.regs[Tmf8x0xApp.TMF8X0X_APP_COM_CONTENT] = content
+        self.regs[Tmf8x0xApp.TMF8X0X_APP_COM_TID] = self.tid
+        self.regs[start:start + len(data)] = data
+
+    def _executeCommand(self, cmd:int, now:float):
+        regs = self.regs
+        known = True
+        if cmd in (Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_measure, Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_factory_calibration):
+            config = tmf8806MeasureCmd.from_buffer_copy(bytes(regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_9:Tmf8x0xApp.TMF8X0X_APP_CMD_STAT + 1]))
+            start = Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_START
+            if config.data.data.factoryCal:
+                self.calibration = bytes(regs[start:start + Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_SIZE])
+                start += Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_SIZE
+            if config.data.data.algState:
+                self.stateData = bytes(regs[start:start + Tmf8x0xApp.TMF8X0X_APP_STATE_DATA_SIZE])
+            self._applyGpio(config.data.gpio.gpio0, config.data.gpio.gpio1)
+            self.config = config
+            if cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_factory_calibration:
+                self.calibrationDoneAt = now + self.timing.measurementTime(config)
+            else:
+                self.status = self.STATUS_OK if self.calibration else Tmf8x0xApp.TMF8X0X_APP_NO_CALIBRATION
+                self.measuring = True
+                self.resultNumber = 0
+                self._inRange = 0
+                self.nextMeasurementAt = now + self.timing.measurementTime(config)
+            self._setState(self.STATE_MEASURE)
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_stop:
+            self.measuring = False
+            self.nextMeasurementAt = None
+            self.calibrationDoneAt = None
+            self.histogramSets = []
+            self.histogramQuarter = None
+            self.pendingResult = None
+            self.objectDetected = False
+            self._setState(Tmf8x0xApp.TMF8X0X_APP_STATE_IDLE)
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_wr_calibration:
+            start = Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_START
+            if regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_0] & 0x01:
+                self.calibration = bytes(regs[start:start + Tmf8x0xApp.TMF8X0X_APP_FACTORY_CALIBRATION_SIZE])
+                self.status = self.STATUS_OK
+                self._setState(regs[Tmf8x0xApp.TMF8X0X_APP_COM_STATE])
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_set_gpio:
+            gpio = regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_0]
+            self._applyGpio(gpio & 0xf, gpio >> 4)
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_wr_add_config:
+            self.persistence = regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_4]
+            self.lowThreshold = regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_3] | (regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_3 + 1] << 8)
+            self.highThreshold = regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_1] | (regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_0] << 8)
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_rd_add_config:
+            self._publish(cmd, bytes([self.persistence, self.lowThreshold & 0xff, self.lowThreshold >> 8, self.highThreshold & 0xff, self.highThreshold >> 8]))
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_histogram_readout:
+            self.histogramConfig = int.from_bytes(bytes(regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_3:Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_0 + 1]), "big")
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_read_histogram:
+            if self.histogramSets:
+                self.histogramQuarter = -1
+                self._nextQuarter()
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_continue:
+            self.histogramQuarter = None
+            if self.histogramSets:
+                self.histogramSets.pop(0)
+            self._nextHistogramSet(now)
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_read_serial_number:
+            self._publish(cmd, bytes(self.serial_number), Tmf8x0xApp.TMF8X0X_APP_COM_SERIAL_NUMBER_0)
+        elif cmd == Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_change_i2c_address:
+            mask = regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_0] & 0x3
+            value = (regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_0] >> 2) & 0x3
+            levels = self.gpioLevel(0) | (self.gpioLevel(1) << 1)
+            if levels & mask == value:
+                self.i2c_address = regs[Tmf8x0xApp.TMF8X0X_APP_CMD_DATA_1] >> 1
+        else:
+            known = False
+        regs[Tmf8x0xApp.TMF8X0X_APP_CMD_STAT] = Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__stat_ok if known else self.APP_CMD_STAT__error
+        regs[Tmf8x0xApp.TMF8X0X_APP_CMD_STAT + 1] = cmd
+
+    def _applyGpio(self, gpio0:int, gpio1:int):
+        self.gpio = [gpio0, gpio1]
+
+    def _publishCalibration(self):
+        calib = tmf8806FactoryCalibData()
+        calib.id = 2
+        calib.crosstalkIntensity = 1000
+        calib.crosstalkTdc1Ch0BinPosUQ6Lsb = 0x40
+        calib.opticalOffsetQ3 = 8
+        self._publish(Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_factory_calibration, bytes(calib))
+        self._setState(Tmf8x0xApp.TMF8X0X_APP_STATE_IDLE)
+        self.intStatus |= Tmf8x0xApp.TMF8X0X_APP_INTERRUPT_RESULTS
+
+    def _measurementDone(self, measured:float):
+        """A measurement finished: queue its histograms (if configured), or publish the result."""
+        self.pendingResult = measured
+        self.histogramSets = self._buildHistogramSets()
+        self._nextHistogramSet(measured)
+
+    def _nextHistogramSet(self, now:float):
+        if self.histogramSets:
+            state, diag_info, _, _ = self.histogramSets[0]
+            self.regs[Tmf8806Model.DIAG_INFO] = diag_info
+            self._setState(state)
+            self.intStatus |= Tmf8x0xApp.TMF8X0X_APP_INTERRUPT_DIAG
+        elif self.pendingResult is not None:
+            measured = self.pendingResult
+            self.pendingResult = None
+            self._setState(self.STATE_MEASURE)
+            self._publishResult(measured)
+            period = self.config.data.repetitionPeriodMs / 1000.0
+            if period > 0:
+                # histogram readout blocks the device, the next measurement cannot start before the host continued
+                self.nextMeasurementAt = max(measured, now) + max(period, self.timing.measurementTime(self.config))
+            else:
+                self.measuring = False          # single shot
+                self.nextMeasurementAt = None
+                self._setState(Tmf8x0xApp.TMF8X0X_APP_STATE_IDLE)
+
+    def _publishResult(self, measured:float):
+        kiters = 1600 if self.config.data.kIters == 0xffff else self.config.data.kIters
+        distance = self.targetDistanceMm
+        detected = distance > 0 and self.targetReliability > 0
+        if detected and not self.lowThreshold <= distance <= self.highThreshold:
+            self._inRange = 0
+            self.resultNumber = (self.resultNumber + 1) & 0xff
+            return                                  # out of the threshold range, no interrupt
+        self._inRange += 1
+        self.resultNumber = (self.resultNumber + 1) & 0xff
+        if self._inRange < self.persistence:
+            return
+        self.objectDetected = detected
+        result = tmf8806DistanceResultFrame()
+        result.resultNum = self.resultNumber
+        result.reliability = self.targetReliability if detected else 0
+        result.resultStatus = 0
+        result.distPeak = distance if detected else 0
+        result.sysClock = (int((measured - self._startTime) * self.SYS_CLOCK_HZ) | 1) & 0xffffffff
+        if self.stateData:
+            ctypes.memmove(result.stateData, self.stateData, len(self.stateData))
+        result.temperature = self.temperature
+        result.referenceHits = kiters * 50
+        result.objectHits = kiters * 20 if detected else 0
+        result.xtalk = 1000 if self.calibration else 0
+        self._publish(Tmf8x0xApp.TMF8X0X_APP_COM_CONTENT_result, bytes(result))
+        self.intStatus |= Tmf8x0xApp.TMF8X0X_APP_INTERRUPT_RESULTS
+
+    # ------------------------------------------------------------------ histograms
+
+    DIAG_INFO = Tmf8x0xApp.TMF8806_COM_DIAG_INFO
+
+    def _histogram(self, kind:int, tdc:int)->numpy.ndarray:
+        """Synthetic histogram of one TDC: a reference peak on channel 0, the object peak on channel 1."""
+        bins = numpy.full(Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_BINS, 10 + tdc, dtype=numpy.uint32)
+        x = numpy.arange(128)
+        bins[:128] += (1000 * numpy.exp(-0.5 * ((x - 10) / 1.5) ** 2)).astype(numpy.uint32)
+        if kind != Histogram.HISTOGRAM_EC and self.targetDistanceMm > 0:
+            peak = min(120, self.targetDistanceMm / 20.0 + 10)
+            bins[128:] += (500 * numpy.exp(-0.5 * ((x - peak) / 2.0) ** 2)).astype(numpy.uint32)
+        bins[127] = 0       # scaling shift of channel 0
+        bins[255] = 0       # scaling shift of channel 1
+        return bins.astype(Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_DTYPE)
+
+    def _buildHistogramSets(self)->list:
+        """The histogram sets of one measurement: (state, diag_info, number of quarters, data)."""
+        sets = []
+        cfg = self.histogramConfig
+        data3 = (cfg >> 24) & 0xff
+        data1 = (cfg >> 8) & 0xff
+        for bit, kind in ((0x02, Histogram.HISTOGRAM_EC), (0x10, Histogram.HISTOGRAM_PROXIMITY), (0x80, Histogram.HISTOGRAM_DISTANCE)):
+            if data3 & bit:
+                data = numpy.concatenate([ self._histogram(kind, tdc) for tdc in range(Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_TDCS) ])
+                sets.append((kind, 0, Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_TDCS * Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_QUARTERS, data.tobytes()))
+        if data1 & 0x01:
+            for tdc in range(4):        # pile-up corrected histograms are published one by one
+                data = self._histogram(Histogram.HISTOGRAM_DISTANCE, tdc)[:128]
+                sets.append((Histogram.HISTOGRAM_SUM, Tmf8x0xApp.TMF8806_DIAG_HIST_ALG_PILEUP << 1, 2, data.tobytes()))
+        if data1 & 0x02:
+            data = self._histogram(Histogram.HISTOGRAM_DISTANCE, 0)[:128]
+            sets.append((Histogram.HISTOGRAM_SUM, 0, 2, data.tobytes()))
+        return sets
+
+    def _nextQuarter(self):
+        """Publish the next quarter of the current histogram set (quarter ids start at the read_histogram command)."""
+        _, _, quarters, data = self.histogramSets[0]
+        self.histogramQuarter += 1
+        if self.histogramQuarter >= quarters:
+            self.histogramQuarter = None    # wait for the continue command
+            return
+        size = Tmf8x0xApp.TMF8X0X_APP_HISTOGRAM_QUARTER_SIZE
+        offset = self.histogramQuarter * size
+        self._publish(Tmf8x0xApp.TMF8X0X_APP_CMD_STAT__cmd_read_histogram + self.histogramQuarter, data[offset:offset + size])
+
+class Tmf8806Emulator(IcCom):
+    """IcCom implementation that emulates one or more TMF8806 on one I2C bus.
+       Every device has its own enable pin, the INT pins of all devices are wired-OR (open drain) to interrupt_pin.
+       Devices with the same I2C address all respond (wired-AND on reads), as on a real bus.
+       The device state is evaluated lazily on every bus access, so the emulator needs no thread.
+    """
+
+    INTERRUPT_PIN = 0x1
+    """Same pin as on the EVM."""
+    ENABLE_PINS = [ 0x2, 0x10, 0x20, 0x40, 0x80, 0x100, 0x200, 0x400 ]
+    """Enable pin of device 0 is the EVM enable pin, the other devices use the next free GPIOs."""
+    GPIO_PINS = [ 0x4, 0x8 ]
+    """GPIO0 and GPIO1 of device 0, as on the EVM."""
+
+    def __init__(self, num_devices:int=1, timing:EmulatorTiming=None, time_scale:float=1.0, clock:Callable[[],float]=None,
+                 ram_retention:bool=False, bus_latency:float=0.0, log:bool=False, exception_on_error:bool=True):
+        """Create an emulated bus.
+
+        Args:
+            num_devices (int, optional): Number of TMF8806 on the bus. Defaults to 1.
+            timing (EmulatorTiming, optional): Device timing. Defaults to EmulatorTiming().
+            time_scale (float, optional): Device seconds per host second, e.g. 10 runs the devices 10 times faster. Defaults to 1.0.
+            clock (Callable[[],float], optional): Host clock in seconds. Defaults to time.monotonic.
+            ram_retention (bool, optional): Devices keep the RAM while the enable pin is low. Defaults to False.
+            bus_latency (float, optional): Host seconds every I2C transaction takes (e.g. USB round trip). Defaults to 0.0.
+            log (bool, optional): Print messages. Defaults to False.
+            exception_on_error (bool, optional): Raise an exception in error case. Defaults to True.
+        """
+        super().__init__(log, exception_on_error)
+        if not 0 < num_devices <= len(self.ENABLE_PINS):
+            raise ValueError("num_devices must be 1 .. {}".format(len(self.ENABLE_PINS)))
+        self.timing = timing if timing else EmulatorTiming()
+        self.time_scale = time_scale
+        self.clock = clock if clock else time.monotonic
+        self.bus_latency = bus_latency
+        self.enable_pin = self.ENABLE_PINS[0]
+        self.interrupt_pin = self.INTERRUPT_PIN
+        self.devices:List[Tmf8806Model] = [ Tmf8806Model(self.ENABLE_PINS[i], self.timing, serial_number=[0x12, 0x34, 0x56, 0x78 + i],
+                                                         ram_retention=ram_retention, gpio_pins=self.GPIO_PINS if i == 0 else None)
+                                            for i in range(num_devices) ]
+        self._gpioOut = 0
+        self._gpioDirection = 0
+        self._t0 = self.clock()
+        self._lock = threading.RLock()
+        self.i2c_speed = 0
+        self.resetStatistics()
+
+    def resetStatistics(self):
+        """Erase the bus statistics."""
+        self.transactions:int = 0
+        """Number of I2C transactions (a write-read is one transaction)."""
+        self.bytesWritten:int = 0
+        self.bytesRead:int = 0
+        self.gpioReads:int = 0
+        self.nacks:int = 0
+        """Number of transactions no device acknowledged."""
+
+    def getStatistics(self)->dict:
+        """Get the bus statistics.
+
+        Returns:
+            dict: transactions, bytes written and read, GPIO reads, not acknowledged transactions
+        """
+        return { "transactions": self.transactions, "bytesWritten": self.bytesWritten, "bytesRead": self.bytesRead,
+                 "gpioReads": self.gpioReads, "nacks": self.nacks }
+
+    def now(self)->float:
+        """The device time in seconds."""
+        return (self.clock() - self._t0) * self.time_scale
+
+    def _update(self)->float:
+        now = self.now()
+        for device in self.devices:
+            device.update(now)
+        return now
+
+    def _transaction(self, devaddr:int, written:int, read:int)->List[Tmf8806Model]:
+        self.transactions += 1
+        self.bytesWritten += written
+        self.bytesRead += read
+        if self.bus_latency > 0:
+            time.sleep(self.bus_latency)
+        selected = [ device for device in self.devices if device.powered and device.i2c_address == devaddr ]
+        if not selected:
+            self.nacks += 1
+        return selected
+
+    # -----------------------------------------------------------------------------------
+    # I2C functions ---------------------------------------------------------------------
+    # -----------------------------------------------------------------------------------
+
+    def i2cOpen(self, i2c_speed:int=1000000) -> int:
+        self.i2c_speed = i2c_speed
+        self._log("i2cOpen")
+        return self.I2C_OK
+
+    def i2cClose(self) -> int:
+        self._log("i2cClose")
+        return self.I2C_OK
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        with self._lock:
+            now = self._update()
+            for device in self._transaction(devaddr, len(tx), 0):
+                device.write(bytes(tx), now)
+            return self.I2C_OK
+
+    def i2cRx(self, devaddr:int, rx_size:int) -> bytearray:
+        with self._lock:
+            self._transaction(devaddr, 0, rx_size)
+            return bytearray([0xff] * rx_size)          # no register address, the emulator does not keep a read pointer
+
+    def i2cTxRx(self, devaddr:int, tx:list, rx_size:int) -> bytearray:
+        with self._lock:
+            now = self._update()
+            out = bytearray([0xff] * rx_size)          # not acknowledged: the bus stays high
+            for device in self._transaction(devaddr, len(tx), rx_size):
+                if len(tx) > 1:
+                    device.write(bytes(tx), now)
+                data = device.read(tx[0], rx_size, now)
+                out = bytearray(a & b for a, b in zip(out, data))
+            return out
+
+    # -----------------------------------------------------------------------------------
+    # GPIO functions --------------------------------------------------------------------
+    # -----------------------------------------------------------------------------------
+
+    def gpioGet(self, r_mask:int) -> int:
+        with self._lock:
+            now = self._update()
+            self.gpioReads += 1
+            levels = self._gpioOut | self.interrupt_pin
+            if any(device.intPending() for device in self.devices):
+                levels &= ~self.interrupt_pin
+            for device in self.devices:
+                if device.gpio_pins:
+                    for index, pin in enumerate(device.gpio_pins):
+                        if not device.powered or device.gpioLevel(index):
+                            levels |= pin
+                        else:
+                            levels &= ~pin
+            return levels & r_mask
+
+    def gpioSet(self, w_mask:int, value:int):
+        with self._lock:
+            now = self.now()
+            old = self._gpioOut
+            self._gpioOut = (self._gpioOut & ~w_mask) | (value & w_mask)
+            for device in self.devices:
+                if (self._gpioOut ^ old) & device.enable_pin:
+                    if self._gpioOut & device.enable_pin:
+                        device.powerOn(now)
+                    else:
+                        device.powerOff()
+
+    def gpioSetDirection(self, out_mask:int, out_value:int):
+        with self._lock:
+            self._gpioDirection = (self._gpioDirection & ~out_mask) | (out_value & out_mask)
+
+    def gpioGetDirection(self):
+        return self._gpioDirection
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,306 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Cache for firmware/patch images with pre-built bootloader download frames.
+"""
+
+import hashlib
+import io
+import os
+import struct
+import threading
+import zlib
+from typing import Callable, Dict, List, Tuple
+from intelhex import IntelHex
+
+Segment = Tuple[int, bytes]
+"""A contiguous memory segment: start address and data."""
+
+FrameBuilder = Callable[[List[Segment], int], List[bytes]]
+"""Function that turns the segments into bootloader I2C frames for a given chunk size."""
+
+def computeCrc(data:bytes)->int:
+    """Compute the CRC-32 (IEEE 802.3, as zlib) the bootloader uses for the RAM CRC command.
+
+    Args:
+        data (bytes): the memory content
+
+    Returns:
+        int: the 32-bit CRC
+    """
+    return zlib.crc32(data) & 0xffffffff
+
+class FirmwareImage:
+    """A parsed firmware/patch image with the I2C frames that download it through the bootloader."""
+
+    def __init__(self, digest:str, segments:List[Segment], chunk_size:int, frames:List[bytes]):
+        """Create an image.
+
+        Args:
+            digest (str): SHA-256 of the hex file content
+            segments (List[Segment]): the memory segments of the image
+            chunk_size (int): the number of data bytes per RAM write frame
+            frames (List[bytes]): the complete I2C write frames (register address, command, length, payload, checksum)
+        """
+        self.digest = digest
+        self.segments = segments
+        self.chunk_size = chunk_size
+        self.frames = frames
+        self._crcs:List[int] = None
+
+    @property
+    def size(self)->int:
+        """Number of data bytes in all segments."""
+        return sum(len(data) for _, data in self.segments)
+
+    @property
+    def crcs(self)->List[int]:
+        """CRC-32 of every segment, as the bootloader reports it for the RAM content. Computed on first use."""
+        if self._crcs is None:
+            self._crcs = [ computeCrc(data) for _, data in self.segments ]
+        return self._crcs
+
+    _MAGIC = b"TMFIMG1\0"
+
+    def toBytes(self)->bytes:
+        """Serialize the image for the on-disk cache.
+
+        Returns:
+            bytes: the serialized image
+        """
+        out = io.BytesIO()
+        out.write(self._MAGIC)
+        out.write(struct.pack("<II", self.chunk_size, len(self.segments)))
+        for address, data in self.segments:
+            out.write(struct.pack("<II", address, len(data)))
+            out.write(data)
+        out.write(struct.pack("<I", len(self.frames)))
+        for frame in self.frames:
+            out.write(struct.pack("<H", len(frame)))
+            out.write(frame)
+        return out.getvalue()
+
+    @classmethod
+    def fromBytes(cls, digest:str, blob:bytes)->"FirmwareImage":
+        """De-serialize an image from the on-disk cache.
+
+        Args:
+            digest (str): SHA-256 of the hex file content
+            blob (bytes): the serialized image
+
+        Returns:
+            FirmwareImage: the image, or None if the blob is not a valid image (e.g. truncated or with trailing bytes)
+        """
+        if not blob.startswith(cls._MAGIC):
+            return None
+        try:
+            pos = len(cls._MAGIC)
+            chunk_size, num_segments = struct.unpack_from("<II", blob, pos)
+            pos += 8
+            segments = []
+            for _ in range(num_segments):
+                address, length = struct.unpack_from("<II", blob, pos)
+                pos += 8
+                if pos + length > len(blob):
+                    return None
+                segments.append((address, blob[pos:pos+length]))
+                pos += length
+            num_frames, = struct.unpack_from("<I", blob, pos)
+            pos += 4
+            frames = []
+            for _ in range(num_frames):
+                length, = struct.unpack_from("<H", blob, pos)
+                pos += 2
+                if pos + length > len(blob):
+                    return None
+                frames.append(blob[pos:pos+length])
+                pos += length
+        except struct.error:
+            return None
+        if pos != len(blob):
+            return None
+        return cls(digest, segments, chunk_size, frames)
+
+class DownloadStatistics:
+    """Timing of one download through the bootloader."""
+
+    def __init__(self):
+        self.frames:int = 0
+        """Number of bootloader frames sent (address and RAM write commands)."""
+        self.bytes:int = 0
+        """Number of data bytes written to RAM."""
+        self.polls:int = 0
+        """Number of status reads."""
+        self.seconds:float = 0.0
+        """Duration of the download."""
+        self.pollDelay:float = 0.0
+        """Delay before the first status poll of a RAM write at the start of the download."""
+        self.learnedPollDelay:float = 0.0
+        """Delay before the first status poll at the end of the download, the start value of the next one."""
+        self.misses:int = 0
+        """Number of RAM writes whose first status poll did not see the acknowledge."""
+        self.minAckSeconds:float = None
+        """Smallest time from the end of a RAM write until the read that got the acknowledge completed."""
+        self.maxAckSeconds:float = None
+        """Largest time from the end of a RAM write until the read that got the acknowledge completed."""
+
+    def recordAck(self, seconds:float, missed:bool=False):
+        """Record the acknowledge time of a RAM write.
+
+        Args:
+            seconds (float): time from the end of the write until the read that got the acknowledge completed
+            missed (bool, optional): True if the first poll did not see the acknowledge. Defaults to False.
+        """
+        if self.minAckSeconds is None or seconds < self.minAckSeconds:
+            self.minAckSeconds = seconds
+        if self.maxAckSeconds is None or seconds > self.maxAckSeconds:
+            self.maxAckSeconds = seconds
+        if missed:
+            self.misses += 1
+
+    @property
+    def bytesPerSecond(self)->float:
+        """Download throughput."""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def toDict(self)->dict:
+        return { "frames": self.frames, "bytes": self.bytes, "polls": self.polls, "seconds": self.seconds,
+                 "bytesPerSecond": self.bytesPerSecond, "pollDelay": self.pollDelay, "learnedPollDelay": self.learnedPollDelay,
+                 "misses": self.misses,
+                 "minAckSeconds": self.minAckSeconds, "maxAckSeconds": self.maxAckSeconds }
+
+class FirmwareImageCache:
+    """Cache of firmware images keyed by the SHA-256 of the hex file content (and the chunk size).
+       Images are kept in memory, and optionally in a cache directory, so a repeated download needs no parsing.
+    """
+
+    def __init__(self, cache_dir:str=None, max_entries:int=8):
+        """Create a cache.
+
+        Args:
+            cache_dir (str, optional): Directory for the on-disk cache. If None, only cache in memory. Defaults to None.
+            max_entries (int, optional): Maximum number of images kept in memory. Defaults to 8.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._images:Dict[Tuple[str,int],FirmwareImage] = {}
+        self._fileDigests:Dict[str,Tuple[int,int,str]] = {}
+        self._lock = threading.Lock()
+        self.hits:int = 0
+        self.misses:int = 0
+        self.writeErrors:int = 0
+        """Number of images that could not be stored in the cache directory (e.g. it is read-only)."""
+
+    def _digest(self, hex_file:str)->Tuple[str,bytes]:
+        """Get the content hash of a file. The file is only read if its size or modification time changed.
+
+        Args:
+            hex_file (str): the hex file
+
+        Returns:
+            Tuple[str,bytes]: the SHA-256 hex digest, and the file content if it had to be read (else None)
+        """
+        stat = os.stat(hex_file)
+        known = self._fileDigests.get(hex_file)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2], None
+        with open(hex_file, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        self._fileDigests[hex_file] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest, content
+
+    def _diskPath(self, digest:str, chunk_size:int)->str:
+        return os.path.join(self.cache_dir, "{}_{}.tmfimg".format(digest, chunk_size))
+
+    def _store(self, image:FirmwareImage):
+        """Write an image to the cache directory. It is written to a temporary file that replaces the cache file,
+           so a concurrent reader never sees a partial image. A failed write only costs the parsing next time.
+
+        Args:
+            image (FirmwareImage): the image
+        """
+        path = self._diskPath(image.digest, image.chunk_size)
+        temp = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(image.toBytes())
+            os.replace(temp, path)
+        except OSError:
+            self.writeErrors += 1
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+    @staticmethod
+    def parseHex(content:bytes)->List[Segment]:
+        """Parse the content of an intel hex file.
+
+        Args:
+            content (bytes): the hex file content
+
+        Returns:
+            List[Segment]: the memory segments
+        """
+        intel_hex = IntelHex()
+        intel_hex.loadhex(io.StringIO(content.decode("ascii")))
+        return [ (start, intel_hex.tobinarray(start=start, size=end - start).tobytes()) for start, end in intel_hex.segments() ]
+
+    def load(self, hex_file:str, chunk_size:int, build_frames:FrameBuilder)->FirmwareImage:
+        """Get the image of a hex file, parse it and build the frames only if it is not cached yet.
+
+        Args:
+            hex_file (str): the hex file
+            chunk_size (int): the number of data bytes per RAM write frame
+            build_frames (FrameBuilder): function to build the frames from the segments
+
+        Returns:
+            FirmwareImage: the image
+        """
+        with self._lock:
+            digest, content = self._digest(hex_file)
+            key = (digest, chunk_size)
+            image = self._images.get(key)
+            if image is not None:
+                self.hits += 1
+                return image
+            self.misses += 1
+            if self.cache_dir:
+                try:
+                    with open(self._diskPath(digest, chunk_size), "rb") as f:
+                        image = FirmwareImage.fromBytes(digest, f.read())
+                except OSError:
+                    image = None
+            if image is None:
+                if content is None:
+                    with open(hex_file, "rb") as f:
+                        content = f.read()
+                segments = self.parseHex(content)
+                image = FirmwareImage(digest, segments, chunk_size, build_frames(segments, chunk_size))
+                if self.cache_dir:
+                    self._store(image)
+            if len(self._images) >= self.max_entries:
+                self._images.pop(next(iter(self._images)))     # drop the oldest entry
+            self._images[key] = image
+            return image
+
+    def clear(self):
+        """Drop all images kept in memory. The on-disk cache is not touched."""
+        with self._lock:
+            self._images = {}
+            self._fileDigests = {}
+
+DEFAULT_FIRMWARE_CACHE = FirmwareImageCache()
+"""The in-memory cache shared by all Tmf8x0xApp instances that do not get their own cache."""
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,256 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Per-transaction I2C instrumentation: an IcCom wrapper that counts transactions, bytes and latencies per driver API.
+"""
+
+import __init__
+import functools
+import time
+from typing import Dict, List
+from aos_com.ic_com import IcCom
+
+# local imports
+from tmf8x0x.tmf8x0x_poll import LatencyHistogram
+
+class IcComProxy(IcCom):
+    """IcCom that forwards every call to another IcCom. Base class for wrappers that observe the bus traffic.
+       Attributes that IcCom does not define (e.g. the statistics of an emulator) are looked up in the wrapped object.
+    """
+
+    def __init__(self, com:IcCom):
+        """Wrap an IcCom. IcCom.__init__ is not called, the errors, pins and logging are the ones of the wrapped object.
+
+        Args:
+            com (IcCom): the communication object to forward to
+        """
+        self.com = com
+
+    def __getattr__(self, name:str):
+        return getattr(self.com, name)
+
+    @property
+    def errors(self)->list:
+        return self.com.errors
+
+    @errors.setter
+    def errors(self, errors:list):
+        self.com.errors = errors
+
+    @property
+    def enable_pin(self)->int:
+        return self.com.enable_pin
+
+    @enable_pin.setter
+    def enable_pin(self, pin:int):
+        self.com.enable_pin = pin
+
+    @property
+    def interrupt_pin(self)->int:
+        return self.com.interrupt_pin
+
+    @interrupt_pin.setter
+    def interrupt_pin(self, pin:int):
+        self.com.interrupt_pin = pin
+
+    def __del__(self):
+        pass
+
+    def _log(self, *message):
+        self.com._log(*message)
+
+    def i2cOpen(self, i2c_speed:int=1000000) -> int:
+        return self.com.i2cOpen(i2c_speed=i2c_speed)
+
+    def i2cClose(self) -> int:
+        return self.com.i2cClose()
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        return self.com.i2cTx(devaddr, tx)
+
+    def i2cRx(self, devaddr:int, rx_size:int) -> bytearray:
+        return self.com.i2cRx(devaddr, rx_size)
+
+    def i2cTxRx(self, devaddr:int, tx:list, rx_size:int) -> bytearray:
+        return self.com.i2cTxRx(devaddr, tx, rx_size)
+
+    def gpioGet(self, r_mask:int) -> int:
+        return self.com.gpioGet(r_mask)
+
+    def gpioSet(self, w_mask:int, value:int):
+        return self.com.gpioSet(w_mask, value)
+
+    def gpioSetDirection(self, out_mask:int, out_value:int):
+        return self.com.gpioSetDirection(out_mask, out_value)
+
+    def gpioGetDirection(self):
+        return self.com.gpioGetDirection()
+
+class TagStatistics:
+    """Bus traffic of one tag."""
+
+    def __init__(self):
+        self.transactions:int = 0
+        """Number of I2C transactions."""
+        self.bytesWritten:int = 0
+        self.bytesRead:int = 0
+        self.gpioCalls:int = 0
+        """Number of GPIO reads and writes."""
+        self.latency = LatencyHistogram()
+        """Duration of the I2C transactions."""
+
+    def toDict(self)->dict:
+        return { "transactions": self.transactions, "bytesWritten": self.bytesWritten, "bytesRead": self.bytesRead,
+                 "gpioCalls": self.gpioCalls, "latency": self.latency.toDict() }
+
+class InstrumentedIcCom(IcComProxy):
+    """IcCom wrapper that accounts every transaction to the driver API that caused it.
+       The driver pushes a tag when an instrumented API is entered (see instrumented), nested APIs form a path
+       like "readHistogramsAndResult/readHistogramsUnscaled/histogram_quarter". Transactions outside any API are
+       accounted to UNTAGGED.
+    """
+
+    UNTAGGED = "untagged"
+
+    def __init__(self, com:IcCom):
+        super().__init__(com)
+        self._path:List[str] = []
+        self._current:TagStatistics = None
+        self.statistics:Dict[str,TagStatistics] = {}
+        self._select()
+
+    def _select(self):
+        key = "/".join(self._path) if self._path else self.UNTAGGED
+        stats = self.statistics.get(key)
+        if stats is None:
+            stats = self.statistics[key] = TagStatistics()
+        self._current = stats
+
+    def pushTag(self, tag:str):
+        """Enter an API, all following transactions are accounted to it."""
+        self._path.append(tag)
+        self._select()
+
+    def popTag(self):
+        """Leave the innermost API."""
+        self._path.pop()
+        self._select()
+
+    def snapshot(self)->Dict[str,dict]:
+        """Get the statistics of all tags.
+
+        Returns:
+            Dict[str,dict]: transactions, bytes, GPIO calls and latency distribution per tag path
+        """
+        return { key: stats.toDict() for key, stats in self.statistics.items() if stats.transactions or stats.gpioCalls }
+
+    def reset(self):
+        """Erase all statistics."""
+        self.statistics = {}
+        self._select()
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        start = time.perf_counter()
+        status = self.com.i2cTx(devaddr, tx)
+        stats = self._current
+        stats.latency.record(time.perf_counter() - start)
+        stats.transactions += 1
+        stats.bytesWritten += len(tx)
+        return status
+
+    def i2cRx(self, devaddr:int, rx_size:int) -> bytearray:
+        start = time.perf_counter()
+        rx = self.com.i2cRx(devaddr, rx_size)
+        stats = self._current
+        stats.latency.record(time.perf_counter() - start)
+        stats.transactions += 1
+        stats.bytesRead += len(rx)
+        return rx
+
+    def i2cTxRx(self, devaddr:int, tx:list, rx_size:int) -> bytearray:
+        start = time.perf_counter()
+        rx = self.com.i2cTxRx(devaddr, tx, rx_size)
+        stats = self._current
+        stats.latency.record(time.perf_counter() - start)
+        stats.transactions += 1
+        stats.bytesWritten += len(tx)
+        stats.bytesRead += len(rx)
+        return rx
+
+    def gpioGet(self, r_mask:int) -> int:
+        self._current.gpioCalls += 1
+        return self.com.gpioGet(r_mask)
+
+    def gpioSet(self, w_mask:int, value:int):
+        self._current.gpioCalls += 1
+        return self.com.gpioSet(w_mask, value)
+
+class _NoTag:
+    """Context manager that does nothing, used when instrumentation is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class _Tag:
+    """Context manager that accounts the transactions of a block to a tag."""
+
+    def __init__(self, instrumentation:InstrumentedIcCom, tag:str):
+        self.instrumentation = instrumentation
+        self.tag = tag
+
+    def __enter__(self):
+        self.instrumentation.pushTag(self.tag)
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.popTag()
+        return False
+
+NO_TAG = _NoTag()
+
+def instrumentTag(instrumentation:InstrumentedIcCom, tag:str):
+    """Context manager that accounts the transactions of a block to tag.
+
+    Args:
+        instrumentation (InstrumentedIcCom): the instrumentation, or None if it is off
+        tag (str): the tag
+
+    Returns:
+        the context manager
+    """
+    return NO_TAG if instrumentation is None else _Tag(instrumentation, tag)
+
+def instrumented(tag:str):
+    """Decorator for driver methods: the transactions of the method are accounted to tag.
+       The object must have an _instrumentation attribute (an InstrumentedIcCom, or None if instrumentation is off).
+       With instrumentation off the only cost is one attribute check per call.
+
+    Args:
+        tag (str): the tag, usually the API name
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self._instrumentation
+            if instrumentation is None:
+                return function(self, *args, **kwargs)
+            instrumentation.pushTag(tag)
+            try:
+                return function(self, *args, **kwargs)
+            finally:
+                instrumentation.popTag()
+        return wrapper
+    return decorate
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
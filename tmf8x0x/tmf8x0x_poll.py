@@ -0,0 +1,222 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Polling engine for command completion and bootloader status loops, with per-command statistics.
+"""
+
+import time
+from typing import Callable, Dict
+
+class LatencyHistogram:
+    """HDR-style latency histogram. Values are recorded in microseconds. Every power-of-two range is split
+       into linear sub-buckets, so the relative error of a bucket is bounded independent of the magnitude.
+    """
+
+    def __init__(self, sub_bucket_bits:int=4):
+        """Create an empty histogram.
+
+        Args:
+            sub_bucket_bits (int, optional): log2 of the number of sub-buckets per power-of-two range. Defaults to 4 (buckets at most 1/8 of their value wide).
+        """
+        self._bits = sub_bucket_bits
+        self._subBuckets = 1 << sub_bucket_bits
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded values."""
+        self._counts:Dict[int,int] = {}
+        self.count:int = 0
+        self.totalUs:int = 0
+        self.minUs:int = 0
+        self.maxUs:int = 0
+
+    def _index(self, value:int)->int:
+        if value < self._subBuckets:
+            return value
+        shift = value.bit_length() - self._bits
+        return self._subBuckets + (shift - 1) * (self._subBuckets >> 1) + (value >> shift) - (self._subBuckets >> 1)
+
+    def _lowestValue(self, index:int)->int:
+        if index < self._subBuckets:
+            return index
+        half = self._subBuckets >> 1
+        shift = (index - self._subBuckets) // half + 1
+        return ((index - self._subBuckets) % half + half) << shift
+
+    def record(self, seconds:float):
+        """Record a latency.
+
+        Args:
+            seconds (float): the latency in seconds
+        """
+        value = max(0, round(seconds * 1e6))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        if self.count == 0 or value < self.minUs:
+            self.minUs = value
+        if value > self.maxUs:
+            self.maxUs = value
+        self.count += 1
+        self.totalUs += value
+
+    def percentile(self, percent:float)->int:
+        """Get the value at a percentile.
+
+        Args:
+            percent (float): 0 .. 100
+
+        Returns:
+            int: the lower bound of the bucket that contains the percentile in microseconds, 0 if empty
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, round(percent / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return max(self.minUs, min(self._lowestValue(index), self.maxUs))
+        return self.maxUs
+
+    def merge(self, other:"LatencyHistogram"):
+        """Add the values of another histogram with the same bucket layout."""
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        if other.count:
+            self.minUs = other.minUs if self.count == 0 else min(self.minUs, other.minUs)
+            self.maxUs = max(self.maxUs, other.maxUs)
+        self.count += other.count
+        self.totalUs += other.totalUs
+
+    def toDict(self)->dict:
+        """Summary of the distribution.
+
+        Returns:
+            dict: count, min, mean, percentiles and max in microseconds, plus the non-empty buckets
+        """
+        return { "count": self.count,
+                 "minUs": self.minUs,
+                 "meanUs": self.totalUs / self.count if self.count else 0.0,
+                 "p50Us": self.percentile(50),
+                 "p90Us": self.percentile(90),
+                 "p99Us": self.percentile(99),
+                 "maxUs": self.maxUs,
+                 "buckets": { self._lowestValue(index): self._counts[index] for index in sorted(self._counts) } }
+
+class PollStatistics:
+    """Statistics of all polls for one command."""
+
+    def __init__(self):
+        self.calls:int = 0
+        """How often the command was waited for."""
+        self.polls:int = 0
+        """Total number of polls (I2C reads) for this command."""
+        self.maxPolls:int = 0
+        """Highest number of polls needed for one call."""
+        self.timeouts:int = 0
+        """Number of calls that timed out."""
+        self.latency = LatencyHistogram()
+        """Time from the start of the wait until the condition was met (timeouts are not recorded)."""
+
+    def toDict(self)->dict:
+        return { "calls": self.calls, "polls": self.polls, "maxPolls": self.maxPolls, "timeouts": self.timeouts,
+                 "latency": self.latency.toDict() }
+
+class Poller:
+    """Polling engine shared by all command/bootloader wait loops.
+       The first poll is done immediately. If the condition is not met, the poller sleeps until the
+       expected latency of the command has passed, and then polls with an exponentially growing interval.
+       All deadlines use a monotonic clock.
+    """
+
+    def __init__(self, expected_latency:Dict[str,float]=None, min_interval:float=0.0001, max_interval:float=0.005, backoff:float=2.0):
+        """Create a poller.
+
+        Args:
+            expected_latency (Dict[str,float], optional): expected completion time in seconds per command name. Defaults to an empty table.
+            min_interval (float, optional): first poll interval after the expected latency has passed. Defaults to 0.0001.
+            max_interval (float, optional): upper limit of the poll interval. Defaults to 0.005.
+            backoff (float, optional): factor to grow the poll interval after every unsuccessful poll. Defaults to 2.0.
+        """
+        self.expected_latency:Dict[str,float] = dict(expected_latency) if expected_latency else {}
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.statistics:Dict[str,PollStatistics] = {}
+
+    def poll(self, key:str, condition:Callable[[],object], timeout:float)->object:
+        """Call condition until it returns a value that is not None/False, or the timeout expired.
+           The condition is evaluated at least once.
+
+        Args:
+            key (str): command name, selects the expected latency and the statistics entry
+            condition (Callable[[],object]): function that performs one poll
+            timeout (float): maximum time to poll in seconds
+
+        Returns:
+            object: the value returned by condition, None on timeout
+        """
+        stats = self.statistics.get(key)
+        if stats is None:
+            stats = self.statistics[key] = PollStatistics()
+        start = time.monotonic()
+        deadline = start + timeout
+        expected = start + self.expected_latency.get(key, 0.0)
+        interval = self.min_interval
+        polls = 0
+        while True:
+            value = condition()
+            polls += 1
+            now = time.monotonic()
+            if value:
+                stats.latency.record(now - start)
+                break
+            if now > deadline:
+                stats.timeouts += 1
+                value = None
+                break
+            if now < expected:
+                pause = expected - now          # the command cannot be done yet, do not load the bus
+            else:
+                pause = interval
+                interval = min(interval * self.backoff, self.max_interval)
+            time.sleep(min(pause, max(0.0, deadline - now)))
+        stats.calls += 1
+        stats.polls += polls
+        stats.maxPolls = max(stats.maxPolls, polls)
+        return value
+
+    def getStatistics(self)->Dict[str,dict]:
+        """Get the statistics of all commands.
+
+        Returns:
+            Dict[str,dict]: poll counts and latency distribution per command name
+        """
+        return { key: stats.toDict() for key, stats in self.statistics.items() }
+
+    def measuredLatencies(self, percent:float=1.0)->Dict[str,float]:
+        """Get the completion time of every command from the recorded latencies, e.g. to fill an expected latency table.
+           The values are only meaningful for a poller without expected latencies and without backoff
+           (Poller(min_interval=0.00005, backoff=1.0)), else the latencies contain the poller's own waiting.
+
+        Args:
+            percent (float, optional): percentile of the latency distribution. Defaults to 1.0 (nearly the fastest completion).
+
+        Returns:
+            Dict[str,float]: latency in seconds per command name with at least one completed call
+        """
+        return { key: stats.latency.percentile(percent) * 1e-6 for key, stats in self.statistics.items() if stats.latency.count }
+
+    def resetStatistics(self):
+        """Erase all statistics."""
+        self.statistics = {}
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,350 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Recording of the bus traffic between driver and device into a compact binary log, and an IcCom that replays such a log.
+
+Log format (little endian):
+    header:  magic "TMF8X0XI", version (uint16), start time (float64, seconds since the epoch), enable pin (uint32), interrupt pin (uint32)
+    records: kind (uint8), start (uint32, microseconds after the start of the previous record), duration (uint32, microseconds),
+             address (uint8), length of the request (uint16), length of the response (uint16), request bytes, response bytes
+"""
+
+import __init__
+import struct
+import time
+from typing import BinaryIO, Iterator, List, Union
+from aos_com.ic_com import IcCom
+
+# local imports
+from tmf8x0x.tmf8x0x_instrument import IcComProxy
+
+LOG_MAGIC = b"TMF8X0XI"
+LOG_VERSION = 1
+_HEADER = struct.Struct("<8sHdII")
+_RECORD = struct.Struct("<BIIBHH")
+_INT = struct.Struct("<i")
+_UINT = struct.Struct("<I")
+_UINT2 = struct.Struct("<II")
+
+class LogRecord:
+    """One call of the bus traffic log."""
+    __slots__ = ("kind", "time", "duration", "address", "request", "response")
+
+    I2C_TX = 1
+    """i2cTx: request is the written data, response the status (int32)."""
+    I2C_TXRX = 2
+    """i2cTxRx: request is the written data, response the read data."""
+    I2C_RX = 3
+    """i2cRx: request is empty, response the read data."""
+    GPIO_GET = 4
+    """gpioGet: request is the mask (uint32), response the levels (uint32)."""
+    GPIO_SET = 5
+    """gpioSet: request is mask and value (uint32 each), no response."""
+    GPIO_SET_DIRECTION = 6
+    """gpioSetDirection: request is mask and value (uint32 each), no response."""
+    I2C_OPEN = 7
+    """i2cOpen: request is the speed (uint32), response the status (int32)."""
+    I2C_CLOSE = 8
+    """i2cClose: no request, response the status (int32)."""
+
+    NAMES = { I2C_TX: "i2cTx", I2C_TXRX: "i2cTxRx", I2C_RX: "i2cRx", GPIO_GET: "gpioGet", GPIO_SET: "gpioSet",
+              GPIO_SET_DIRECTION: "gpioSetDirection", I2C_OPEN: "i2cOpen", I2C_CLOSE: "i2cClose" }
+
+    def __init__(self, kind:int, time:float, duration:float, address:int, request:bytes, response:bytes):
+        self.kind = kind
+        self.time = time
+        """Start of the call in seconds after the start of the recording."""
+        self.duration = duration
+        """Duration of the call in seconds."""
+        self.address = address
+        self.request = request
+        self.response = response
+
+    def __repr__(self)->str:
+        return "{}(0x{:02x}, {}, {}) at {:.6f}s".format(self.NAMES.get(self.kind, self.kind), self.address, self.request.hex(),
+                                                      self.response.hex(), self.time)
+
+class RecordingIcCom(IcComProxy):
+    """IcCom wrapper that writes every call and its result to a binary log, e.g.:
+
+        com = RecordingIcCom(EvmFtdi(), "session.tmflog")
+        tof = Tmf8x0xApp(ic_com=com)
+        ...
+        com.closeLog()
+
+       A record costs 14 bytes plus the transferred data. The records go through a buffered file, the cost per call
+       is one struct pack and a buffered write.
+    """
+
+    def __init__(self, com:IcCom, log_file:Union[str,BinaryIO], buffer_size:int=1 << 16):
+        """Start a recording.
+
+        Args:
+            com (IcCom): the communication object to record
+            log_file (Union[str,BinaryIO]): file name, or a binary file object (it is not closed by closeLog)
+            buffer_size (int, optional): write buffer size in bytes if a file name is given. Defaults to 64 KiB.
+        """
+        super().__init__(com)
+        if isinstance(log_file, str):
+            self._file = open(log_file, "wb", buffering=buffer_size)
+            self._ownsFile = True
+        else:
+            self._file = log_file
+            self._ownsFile = False
+        self._t0 = time.perf_counter()
+        self._last = self._t0
+        self.records:int = 0
+        """Number of records written."""
+        self._file.write(_HEADER.pack(LOG_MAGIC, LOG_VERSION, time.time(), com.enable_pin or 0, com.interrupt_pin or 0))
+
+    def _record(self, kind:int, start:float, address:int, request:bytes, response:bytes):
+        end = time.perf_counter()
+        delta = min(int((start - self._last) * 1e6), 0xffffffff)
+        self._last = start
+        write = self._file.write
+        write(_RECORD.pack(kind, max(0, delta), min(int((end - start) * 1e6), 0xffffffff), address & 0xff, len(request), len(response)))
+        write(request)
+        write(response)
+        self.records += 1
+
+    def flushLog(self):
+        """Write the buffered records to the file."""
+        self._file.flush()
+
+    def closeLog(self):
+        """Finish the recording, later calls are forwarded but not recorded."""
+        if self._file is not None:
+            self._file.flush()
+            if self._ownsFile:
+                self._file.close()
+            self._file = None
+
+    def i2cOpen(self, i2c_speed:int=1000000) -> int:
+        start = time.perf_counter()
+        status = self.com.i2cOpen(i2c_speed=i2c_speed)
+        if self._file is not None:
+            self._record(LogRecord.I2C_OPEN, start, 0, _UINT.pack(i2c_speed & 0xffffffff), _INT.pack(status))
+        return status
+
+    def i2cClose(self) -> int:
+        start = time.perf_counter()
+        status = self.com.i2cClose()
+        if self._file is not None:
+            self._record(LogRecord.I2C_CLOSE, start, 0, b"", _INT.pack(status))
+        return status
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        start = time.perf_counter()
+        status = self.com.i2cTx(devaddr, tx)
+        if self._file is not None:
+            self._record(LogRecord.I2C_TX, start, devaddr, bytes(tx), _INT.pack(status))
+        return status
+
+    def i2cRx(self, devaddr:int, rx_size:int) -> bytearray:
+        start = time.perf_counter()
+        rx = self.com.i2cRx(devaddr, rx_size)
+        if self._file is not None:
+            self._record(LogRecord.I2C_RX, start, devaddr, b"", bytes(rx))
+        return rx
+
+    def i2cTxRx(self, devaddr:int, tx:list, rx_size:int) -> bytearray:
+        start = time.perf_counter()
+        rx = self.com.i2cTxRx(devaddr, tx, rx_size)
+        if self._file is not None:
+            self._record(LogRecord.I2C_TXRX, start, devaddr, bytes(tx), bytes(rx))
+        return rx
+
+    def gpioGet(self, r_mask:int) -> int:
+        start = time.perf_counter()
+        levels = self.com.gpioGet(r_mask)
+        if self._file is not None:
+            self._record(LogRecord.GPIO_GET, start, 0, _UINT.pack(r_mask), _UINT.pack(levels))
+        return levels
+
+    def gpioSet(self, w_mask:int, value:int):
+        start = time.perf_counter()
+        result = self.com.gpioSet(w_mask, value)
+        if self._file is not None:
+            self._record(LogRecord.GPIO_SET, start, 0, _UINT2.pack(w_mask, value & w_mask), b"")
+        return result
+
+    def gpioSetDirection(self, out_mask:int, out_value:int):
+        start = time.perf_counter()
+        result = self.com.gpioSetDirection(out_mask, out_value)
+        if self._file is not None:
+            self._record(LogRecord.GPIO_SET_DIRECTION, start, 0, _UINT2.pack(out_mask, out_value & out_mask), b"")
+        return result
+
+def readLog(log_file:Union[str,BinaryIO])->Iterator[LogRecord]:
+    """Read the records of a bus traffic log.
+
+    Args:
+        log_file (Union[str,BinaryIO]): file name or binary file object
+
+    Returns:
+        Iterator[LogRecord]: the records in the recorded order
+    """
+    return iter(readLogData(log_file)[1])
+
+def readLogData(log_file:Union[str,BinaryIO])->tuple:
+    """Read a bus traffic log completely.
+
+    Args:
+        log_file (Union[str,BinaryIO]): file name or binary file object
+
+    Returns:
+        tuple: (start time, version, enable pin, interrupt pin), list of LogRecord
+    """
+    if isinstance(log_file, str):
+        with open(log_file, "rb") as f:
+            blob = f.read()
+    else:
+        blob = log_file.read()
+    if len(blob) < _HEADER.size:
+        raise ValueError("not a TMF8x0x bus log (too short)")
+    magic, version, startTime, enablePin, interruptPin = _HEADER.unpack_from(blob, 0)
+    if magic != LOG_MAGIC:
+        raise ValueError("not a TMF8x0x bus log")
+    if version > LOG_VERSION:
+        raise ValueError("bus log version {} is not supported".format(version))
+    records:List[LogRecord] = []
+    offset = _HEADER.size
+    now = 0
+    view = memoryview(blob)
+    while offset + _RECORD.size <= len(blob):
+        kind, delta, duration, address, requestSize, responseSize = _RECORD.unpack_from(blob, offset)
+        offset += _RECORD.size
+        if offset + requestSize + responseSize > len(blob):
+            break                                   # truncated last record, e.g. the recording process was killed
+        now += delta
+        request = bytes(view[offset:offset + requestSize])
+        offset += requestSize
+        response = bytes(view[offset:offset + responseSize])
+        offset += responseSize
+        records.append(LogRecord(kind, now * 1e-6, duration * 1e-6, address, request, response))
+    return (startTime, version, enablePin, interruptPin), records
+
+class ReplayIcCom(IcCom):
+    """IcCom that answers the driver calls from a recorded bus traffic log, no hardware needed. E.g.:
+
+        tof = Tmf8x0xApp(ic_com=ReplayIcCom("session.tmflog"))
+
+       Every call is compared with the next record. If the driver polls a register more (or less) often than in the
+       recording, because its timeouts depend on the host speed, the repeated record is answered again (or skipped).
+       Any other difference is a replay error.
+    """
+
+    def __init__(self, log_file:Union[str,BinaryIO], realtime:bool=False, log:bool=False, exception_on_error:bool=True):
+        """Load a recording.
+
+        Args:
+            log_file (Union[str,BinaryIO]): file name or binary file object of the recording
+            realtime (bool, optional): If True, every call is answered at its recorded time and takes its recorded duration,
+                else as fast as possible. Defaults to False.
+            log (bool, optional): Print messages. Defaults to False.
+            exception_on_error (bool, optional): Raise an exception if the driver deviates from the recording. Defaults to True.
+        """
+        super().__init__(log, exception_on_error)
+        header, self.records = readLogData(log_file)
+        self.startTime, self.version, enablePin, interruptPin = header
+        self.enable_pin = enablePin
+        self.interrupt_pin = interruptPin
+        self.realtime = realtime
+        self.position:int = 0
+        """Index of the next record."""
+        self.repeated:int = 0
+        """Number of calls answered with a repeated poll record."""
+        self.skipped:int = 0
+        """Number of poll records skipped because the driver polled less often."""
+        self._t0:float = None
+
+    def __del__(self):
+        pass
+
+    @property
+    def finished(self)->bool:
+        """True if all records were replayed."""
+        return self.position >= len(self.records)
+
+    def _wait(self, record:LogRecord):
+        if not self.realtime:
+            return
+        if self._t0 is None:
+            self._t0 = time.perf_counter() - record.time
+        delay = self._t0 + record.time + record.duration - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    @staticmethod
+    def _matches(record:LogRecord, kind:int, address:int, request:bytes)->bool:
+        return record.kind == kind and record.address == address & 0xff and record.request == request
+
+    def _next(self, kind:int, address:int, request:bytes, fn_name:str)->LogRecord:
+        """Find the record for a call.
+
+        Returns:
+            LogRecord: the record, None if the call does not match the recording
+        """
+        records = self.records
+        previous = records[self.position - 1] if self.position > 0 else None
+        # the driver polled less often than recorded: skip the remaining repetitions of the previous poll
+        while (previous is not None and self.position < len(records) and not self._matches(records[self.position], kind, address, request)
+               and self._matches(records[self.position], previous.kind, previous.address, previous.request)):
+            self.position += 1
+            self.skipped += 1
+        if self.position < len(records) and self._matches(records[self.position], kind, address, request):
+            record = records[self.position]
+            self.position += 1
+            self._wait(record)
+            return record
+        # the driver polled more often than recorded: repeat the answer of the previous poll
+        if previous is not None and self._matches(previous, kind, address, request) and kind in (LogRecord.I2C_TXRX, LogRecord.GPIO_GET):
+            self.repeated += 1
+            return previous
+        expected = records[self.position] if self.position < len(records) else "end of recording"
+        self._setError("replay mismatch at record {}: {}(0x{:02x}, {}), recorded {}".format(self.position, LogRecord.NAMES[kind],
+                       address & 0xff, request.hex(), expected), fn_name)
+        return None
+
+    def i2cOpen(self, i2c_speed:int=1000000) -> int:
+        record = self._next(LogRecord.I2C_OPEN, 0, _UINT.pack(i2c_speed & 0xffffffff), "i2cOpen")
+        return _INT.unpack(record.response)[0] if record else self.I2C_OK
+
+    def i2cClose(self) -> int:
+        record = self._next(LogRecord.I2C_CLOSE, 0, b"", "i2cClose")
+        return _INT.unpack(record.response)[0] if record else self.I2C_OK
+
+    def i2cTx(self, devaddr:int, tx:list) -> int:
+        record = self._next(LogRecord.I2C_TX, devaddr, bytes(tx), "i2cTx")
+        return _INT.unpack(record.response)[0] if record else self._ERROR_PARAMETER_OUT_OF_RANGE
+
+    def i2cRx(self, devaddr:int, rx_size:int) -> bytearray:
+        record = self._next(LogRecord.I2C_RX, devaddr, b"", "i2cRx")
+        return bytearray(record.response) if record else bytearray()
+
+    def i2cTxRx(self, devaddr:int, tx:list, rx_size:int) -> bytearray:
+        record = self._next(LogRecord.I2C_TXRX, devaddr, bytes(tx), "i2cTxRx")
+        return bytearray(record.response) if record else bytearray()
+
+    def gpioGet(self, r_mask:int) -> int:
+        record = self._next(LogRecord.GPIO_GET, 0, _UINT.pack(r_mask), "gpioGet")
+        return _UINT.unpack(record.response)[0] if record else 0
+
+    def gpioSet(self, w_mask:int, value:int):
+        self._next(LogRecord.GPIO_SET, 0, _UINT2.pack(w_mask, value & w_mask), "gpioSet")
+
+    def gpioSetDirection(self, out_mask:int, out_value:int):
+        self._next(LogRecord.GPIO_SET_DIRECTION, 0, _UINT2.pack(out_mask, out_value & out_mask), "gpioSetDirection")
+
+    def gpioGetDirection(self):
+        return 0
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,160 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Result frames decoded straight into a preallocated NumPy structured ring buffer.
+"""
+
+import __init__
+import ctypes
+from typing import Tuple
+import numpy
+
+# local imports
+from tmf8x0x.auto.tmf8806_regs import tmf8806DistanceResultFrame
+
+RESULT_FRAME_DTYPE = numpy.dtype([
+    ("resultNum",       numpy.uint8),
+    ("reliability",     numpy.uint8),
+    ("resultStatus",    numpy.uint8),
+    ("distPeak",        "<u2"),
+    ("sysClock",        "<u4"),
+    ("stateData",       numpy.uint8, (11,)),
+    ("temperature",     numpy.int8),
+    ("referenceHits",   "<u4"),
+    ("objectHits",      "<u4"),
+    ("xtalk",           "<u2"),
+])
+"""Packed record with the fields of tmf8806DistanceResultFrame. The reliability (6 bits) and resultStatus (2 bits) bitfields
+   of the device frame are separate bytes here, all other fields have the same layout as on the wire, shifted by one byte."""
+
+RESULT_FRAME_SIZE = ctypes.sizeof(tmf8806DistanceResultFrame)
+"""Size of a result frame on the wire (without the 4 header bytes)."""
+
+class ResultRingBuffer:
+    """Ring buffer of decoded result frames. Every frame is decoded from the I2C read buffer into the next slot.
+       The frames are returned as views into the ring, they stay valid until the slot is overwritten capacity frames later.
+       A push is not cheaper than a ctypes result frame (about 1.3 us against 0.4 us per frame), the ring pays off
+       because no object is kept per frame and columns like frames["distPeak"] are arrays.
+    """
+
+    def __init__(self, capacity:int=1024):
+        """Allocate the ring.
+
+        Args:
+            capacity (int, optional): Number of frames the ring holds. Defaults to 1024.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._storage = bytearray(capacity * RESULT_FRAME_DTYPE.itemsize)      # bytearray slicing is cheaper than a memoryview of numpy memory
+        self.frames = numpy.frombuffer(self._storage, dtype=RESULT_FRAME_DTYPE)
+        """The slots, in ring order. Use views() for the frames in chronological order."""
+        self.count:int = 0
+        """Number of frames pushed since the ring was created or cleared, including the overwritten ones."""
+
+    def __len__(self)->int:
+        return min(self.count, self.capacity)
+
+    def clear(self):
+        """Forget all frames, the memory is kept."""
+        self.count = 0
+
+    def push(self, buffer, offset:int=0)->numpy.void:
+        """Decode a result frame into the next slot.
+
+        Args:
+            buffer: bytes-like object with the frame as read from the device (e.g. the bytearray of i2cTxRx)
+            offset (int, optional): Position of the frame in buffer, e.g. 4 if the header registers were read too. Defaults to 0.
+
+        Returns:
+            numpy.void: the decoded frame, a view into the ring
+        """
+        index = self.count % self.capacity
+        slot = index * RESULT_FRAME_DTYPE.itemsize
+        out = self._storage
+        out[slot + 1:slot + 1 + RESULT_FRAME_SIZE] = buffer[offset:offset + RESULT_FRAME_SIZE]     # one copy, one byte ahead
+        status = out[slot + 2]
+        out[slot] = out[slot + 1]           # resultNum
+        out[slot + 1] = status & 0x3f       # reliability
+        out[slot + 2] = status >> 6         # resultStatus
+        self.count += 1
+        return self.frames[index]
+
+    @property
+    def latest(self)->numpy.void:
+        """The most recent frame (a view into the ring), None if the ring is empty."""
+        if self.count == 0:
+            return None
+        return self.frames[(self.count - 1) % self.capacity]
+
+    def __getitem__(self, index:int)->numpy.void:
+        """Frame by chronological index: 0 is the oldest frame still in the ring, -1 the most recent one."""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("ring index out of range")
+        return self.frames[(self.count - size + index) % self.capacity]
+
+    def views(self)->Tuple[numpy.ndarray, numpy.ndarray]:
+        """The frames in chronological order as two views into the ring (the second one is empty if the ring did not wrap).
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: older and newer part
+        """
+        if self.count <= self.capacity:
+            return self.frames[:self.count], self.frames[:0]
+        start = self.count % self.capacity
+        return self.frames[start:], self.frames[:start]
+
+    def toArray(self)->numpy.ndarray:
+        """Copy of the frames in chronological order.
+
+        Returns:
+            numpy.ndarray: array of RESULT_FRAME_DTYPE records
+        """
+        return numpy.concatenate(self.views())
+
+def decodeResultFrames(frames)->numpy.ndarray:
+    """Decode many result frames at once, the array form of ResultRingBuffer.push (e.g. for the #RES rows of a CSV file).
+
+    Args:
+        frames: uint8 array-like with RESULT_FRAME_SIZE bytes per frame (n x RESULT_FRAME_SIZE)
+
+    Returns:
+        numpy.ndarray: array of n RESULT_FRAME_DTYPE records
+    """
+    frames = numpy.asarray(frames, dtype=numpy.uint8).reshape(-1, RESULT_FRAME_SIZE)
+    records = numpy.zeros(len(frames), dtype=RESULT_FRAME_DTYPE)
+    out = records.view(numpy.uint8).reshape(len(frames), RESULT_FRAME_DTYPE.itemsize)
+    out[:, 0] = frames[:, 0]
+    out[:, 1] = frames[:, 1] & 0x3f     # reliability
+    out[:, 2] = frames[:, 1] >> 6       # resultStatus
+    out[:, 3:] = frames[:, 2:]
+    return records
+
+def recordToResultFrame(record:numpy.void)->tmf8806DistanceResultFrame:
+    """Convert a ring record back into the ctypes result frame, e.g. for code that expects readResultFrameInt results.
+
+    Args:
+        record (numpy.void): a RESULT_FRAME_DTYPE record
+
+    Returns:
+        tmf8806DistanceResultFrame: the result frame
+    """
+    raw = numpy.frombuffer(record.tobytes(), dtype=numpy.uint8)
+    wire = bytearray(RESULT_FRAME_SIZE)
+    wire[0] = raw[0]
+    wire[1] = (raw[1] & 0x3f) | ((raw[2] & 0x3) << 6)
+    wire[2:] = raw[3:].tobytes()
+    return tmf8806DistanceResultFrame.from_buffer(wire)
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
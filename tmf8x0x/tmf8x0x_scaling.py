@@ -0,0 +1,66 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Vectorized histogram bin scaling. Works on single histograms (bins), histogram sets (channels x bins) and
+recordings (frames x channels x bins) alike, online and on archived raw histograms.
+"""
+
+import numpy
+
+SHIFT_BIN_CHANNEL0:int = 127        # bins 0..126 are shifted left by the value of this bin
+SHIFT_BIN_CHANNEL1:int = 255        # bins 128..254 are shifted left by the value of this bin
+SUM_FACTOR:int = 4                  # scale factor of summed histograms
+PUC_FACTOR:int = 2                  # scale factor of pile-up corrected histograms
+
+def _output(bins:numpy.ndarray, out:numpy.ndarray)->numpy.ndarray:
+    """The array to scale into: out (filled with bins unless it is bins), or a new array wide enough for the scaled values."""
+    if out is None:
+        return numpy.array(bins, dtype=numpy.promote_types(bins.dtype, numpy.uint32))
+    if out is not bins:
+        out[...] = bins
+    return out
+
+def shiftScale(bins, out:numpy.ndarray=None)->numpy.ndarray:
+    """Scale histograms with the per-channel shift factors in bin 127 (channel 0) and bin 255 (channel 1).
+       The shift bins themselves are kept. Histograms with less than 256 bins are not scaled.
+
+    Args:
+        bins: raw bins, shape (..., bins)
+        out (numpy.ndarray, optional): Array for the result, e.g. bins itself to scale in place. Its type must hold the scaled values.
+            Defaults to None (a new array of at least uint32).
+
+    Returns:
+        numpy.ndarray: the scaled bins
+    """
+    bins = numpy.asarray(bins)
+    out = _output(bins, out)
+    if out.shape[-1] > SHIFT_BIN_CHANNEL1:
+        out[..., 0:SHIFT_BIN_CHANNEL0] <<= out[..., SHIFT_BIN_CHANNEL0:SHIFT_BIN_CHANNEL0 + 1]
+        out[..., SHIFT_BIN_CHANNEL0 + 1:SHIFT_BIN_CHANNEL1] <<= out[..., SHIFT_BIN_CHANNEL1:SHIFT_BIN_CHANNEL1 + 1]
+    return out
+
+def factorScale(bins, factor:int, out:numpy.ndarray=None)->numpy.ndarray:
+    """Scale histograms with a fixed factor (SUM_FACTOR, PUC_FACTOR).
+
+    Args:
+        bins: raw bins, any shape
+        factor (int): the scale factor
+        out (numpy.ndarray, optional): Array for the result, e.g. bins itself to scale in place. Defaults to None (a new array of at least uint32).
+
+    Returns:
+        numpy.ndarray: the scaled bins
+    """
+    bins = numpy.asarray(bins)
+    out = _output(bins, out)
+    out *= factor
+    return out
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,426 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Append-only binary session log of measurement frames (histograms and result), a memory-mapped reader and a converter
+to the CSV format of the EVM GUI (HistogramsAndResult.toCSV).
+
+Log format (little endian):
+    header:  magic "TMF8X0XS", version (uint16), start time (float64, seconds since the epoch), result frame size (uint16)
+    records: kind (uint8), tag (uint8), rows (uint16), payload length (uint32), payload
+        RESULT          payload is the host time (float64) and the result frame as read from the device, fixed size. Ends a frame.
+        HISTOGRAMS_U16  raw histograms (rows x bins, uint16) as read by readHistogramsUnscaled, tag is the Histogram type
+        HISTOGRAMS_U32  scaled histograms (rows x bins, uint32) of a HistogramsAndResult, tag is the Histogram type
+        INDEX           offset of the previous INDEX record (uint64, 0 if none), then one INDEX_DTYPE entry per frame
+                        since the previous INDEX record
+        END             offset of the last INDEX record (uint64), written by close
+    A frame is all histogram records followed by its RESULT record. A log without END (e.g. the process was killed)
+    is read by scanning the records, a truncated last record is ignored.
+"""
+
+import __init__
+import csv
+import mmap
+import struct
+import time
+from typing import BinaryIO, Dict, Iterator, Union
+import numpy
+
+# local imports
+from tmf8x0x.tmf8x0x_app import Histogram, HistogramsAndResult, Tmf8x0xApp
+from tmf8x0x.tmf8x0x_results import ResultRingBuffer, RESULT_FRAME_SIZE
+from tmf8x0x.auto.tmf8806_regs import tmf8806DistanceResultFrame
+
+SESSION_MAGIC = b"TMF8X0XS"
+SESSION_VERSION = 1
+_HEADER = struct.Struct("<8sHdH")
+_RECORD = struct.Struct("<BBHI")
+_TIME = struct.Struct("<d")
+_OFFSET = struct.Struct("<Q")
+
+RESULT = 1
+HISTOGRAMS_U16 = 2
+HISTOGRAMS_U32 = 3
+INDEX = 4
+END = 5
+
+INDEX_DTYPE = numpy.dtype([ ("offset", "<u8"), ("resultNum", numpy.uint8), ("sysClock", "<u4"), ("hostTime", "<f8") ])
+"""Index entry of a frame: file offset of its first record, result number, device time stamp and host time."""
+
+PROC_PUC_TAG = 0x80 | Histogram.HISTOGRAM_PUC
+"""Tag of the pile-up corrected proximity histograms, they have no Histogram type of their own."""
+
+HISTOGRAM_TAGS:Dict[str,int] = { kind: histogram_type for histogram_type, kind in Tmf8x0xApp.HISTOGRAM_KINDS.items() }
+HISTOGRAM_TAGS[HistogramsAndResult.PROC_PUC] = PROC_PUC_TAG
+"""Record tag per HistogramsAndResult attribute."""
+
+_TAG_KINDS:Dict[int,str] = { tag: kind for kind, tag in HISTOGRAM_TAGS.items() }
+_SYS_CLOCK_OFFSET = 4           # sysClock in the result frame (resultNum, status, distPeak (2))
+
+class SessionLogWriter:
+    """Writes frames to a session log, e.g.:
+
+        with SessionLogWriter("session.tmfs") as log:
+            while ...:
+                status, hr = tof.readHistogramsAndResult(hr=hr)
+                log.write(hr)
+
+       The cost of a frame is a few buffered writes of the histogram blocks, no conversion to text.
+    """
+
+    def __init__(self, log_file:Union[str,BinaryIO], index_interval:int=64, buffer_size:int=1 << 16):
+        """Start a log.
+
+        Args:
+            log_file (Union[str,BinaryIO]): file name, or a binary file object (it is not closed by close)
+            index_interval (int, optional): Number of frames between two INDEX records. Defaults to 64.
+            buffer_size (int, optional): write buffer size in bytes if a file name is given. Defaults to 64 KiB.
+        """
+        if index_interval < 1:
+            raise ValueError("index_interval must be at least 1")
+        if isinstance(log_file, str):
+            self._file = open(log_file, "wb", buffering=buffer_size)
+            self._ownsFile = True
+        else:
+            self._file = log_file
+            self._ownsFile = False
+        self.index_interval = index_interval
+        self.frames:int = 0
+        """Number of frames written."""
+        self.bytesWritten:int = 0
+        """Size of the log so far in bytes."""
+        self._frameStart:int = None
+        self._entries:list = []
+        self._lastIndex:int = 0
+        self._write(_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, time.time(), RESULT_FRAME_SIZE))
+
+    def __enter__(self)->"SessionLogWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write(self, data):
+        self._file.write(data)
+        self.bytesWritten += len(data)
+
+    def _record(self, kind:int, tag:int, rows:int, payload):
+        if self._file is None:
+            raise ValueError("the session log is closed")
+        if self._frameStart is None and kind not in (INDEX, END):
+            self._frameStart = self.bytesWritten
+        self._write(_RECORD.pack(kind, tag, rows, len(payload)))
+        self._write(payload)
+
+    def writeHistograms(self, histograms:numpy.ndarray, histogram_type:int):
+        """Add histograms to the current frame, e.g. a raw set of readHistogramsUnscaled.
+
+        Args:
+            histograms (numpy.ndarray): channels x bins, uint16 (raw) or uint32 (scaled)
+            histogram_type (int): Histogram.HISTOGRAM_... type, or PROC_PUC_TAG (raw blocks are scaled like HISTOGRAM_PUC)
+        """
+        histograms = numpy.ascontiguousarray(histograms)
+        if histograms.ndim == 1:
+            histograms = histograms.reshape(1, -1)
+        if histograms.dtype == numpy.uint16:
+            kind = HISTOGRAMS_U16
+        else:
+            kind = HISTOGRAMS_U32
+            histograms = histograms.astype("<u4", copy=False)
+        self._record(kind, histogram_type, len(histograms), memoryview(histograms).cast("B"))
+
+    def writeResult(self, result:tmf8806DistanceResultFrame, host_time:float=None):
+        """Finish the current frame with its result.
+
+        Args:
+            result (tmf8806DistanceResultFrame): the result frame
+            host_time (float, optional): time of the result in seconds since the epoch. Defaults to now.
+        """
+        host_time = time.time() if host_time is None else host_time
+        wire = bytes(result)
+        self._record(RESULT, 0, 1, _TIME.pack(host_time) + wire)
+        self._entries.append((self._frameStart, wire[0], int.from_bytes(wire[_SYS_CLOCK_OFFSET:_SYS_CLOCK_OFFSET + 4], "little"), host_time))
+        self._frameStart = None
+        self.frames += 1
+        if len(self._entries) >= self.index_interval:
+            self._writeIndex()
+
+    def write(self, hr:HistogramsAndResult, host_time:float=None):
+        """Write a frame: all histograms of hr (as scaled uint32 blocks) and its result.
+
+        Args:
+            hr (HistogramsAndResult): histograms and result
+            host_time (float, optional): time of the result in seconds since the epoch. Defaults to now.
+        """
+        for kind, tag in HISTOGRAM_TAGS.items():
+            histograms = getattr(hr, kind)
+            if len(histograms):
+                self.writeHistograms(histograms, tag)
+        self.writeResult(hr.result, host_time)
+
+    def _writeIndex(self):
+        offset = self.bytesWritten
+        self._record(INDEX, 0, len(self._entries), _OFFSET.pack(self._lastIndex) + numpy.array(self._entries, dtype=INDEX_DTYPE).tobytes())
+        self._lastIndex = offset
+        self._entries = []
+
+    def flush(self):
+        """Write the buffered records to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Write the last index and the END record, and close the file."""
+        if self._file is None:
+            return
+        if self._entries:
+            self._writeIndex()
+        self._record(END, 0, 0, _OFFSET.pack(self._lastIndex))
+        self._file.flush()
+        if self._ownsFile:
+            self._file.close()
+        self._file = None
+
+class SessionLogReader:
+    """Memory-mapped reader of a session log. Frames are found with the index, only the accessed records are read:
+
+        with SessionLogReader("session.tmfs") as log:
+            hr = log[log.find(host_time=t)]
+            distances = log.results()["distPeak"]
+    """
+
+    def __init__(self, log_file:str):
+        """Open a log.
+
+        Args:
+            log_file (str): file name
+        """
+        self._file = open(log_file, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                          # empty file
+            self._file.close()
+            raise ValueError("not a TMF8x0x session log (empty)")
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError("not a TMF8x0x session log (too short)")
+        magic, self.version, self.startTime, resultSize = _HEADER.unpack_from(self._map, 0)
+        if magic != SESSION_MAGIC or resultSize != RESULT_FRAME_SIZE:
+            self.close()
+            raise ValueError("not a TMF8x0x session log")
+        if self.version > SESSION_VERSION:
+            self.close()
+            raise ValueError("session log version {} is not supported".format(self.version))
+        self.index:numpy.ndarray = self._loadIndex()
+        """INDEX_DTYPE entry per frame."""
+        self._resultOffsets:Dict[int,int] = {}
+
+    def __enter__(self)->"SessionLogReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the file. Views returned by histograms() must be released before."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _records(self, offset:int, end:int)->Iterator[tuple]:
+        """Headers of the complete records from offset on: (offset, kind, tag, rows, payload offset, payload length)."""
+        data = self._map
+        while offset + _RECORD.size <= end:
+            kind, tag, rows, length = _RECORD.unpack_from(data, offset)
+            payload = offset + _RECORD.size
+            if payload + length > end:
+                return                              # truncated last record
+            yield offset, kind, tag, rows, payload, length
+            offset = payload + length
+
+    def _scan(self, offset:int, end:int)->list:
+        """Index entries of the frames between offset and end, from the RESULT records."""
+        entries = []
+        frameStart = None
+        for record, kind, tag, rows, payload, length in self._records(offset, end):
+            if kind == END:
+                break
+            if kind == INDEX:
+                continue
+            if frameStart is None:
+                frameStart = record
+            if kind == RESULT:
+                hostTime, = _TIME.unpack_from(self._map, payload)
+                frame = payload + _TIME.size
+                entries.append((frameStart, self._map[frame], int.from_bytes(self._map[frame + _SYS_CLOCK_OFFSET:frame + _SYS_CLOCK_OFFSET + 4], "little"), hostTime))
+                frameStart = None
+        return entries
+
+    def _loadIndex(self)->numpy.ndarray:
+        size = len(self._map)
+        endSize = _RECORD.size + _OFFSET.size
+        if size >= _HEADER.size + endSize:
+            kind, _, _, length = _RECORD.unpack_from(self._map, size - endSize)
+            if kind == END and length == _OFFSET.size:
+                # closed log: follow the INDEX chain backwards, then scan the frames after the last INDEX record
+                blocks = []
+                last = offset = _OFFSET.unpack_from(self._map, size - _OFFSET.size)[0]
+                while offset:
+                    _, _, rows, length = _RECORD.unpack_from(self._map, offset)
+                    payload = offset + _RECORD.size
+                    blocks.append(numpy.frombuffer(self._map, dtype=INDEX_DTYPE, count=rows, offset=payload + _OFFSET.size).copy())
+                    offset = _OFFSET.unpack_from(self._map, payload)[0]
+                blocks.reverse()
+                start = last + _RECORD.size + _RECORD.unpack_from(self._map, last)[3] if last else _HEADER.size
+                blocks.append(numpy.array(self._scan(start, size - endSize), dtype=INDEX_DTYPE))
+                return numpy.concatenate(blocks)
+        return numpy.array(self._scan(_HEADER.size, size), dtype=INDEX_DTYPE)
+
+    def __len__(self)->int:
+        return len(self.index)
+
+    def __iter__(self)->Iterator[HistogramsAndResult]:
+        for frame in range(len(self)):
+            yield self[frame]
+
+    def _frameRecords(self, frame:int)->Iterator[tuple]:
+        for record in self._records(int(self.index[frame]["offset"]), len(self._map)):
+            yield record
+            if record[1] == RESULT:
+                return
+
+    def histograms(self, frame:int)->Dict[int,numpy.ndarray]:
+        """The histogram blocks of a frame as read-only views into the file, no copy.
+
+        Args:
+            frame (int): frame number
+
+        Returns:
+            Dict[int,numpy.ndarray]: channels x bins (uint16 raw or uint32 scaled) per Histogram type (tag)
+        """
+        blocks = {}
+        for _, kind, tag, rows, payload, length in self._frameRecords(frame):
+            if kind in (HISTOGRAMS_U16, HISTOGRAMS_U32):
+                dtype = numpy.dtype("<u2" if kind == HISTOGRAMS_U16 else "<u4")
+                blocks[tag] = numpy.frombuffer(self._map, dtype=dtype, count=length // dtype.itemsize, offset=payload).reshape(rows, -1)
+        return blocks
+
+    def _resultOffset(self, frame:int)->int:
+        offset = self._resultOffsets.get(frame)
+        if offset is None:
+            for _, kind, _, _, payload, _ in self._frameRecords(frame):
+                if kind == RESULT:
+                    offset = self._resultOffsets[frame] = payload + _TIME.size
+        return offset
+
+    def result(self, frame:int)->tmf8806DistanceResultFrame:
+        """The result frame of a frame.
+
+        Args:
+            frame (int): frame number
+
+        Returns:
+            tmf8806DistanceResultFrame: a copy of the result frame
+        """
+        return tmf8806DistanceResultFrame.from_buffer_copy(self._map, self._resultOffset(frame))
+
+    def results(self)->numpy.ndarray:
+        """All result frames decoded into a structured array.
+
+        Returns:
+            numpy.ndarray: RESULT_FRAME_DTYPE record per frame
+        """
+        ring = ResultRingBuffer(max(1, len(self)))
+        for frame in range(len(self)):
+            ring.push(self._map, self._resultOffset(frame))
+        return ring.frames[:len(self)]
+
+    def __getitem__(self, frame:int)->HistogramsAndResult:
+        """A frame as HistogramsAndResult, raw histograms are scaled like readHistogramsAndResult does.
+
+        Args:
+            frame (int): frame number, negative numbers count from the end
+
+        Returns:
+            HistogramsAndResult: a frozen copy of the frame
+        """
+        if frame < 0:
+            frame += len(self)
+        if not 0 <= frame < len(self):
+            raise IndexError("frame index out of range")
+        hr = HistogramsAndResult()
+        for tag, block in self.histograms(frame).items():
+            if block.dtype == numpy.uint16 and tag == PROC_PUC_TAG:
+                rows = hr._rows(HistogramsAndResult.PROC_PUC, 0, len(block), block.shape[1])
+                Tmf8x0xApp.scaleHistograms(block, Histogram.HISTOGRAM_PUC, out=rows)
+            elif block.dtype == numpy.uint16:
+                histograms = []
+                for bins in block:
+                    histogram = Histogram(bins)
+                    histogram.type = tag
+                    histograms.append(histogram)
+                Tmf8x0xApp._storeHistograms(hr, histograms)
+            elif tag in _TAG_KINDS:
+                setattr(hr, _TAG_KINDS[tag], block)
+        hr.result = self.result(frame)
+        return hr.freeze()
+
+    def hostTime(self, frame:int)->float:
+        """Host time of a frame in seconds since the epoch."""
+        return float(self.index[frame]["hostTime"])
+
+    def find(self, host_time:float=None, sys_clock:int=None)->int:
+        """The first frame at or after a host time or device time stamp (binary search in the index).
+
+        Args:
+            host_time (float, optional): seconds since the epoch
+            sys_clock (int, optional): device time stamp (sysClock of the result frame), it must not wrap in the log
+
+        Returns:
+            int: frame number, len(self) if all frames are earlier
+        """
+        if host_time is not None:
+            return int(numpy.searchsorted(self.index["hostTime"], host_time))
+        return int(numpy.searchsorted(self.index["sysClock"], sys_clock))
+
+    def findResultNum(self, result_num:int, start:int=0)->int:
+        """The next frame with a result number (it wraps after 255).
+
+        Args:
+            result_num (int): result number
+            start (int, optional): first frame to check. Defaults to 0.
+
+        Returns:
+            int: frame number, -1 if there is none
+        """
+        hits = numpy.flatnonzero(self.index["resultNum"][start:] == result_num)
+        return int(hits[0]) + start if len(hits) else -1
+
+def convertToCSV(log_file:str, csv_file:str, distance_correction_factor:float=1.0, write_raw_result:bool=True)->int:
+    """Convert a session log to the CSV format of the EVM GUI (see HistogramsAndResult.toCSV).
+
+    Args:
+        log_file (str): session log
+        csv_file (str): CSV file to write
+        distance_correction_factor (float, optional): factor to correct measured distances. Defaults to 1.0.
+        write_raw_result (bool, optional): If True, write the raw result frame before the parsed result. Defaults to True.
+
+    Returns:
+        int: number of frames converted
+    """
+    with SessionLogReader(log_file) as log, open(csv_file, "w", encoding="UTF8", newline="") as f:
+        f.write("sep=;\n")
+        writer = csv.writer(f, delimiter=";")
+        for frame, hr in enumerate(log):
+            hr.toCSV(writer, distance_correction_factor=distance_correction_factor, write_raw_result=write_raw_result,
+                     timestamp=log.hostTime(frame))
+        return len(log)
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
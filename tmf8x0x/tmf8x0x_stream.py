@@ -0,0 +1,252 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Continuous measurement as an iterator: a background thread acquires the results (and histograms) into a bounded queue.
+"""
+
+import __init__
+import collections
+import enum
+import threading
+import time
+from typing import Iterator, Union
+
+# local imports
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+from tmf8x0x.auto.tmf8806_regs import tmf8806MeasureCmd, tmf8806FactoryCalibData, tmf8806DistanceResultFrame, tmf8806StateData
+
+class OverflowPolicy(enum.IntEnum):
+    """What happens when the consumer is slower than the device and the queue is full."""
+    BLOCK = 0
+    """Acquisition waits until the consumer took an item. The device keeps measuring, results are lost on the device side."""
+    DROP_OLDEST = 1
+    """The oldest queued item is discarded to make room for the new one."""
+    DROP_NEWEST = 2
+    """The new item is discarded."""
+
+class StreamStatistics:
+    """Counters of a measurement stream."""
+
+    def __init__(self):
+        self.received:int = 0
+        """Number of items read from the device."""
+        self.deviceDrops:int = 0
+        """Number of results the host missed, detected from gaps in resultNum."""
+        self.queueDrops:int = 0
+        """Number of items discarded because the queue was full."""
+        self.timeouts:int = 0
+        """Number of waits for a result that timed out."""
+        self.consecutiveTimeouts:int = 0
+        """Number of waits that timed out since the last result."""
+
+    def toDict(self)->dict:
+        return { "received": self.received, "deviceDrops": self.deviceDrops, "queueDrops": self.queueDrops, "timeouts": self.timeouts,
+                 "consecutiveTimeouts": self.consecutiveTimeouts }
+
+class MeasurementStream:
+    """Iterator over the results of a continuous measurement. Use it as context manager, e.g.:
+
+        with tof.stream(config) as results:
+            for result in results:
+                print(result.resultNum, result.distPeak)
+
+       Entering starts the measurement and the acquisition thread, leaving stops both. While the stream runs,
+       the thread owns the device, the application must not call other Tmf8x0xApp functions.
+       If histograms are requested, the items are HistogramsAndResult objects, else tmf8806DistanceResultFrame.
+       The stream ends after max_timeouts waits in a row without a result, so iterating does not block forever
+       once the device stopped measuring.
+    """
+
+    def __init__(self, app, config:tmf8806MeasureCmd, calibration:tmf8806FactoryCalibData=None, state_data:tmf8806StateData=None,
+                 histograms:dict=None, queue_size:int=64, policy:OverflowPolicy=OverflowPolicy.DROP_OLDEST, timeout:float=1.0,
+                 max_timeouts:int=3):
+        """Create a stream, nothing is started before the stream is entered.
+
+        Args:
+            app (Tmf8x0xApp): The device application, must be running.
+            config (tmf8806MeasureCmd): The measurement configuration.
+            calibration (tmf8806FactoryCalibData, optional): Factory calibration data. Defaults to None.
+            state_data (tmf8806StateData, optional): Algorithm state data. Defaults to None.
+            histograms (dict, optional): Arguments of configureHistogramDumping, e.g. dict(distance=True). Defaults to None (no histograms).
+            queue_size (int, optional): Maximum number of items waiting for the consumer. Defaults to 64.
+            policy (OverflowPolicy, optional): What to do when the queue is full. Defaults to OverflowPolicy.DROP_OLDEST.
+            timeout (float, optional): Maximum time to wait for one result before it is counted as timeout. Defaults to 1.0.
+            max_timeouts (int, optional): Consecutive timeouts that end the stream, None never ends it. Defaults to 3.
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if max_timeouts is not None and max_timeouts < 1:
+            raise ValueError("max_timeouts must be at least 1")
+        self.app = app
+        self.config = config
+        self.calibration = calibration
+        self.state_data = state_data
+        self.histograms = histograms
+        self.queue_size = queue_size
+        self.policy = policy
+        self.timeout = timeout
+        self.max_timeouts = max_timeouts
+        self.statistics = StreamStatistics()
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._thread:threading.Thread = None
+        self._running = False
+        self._error:BaseException = None
+        self._lastResultNum:int = None
+
+    # ------------------------------------------------------------------ start / stop
+
+    def start(self)->"MeasurementStream":
+        """Start the measurement and the acquisition thread.
+
+        Returns:
+            MeasurementStream: self
+        """
+        if self._thread is not None:
+            return self
+        if self.histograms:
+            status = self.app.configureHistogramDumping(**self.histograms)
+            if status != Tmf8x0xDevice.Status.OK:
+                raise RuntimeError("TMF8x0x stream: histogram configuration failed ({})".format(status))
+        status = self.app.measure(self.config, calibration=self.calibration, stateData=self.state_data)
+        if status != Tmf8x0xDevice.Status.OK:
+            raise RuntimeError("TMF8x0x stream: measurement did not start ({})".format(status))
+        self._running = True
+        self._thread = threading.Thread(target=self._acquire, name="tmf8x0x-stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the acquisition thread and the measurement. Items still queued can be read afterwards."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        self.app.stop()
+        if self.histograms:
+            self.app.configureHistogramDumping()
+
+    def __enter__(self)->"MeasurementStream":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------ producer
+
+    def _acquire(self):
+        try:
+            while self._running:
+                item = self._read()
+                if item is not None:
+                    self._put(item)
+                elif self.max_timeouts is not None and self.statistics.consecutiveTimeouts >= self.max_timeouts:
+                    break                   # the device stopped producing, end the stream
+        except BaseException as error:     # hand over to the consumer
+            self._error = error
+        finally:
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+
+    def _read(self)->Union[tmf8806DistanceResultFrame, object]:
+        app = self.app
+        if self.histograms:
+            status, item = app.readHistogramsAndResult(timeout=self.timeout)
+            if status == Tmf8x0xDevice.Status.TIMEOUT_ERROR:
+                self._timeout()
+                return None
+            if status != Tmf8x0xDevice.Status.OK:
+                raise RuntimeError("TMF8x0x stream: histogram readout failed ({})".format(status))
+            result = item.result
+        else:
+            interrupt = app.waitStrategy.waitForInterrupt(app, app.TMF8X0X_APP_INTERRUPT_RESULTS, self.timeout)
+            if not interrupt:
+                self._timeout()
+                return None
+            app.lastResultTransactions = app.waitStrategy.transactions
+            item = result = app._readResultFrame()
+            if result is None:
+                return None
+        if result.resultNum == self._lastResultNum and not self.histograms:
+            return None                     # the next result arrived between clear and readout, and was read with the previous interrupt
+        self.statistics.received += 1
+        self.statistics.consecutiveTimeouts = 0
+        if self._lastResultNum is not None:
+            self.statistics.deviceDrops += (result.resultNum - self._lastResultNum - 1) & 0xff
+        self._lastResultNum = result.resultNum
+        return item
+
+    def _timeout(self):
+        self.statistics.timeouts += 1
+        self.statistics.consecutiveTimeouts += 1
+
+    def _put(self, item):
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                if self.policy == OverflowPolicy.BLOCK:
+                    while self._running and len(self._queue) >= self.queue_size:
+                        self._condition.wait()
+                    if not self._running:
+                        return
+                elif self.policy == OverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self.statistics.queueDrops += 1
+                else:
+                    self.statistics.queueDrops += 1
+                    return
+            self._queue.append(item)
+            self._condition.notify_all()
+
+    # ------------------------------------------------------------------ consumer
+
+    def get(self, timeout:float=None):
+        """Take the next item from the queue.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds, None waits until an item arrives or the stream ended
+                (at the latest after max_timeouts result timeouts in a row). Defaults to None.
+
+        Returns:
+            the next item, None on timeout or if the stream ended and the queue is empty
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self._queue:
+                if self._error is not None:
+                    error, self._error = self._error, None
+                    raise error
+                if not self._running:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            item = self._queue.popleft()
+            self._condition.notify_all()
+            return item
+
+    def __iter__(self)->Iterator:
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item
+
+    def __len__(self)->int:
+        """Number of queued items."""
+        return len(self._queue)
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,172 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Strategies to wait for a TMF8x0x interrupt (result, histogram, calibration done).
+"""
+
+import __init__
+import abc
+import time
+
+# local imports
+from tmf8x0x.tmf8x0x_device import Tmf8x0xDevice
+
+class WaitStrategy(abc.ABC):
+    """Base class of all wait strategies. A strategy decides how the host finds out that an interrupt is pending.
+       It counts the I2C transactions and GPIO reads it needed for the last wait.
+    """
+
+    def __init__(self, poll_interval:float=0.0, backoff:float=1.0, max_poll_interval:float=0.01):
+        """Create a wait strategy.
+
+        Args:
+            poll_interval (float, optional): Time in seconds between two polls. 0 polls back-to-back. Defaults to 0.0.
+            backoff (float, optional): The poll interval is multiplied by this factor after every unsuccessful poll. Defaults to 1.0.
+            max_poll_interval (float, optional): Upper limit of the poll interval in seconds. Defaults to 0.01.
+        """
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.max_poll_interval = max_poll_interval
+        self.transactions:int = 0
+        """Number of I2C transactions of the last wait."""
+        self.gpioReads:int = 0
+        """Number of GPIO reads of the last wait."""
+
+    def prepare(self, device:Tmf8x0xDevice, mask:int):
+        """Called before a measurement is started, so the strategy can configure the device.
+
+        Args:
+            device (Tmf8x0xDevice): The device that will be waited on.
+            mask (int): The interrupt bits the host is going to wait for.
+        """
+        pass
+
+    def _pause(self, interval:float)->float:
+        """Sleep between two polls.
+
+        Args:
+            interval (float): the current poll interval in seconds
+
+        Returns:
+            float: the poll interval for the next poll
+        """
+        if interval > 0.0:
+            time.sleep(interval)
+            interval = min(interval * self.backoff, self.max_poll_interval)
+        return interval
+
+    def _readAndClear(self, device:Tmf8x0xDevice, mask:int, clear:bool)->int:
+        """Read the INT_STATUS register, and clear the requested bits if they are set.
+
+        Args:
+            device (Tmf8x0xDevice): The device.
+            mask (int): The interrupt bits to check.
+            clear (bool): If True, clear the pending bits.
+
+        Returns:
+            int: the pending bits of mask
+        """
+        bits = device.readIntStatus() & mask
+        self.transactions += 1
+        if bits and clear:
+            device.clearIntStatus(bits)
+            self.transactions += 1
+        return bits
+
+    def pollOnce(self, device:Tmf8x0xDevice, mask:int, clear:bool=True)->int:
+        """Check once, without waiting, if an interrupt is pending. Used by callers that do the waiting themselves (e.g. in an event loop).
+
+        Args:
+            device (Tmf8x0xDevice): The device.
+            mask (int): The interrupt bits to check.
+            clear (bool, optional): If True, clear the pending bits. Defaults to True.
+
+        Returns:
+            int: the pending bits of mask
+        """
+        return self._readAndClear(device, mask, clear)
+
+    @abc.abstractmethod
+    def waitForInterrupt(self, device:Tmf8x0xDevice, mask:int, timeout:float, clear:bool=True)->int:
+        """Wait until at least one bit of mask is set in the INT_STATUS register.
+
+        Args:
+            device (Tmf8x0xDevice): The device.
+            mask (int): The interrupt bits to wait for.
+            timeout (float): Maximum time to wait in seconds.
+            clear (bool, optional): If True, clear the pending bits. Defaults to True.
+
+        Returns:
+            int: the pending bits of mask, 0 on timeout
+        """
+
+class RegisterPollWaitStrategy(WaitStrategy):
+    """Poll the INT_STATUS register over I2C until an interrupt is pending. Works without an interrupt line."""
+
+    def waitForInterrupt(self, device:Tmf8x0xDevice, mask:int, timeout:float, clear:bool=True)->int:
+        self.transactions = 0
+        self.gpioReads = 0
+        interval = self.poll_interval
+        maxTime = time.monotonic() + timeout
+        while True:
+            bits = self._readAndClear(device, mask, clear)
+            if bits:
+                return bits
+            if time.monotonic() > maxTime:
+                return 0
+            interval = self._pause(interval)
+
+class IntPinWaitStrategy(WaitStrategy):
+    """Poll the INT GPIO and touch I2C only once the pin is pulled low.
+       The interrupts must be enabled in the INT_ENAB register, prepare does that when a measurement is started.
+       While an interrupt outside mask holds the pin low, the pin cannot signal the awaited one: INT_STATUS is then
+       re-read with an exponential backoff from HELD_POLL_INTERVAL up to max_poll_interval, not on every pin poll.
+    """
+
+    HELD_POLL_INTERVAL:float = 0.0001
+    """First INT_STATUS re-read interval in seconds while the pin is held low by other interrupts."""
+
+    def prepare(self, device:Tmf8x0xDevice, mask:int):
+        enabled = device.readIntEnable()
+        if enabled & mask != mask:
+            device.enableInt(enabled | mask)
+
+    def pollOnce(self, device:Tmf8x0xDevice, mask:int, clear:bool=True)->int:
+        self.gpioReads += 1
+        if device.isIntPinPulledLow():
+            return self._readAndClear(device, mask, clear)
+        return 0
+
+    def waitForInterrupt(self, device:Tmf8x0xDevice, mask:int, timeout:float, clear:bool=True)->int:
+        self.transactions = 0
+        self.gpioReads = 0
+        interval = self.poll_interval
+        held = 0.0                  # backoff of the INT_STATUS reads while the pin is held low by other interrupts
+        maxTime = time.monotonic() + timeout
+        while True:
+            self.gpioReads += 1
+            if device.isIntPinPulledLow():
+                bits = self._readAndClear(device, mask, clear)
+                if bits:
+                    return bits
+                remaining = maxTime - time.monotonic()
+                if remaining <= 0:
+                    return 0
+                held = min(held * 2, self.max_poll_interval) if held else max(self.poll_interval, self.HELD_POLL_INTERVAL)
+                time.sleep(min(held, remaining))
+                continue            # re-check the pin, the other interrupt may have been cleared meanwhile
+            held = 0.0
+            if time.monotonic() > maxTime:
+                # last chance, the interrupt might be pending without being enabled for the pin
+                return self._readAndClear(device, mask, clear)
+            interval = self._pause(interval)
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()
@@ -0,0 +1,310 @@
+# /*****************************************************************************
+# * Copyright (c) [2024] ams-OSRAM AG                                          *
+# * All rights are reserved.                                                   *
+# *                                                                            *
+# * FOR FULL LICENSE TEXT SEE LICENSE.TXT                                      *
+# ******************************************************************************/
+
+
+"""
+Writing of HistogramsAndResult frames (CSV rows or session log records) in a background thread, so that a slow disk
+does not delay the readout of the device.
+"""
+
+import __init__
+import collections
+import csv
+import enum
+import io
+import os
+import threading
+import time
+from typing import List
+
+# local imports
+from tmf8x0x.tmf8x0x_app import HistogramsAndResult
+from tmf8x0x.tmf8x0x_poll import LatencyHistogram
+from tmf8x0x.tmf8x0x_session import SessionLogWriter
+from tmf8x0x.tmf8x0x_stream import OverflowPolicy
+
+class OutputFormat(enum.IntEnum):
+    """What FrameWriter writes per frame."""
+    CSV = 0
+    """The rows of HistogramsAndResult.toCSV: histograms, #RES, #OBJ and #TMP."""
+    CSV_BYTES = 1
+    """The rows of HistogramsAndResult.toCSVBytes: histograms and #RES."""
+    SESSION = 2
+    """Session log records, see tmf8x0x_session."""
+
+class WriterStatistics:
+    """Counters of a FrameWriter."""
+
+    def __init__(self):
+        self.queued:int = 0
+        """Number of frames accepted by put."""
+        self.written:int = 0
+        """Number of frames written to a file."""
+        self.dropped:int = 0
+        """Number of frames discarded because the queue was full."""
+        self.batches:int = 0
+        """Number of writes, each with up to batch_size frames."""
+        self.bytesWritten:int = 0
+        """Number of bytes written to all files."""
+        self.maxQueueDepth:int = 0
+        """Highest number of frames waiting in the queue."""
+        self.writeLatency = LatencyHistogram()
+        """Time to format and write one batch."""
+        self.frameLatency = LatencyHistogram()
+        """Time from put until the frame is written."""
+
+    def toDict(self)->dict:
+        return { "queued": self.queued, "written": self.written, "dropped": self.dropped, "batches": self.batches,
+                 "bytesWritten": self.bytesWritten, "maxQueueDepth": self.maxQueueDepth,
+                 "writeLatency": self.writeLatency.toDict(), "frameLatency": self.frameLatency.toDict() }
+
+class FrameWriter:
+    """Writes HistogramsAndResult frames from a background thread, e.g.:
+
+        with FrameWriter("capture.csv", max_bytes=100 << 20) as writer:
+            while ...:
+                status, hr = tof.readHistogramsAndResult(hr=hr)
+                writer.put(hr)
+
+       put copies the frame into a bounded queue and returns. The thread formats up to batch_size queued frames at once
+       and writes them with one write call. At most queue_size frames are kept in memory, the policy decides which frames
+       are dropped when the disk cannot keep up.
+       With max_bytes or max_seconds the output is split into numbered files, a new file is started before a batch
+       when the current one reached a limit, so every file holds complete frames.
+    """
+
+    def __init__(self, file_name:str, output_format:OutputFormat=OutputFormat.CSV, queue_size:int=256,
+                 policy:OverflowPolicy=OverflowPolicy.DROP_OLDEST, batch_size:int=64, max_bytes:int=None, max_seconds:float=None,
+                 distance_correction_factor:float=1.0):
+        """Start the writer thread, the first file is created with the first batch.
+
+        Args:
+            file_name (str): output file. With rotation, "{index}" in the name is replaced by the file number
+                (e.g. "capture-{index:04}.csv"), without it "-0000", "-0001", ... is added before the extension.
+            output_format (OutputFormat, optional): CSV rows or session log records. Defaults to OutputFormat.CSV.
+            queue_size (int, optional): Maximum number of frames waiting to be written. Defaults to 256.
+            policy (OverflowPolicy, optional): What to do when the queue is full. Defaults to OverflowPolicy.DROP_OLDEST.
+            batch_size (int, optional): Maximum number of frames per write. Defaults to 64.
+            max_bytes (int, optional): Start a new file when the current one has this size. Defaults to None (no limit).
+            max_seconds (float, optional): Start a new file when the current one is this old. Defaults to None (no limit).
+            distance_correction_factor (float, optional): factor to correct the distances of the #OBJ rows. Defaults to 1.0.
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.file_name = file_name
+        self.output_format = output_format
+        self.queue_size = queue_size
+        self.policy = policy
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.distance_correction_factor = distance_correction_factor
+        self.statistics = WriterStatistics()
+        self.files:List[str] = []
+        """Names of the files written so far, the last one is the current file."""
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._running = True
+        self._busy = False              # the thread is writing a batch
+        self._error:BaseException = None
+        self._file = None               # binary file (CSV) or SessionLogWriter
+        self._fileBytes:int = 0
+        self._fileOpened:float = 0.0
+        self._thread = threading.Thread(target=self._run, name="tmf8x0x-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self)->"FrameWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ------------------------------------------------------------------ producer
+
+    def _raiseError(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def put(self, hr:HistogramsAndResult, host_time:float=None)->bool:
+        """Queue a copy of a frame, hr can be reused for the next readout right away.
+
+        Args:
+            hr (HistogramsAndResult): histograms and result
+            host_time (float, optional): time of the result in seconds since the epoch. Defaults to now.
+
+        Returns:
+            bool: False if the frame (or with OverflowPolicy.DROP_OLDEST an older one) was dropped
+        """
+        item = ( hr.copy(), time.time() if host_time is None else host_time, time.perf_counter() )
+        with self._condition:
+            self._raiseError()
+            if not self._running:
+                raise ValueError("the writer is closed")
+            kept = True
+            if len(self._queue) >= self.queue_size:
+                if self.policy == OverflowPolicy.BLOCK:
+                    while self._running and len(self._queue) >= self.queue_size:
+                        self._condition.wait()
+                    self._raiseError()
+                    if not self._running:
+                        raise ValueError("the writer is closed")
+                elif self.policy == OverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self.statistics.dropped += 1
+                    kept = False
+                else:
+                    self.statistics.dropped += 1
+                    return False
+            self._queue.append(item)
+            self.statistics.queued += 1
+            self.statistics.maxQueueDepth = max(self.statistics.maxQueueDepth, len(self._queue))
+            self._condition.notify_all()
+            return kept
+
+    @property
+    def queueDepth(self)->int:
+        """Number of frames waiting to be written."""
+        return len(self._queue)
+
+    def getStatistics(self)->dict:
+        """Get the counters and latency distributions (in microseconds) of the writer.
+
+        Returns:
+            dict: WriterStatistics.toDict plus the current queue depth and the number of files
+        """
+        with self._condition:
+            return { **self.statistics.toDict(), "queueDepth": len(self._queue), "files": len(self.files) }
+
+    def flush(self, timeout:float=None)->bool:
+        """Wait until all queued frames are written.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None (no limit).
+
+        Returns:
+            bool: True if the queue is empty, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while (self._queue or self._busy) and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self._raiseError()
+            return not self._queue
+
+    def close(self):
+        """Write the queued frames, stop the thread and close the file."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._raiseError()
+
+    # ------------------------------------------------------------------ writer thread
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while self._running and not self._queue:
+                        self._condition.wait()
+                    if not self._queue:
+                        break                                   # closed and all frames written
+                    batch = [ self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue))) ]
+                    self._busy = True
+                    self._condition.notify_all()                # room for a blocked put
+                self._writeBatch(batch)
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+        except BaseException as error:     # hand over to the producer
+            with self._condition:
+                self._error = error
+                self._queue.clear()
+        finally:
+            try:
+                self._closeFile()
+            except BaseException as error:
+                with self._condition:
+                    self._error = self._error or error
+            with self._condition:
+                self._running = False
+                self._busy = False
+                self._condition.notify_all()
+
+    def _nextFileName(self)->str:
+        if self.max_bytes is None and self.max_seconds is None:
+            return self.file_name
+        if "{index" in self.file_name:
+            return self.file_name.format(index=len(self.files))
+        root, extension = os.path.splitext(self.file_name)
+        return f"{root}-{len(self.files):04}{extension}"
+
+    def _closeFile(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _openFile(self)->int:
+        """Start the next file, returns the size of its header."""
+        name = self._nextFileName()
+        if self.output_format == OutputFormat.SESSION:
+            self._file = SessionLogWriter(name, buffer_size=1 << 20)
+            header = self._file.bytesWritten
+        else:
+            self._file = open(name, "wb")
+            header = self._file.write(b"sep=;\n")
+        self._fileBytes = 0
+        self._fileOpened = time.monotonic()
+        self.files.append(name)
+        return header
+
+    def _writeBatch(self, batch:list):
+        start = time.perf_counter()
+        size = 0
+        if self._file is not None and ((self.max_bytes is not None and self._fileBytes >= self.max_bytes) or
+                                       (self.max_seconds is not None and time.monotonic() - self._fileOpened >= self.max_seconds)):
+            self._closeFile()
+        if self._file is None:
+            size += self._openFile()
+        if self.output_format == OutputFormat.SESSION:
+            before = self._file.bytesWritten
+            for hr, host_time, _ in batch:
+                self._file.write(hr, host_time)
+            self._file.flush()
+            size += self._file.bytesWritten - before
+        else:
+            text = io.StringIO()
+            writer = csv.writer(text, delimiter=";")
+            for hr, host_time, _ in batch:
+                if self.output_format == OutputFormat.CSV:
+                    hr.toCSV(writer, distance_correction_factor=self.distance_correction_factor, timestamp=host_time)
+                else:
+                    hr.toCSVBytes(writer)
+            data = text.getvalue().encode("UTF8")
+            self._file.write(data)
+            self._file.flush()
+            size += len(data)
+        self._fileBytes += size
+        end = time.perf_counter()
+        with self._condition:
+            statistics = self.statistics
+            statistics.batches += 1
+            statistics.written += len(batch)
+            statistics.bytesWritten += size
+            statistics.writeLatency.record(end - start)
+            for _, _, queued in batch:
+                statistics.frameLatency.record(end - queued)
+
+if __name__ == "__main__":
+    print("Only for inclusion in other modules. No example code here.")
+    quit()